@@ -34,6 +34,9 @@ def create_app(config_name: str = 'development') -> Flask:
     bcrypt.init_app(app)
     CORS(app)
 
+    from app.cache import init_cache
+    init_cache(app)
+
     # Register blueprints
     from app.routes import auth_bp, workspace_bp, account_bp, category_bp, transaction_bp, budget_bp
     from app.routes.analytics import analytics_bp
@@ -0,0 +1,202 @@
+"""Workspace access resolution shared by decorators and routes.
+
+Each (user, workspace) pair is resolved at most once per request and kept on
+flask.g. Behind that sits a small process-wide TTL cache, invalidated
+explicitly when memberships change. Other worker processes only see a
+change once their own entry expires, so AUTH_CACHE_TTL bounds how long a
+removed member can keep access there.
+
+With JWT_ROLE_CLAIMS enabled, access tokens also carry the Owner flag and a
+{workspace_id: role} map. Those claims are trusted as long as their
+membership version matches users.membership_version, which is bumped on
+every membership change, so most requests need no authorization query.
+"""
+import threading
+import time
+from typing import Any, Dict, Hashable, List, Optional, Tuple
+from flask import current_app, g, has_request_context
+from flask_jwt_extended import create_access_token, get_jwt
+from sqlalchemy import update
+from app import db
+from app.models import WorkspaceMember, Role, User
+
+DEFAULT_TTL = 60  # seconds
+
+_MISSING = object()
+
+
+class TTLCache:
+    """Thread-safe dict whose entries expire after a fixed number of seconds."""
+
+    def __init__(self, max_size: int = 10000):
+        self.max_size = max_size
+        self._data: Dict[Hashable, Tuple[float, Any]] = {}
+        self._lock = threading.Lock()
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                return default
+            expires_at, value = entry
+            if expires_at < time.monotonic():
+                del self._data[key]
+                return default
+            return value
+
+    def set(self, key: Hashable, value: Any, ttl: float) -> None:
+        with self._lock:
+            if len(self._data) >= self.max_size:
+                # Cheap bound on memory: drop everything rather than track recency
+                self._data.clear()
+            self._data[key] = (time.monotonic() + ttl, value)
+
+    def delete_where(self, predicate) -> None:
+        with self._lock:
+            for key in [k for k in self._data if predicate(k)]:
+                del self._data[key]
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+
+
+_cache = TTLCache()
+
+
+def _request_cache() -> Optional[Dict[Hashable, Any]]:
+    if not has_request_context():
+        return None
+    if 'access_cache' not in g:
+        g.access_cache = {}
+    return g.access_cache
+
+
+def _cached(key: Tuple, load) -> Any:
+    """Look a value up in the request cache, then the TTL cache, then load it."""
+    request_cache = _request_cache()
+    if request_cache is not None and key in request_cache:
+        return request_cache[key]
+
+    value = _cache.get(key, _MISSING)
+    if value is _MISSING:
+        value = load()
+        _cache.set(key, value, current_app.config.get('AUTH_CACHE_TTL', DEFAULT_TTL))
+
+    if request_cache is not None:
+        request_cache[key] = value
+    return value
+
+
+def get_membership_version(user_id: int) -> int:
+    """Get the user's current membership version."""
+    def load():
+        return db.session.query(User.membership_version).filter(User.id == user_id).scalar() or 0
+    return _cached(('version', user_id), load)
+
+
+def _role_claims(user_id: int) -> Optional[Dict[str, Any]]:
+    """Role claims of the current access token, if they belong to user_id and are current."""
+    if not has_request_context() or not current_app.config.get('JWT_ROLE_CLAIMS'):
+        return None
+    try:
+        claims = get_jwt()
+    except RuntimeError:
+        # No verified token in this request
+        return None
+    if 'ws' not in claims or claims.get('sub') != str(user_id):
+        return None
+    if claims.get('mv') != get_membership_version(user_id):
+        return None
+    return claims
+
+
+def build_role_claims(user: User) -> Dict[str, Any]:
+    """Build the compact role claims embedded in access tokens."""
+    memberships = db.session.query(WorkspaceMember.workspace_id, Role.name).join(
+        Role, WorkspaceMember.role_id == Role.id
+    ).filter(WorkspaceMember.user_id == user.id)
+
+    return {
+        'own': bool(user.is_owner),
+        'ws': {str(workspace_id): role_name for workspace_id, role_name in memberships},
+        'mv': user.membership_version or 0
+    }
+
+
+def issue_access_token(user: User) -> str:
+    """Create an access token for a user, with role claims when JWT_ROLE_CLAIMS is enabled."""
+    claims = build_role_claims(user) if current_app.config.get('JWT_ROLE_CLAIMS') else None
+    return create_access_token(identity=str(user.id), additional_claims=claims)
+
+
+def user_is_owner(user_id: int) -> bool:
+    """Check whether a user is a global Owner (Superadmin)."""
+    claims = _role_claims(user_id)
+    if claims is not None:
+        return bool(claims.get('own'))
+
+    def load():
+        return bool(db.session.query(User.is_owner).filter(User.id == user_id).scalar())
+    return _cached(('owner', user_id), load)
+
+
+def get_workspace_role(user_id: int, workspace_id: int) -> Optional[str]:
+    """Get the user's role name in a workspace, or None when not a member."""
+    claims = _role_claims(user_id)
+    if claims is not None:
+        return claims['ws'].get(str(workspace_id))
+
+    def load():
+        return db.session.query(Role.name).join(
+            WorkspaceMember, WorkspaceMember.role_id == Role.id
+        ).filter(
+            WorkspaceMember.user_id == user_id,
+            WorkspaceMember.workspace_id == workspace_id
+        ).scalar()
+    return _cached(('role', user_id, int(workspace_id)), load)
+
+
+def check_workspace_access(user_id: int, workspace_id: int) -> bool:
+    """Check if user has access to workspace (any role, or global Owner)."""
+    return user_is_owner(user_id) or get_workspace_role(user_id, workspace_id) is not None
+
+
+def bump_membership_version(user_ids: List[int]) -> None:
+    """
+    Mark role claims issued to these users as stale.
+
+    Call before committing a membership change; tokens carrying the old
+    version fall back to database lookups until they are refreshed.
+    """
+    if not user_ids:
+        return
+    db.session.execute(
+        update(User)
+        .where(User.id.in_(user_ids))
+        .values(membership_version=User.membership_version + 1)
+        .execution_options(synchronize_session=False)
+    )
+
+
+def invalidate_workspace_access(workspace_id: int, user_id: Optional[int] = None) -> None:
+    """
+    Forget cached roles after a membership change.
+
+    Args:
+        workspace_id: Workspace whose memberships changed
+        user_id: Only this member (default: every member of the workspace)
+    """
+    workspace_id = int(workspace_id)
+
+    def matches(key: Tuple) -> bool:
+        if key[0] == 'version':
+            return user_id is None or key[1] == user_id
+        return key[0] == 'role' and key[2] == workspace_id and (user_id is None or key[1] == user_id)
+
+    _cache.delete_where(matches)
+    request_cache = _request_cache()
+    if request_cache:
+        for key in [k for k in request_cache if matches(k)]:
+            del request_cache[key]
+
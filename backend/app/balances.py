@@ -0,0 +1,139 @@
+"""Account balance service shared by all balance endpoints."""
+from decimal import Decimal
+from typing import Dict, List, Optional, Tuple, Any
+from sqlalchemy import func
+from sqlalchemy.orm import joinedload
+from app import db
+from app.models import Account, Transaction
+
+ZERO = Decimal('0')
+
+# Column credited on the main account for each transaction type
+TYPE_COLUMNS = {
+    'INCOME': 'income',
+    'EXPENSE': 'expense',
+    'TRANSFER': 'transfer_out',
+}
+
+BALANCE_FIELDS = ['income', 'expense', 'transfer_in', 'transfer_out', 'transaction_count']
+
+
+def empty_totals() -> Dict[str, Any]:
+    """Totals for an account without any transactions."""
+    return {'income': ZERO, 'expense': ZERO, 'transfer_in': ZERO, 'transfer_out': ZERO, 'transaction_count': 0}
+
+
+def compute_totals(workspace_id: Optional[int] = None, account_ids: Optional[List[int]] = None) -> Dict[int, Dict[str, Any]]:
+    """
+    Compute per-account totals from raw transactions.
+
+    Runs one GROUP BY (account_id, type) query and one GROUP BY
+    transfer_to_account_id query, whatever the number of accounts.
+
+    Args:
+        workspace_id: Limit to one workspace
+        account_ids: Limit to these accounts
+
+    Returns:
+        Dict of account_id -> totals (see BALANCE_FIELDS)
+    """
+    totals = {account_id: empty_totals() for account_id in (account_ids or [])}
+    if account_ids is not None and not account_ids:
+        return totals
+
+    by_type = db.session.query(
+        Transaction.account_id,
+        Transaction.type,
+        func.sum(Transaction.amount),
+        func.count(Transaction.id)
+    )
+    incoming = db.session.query(
+        Transaction.transfer_to_account_id,
+        func.sum(Transaction.amount).filter(Transaction.type == 'TRANSFER'),
+        func.count(Transaction.id).filter(Transaction.transfer_to_account_id != Transaction.account_id)
+    ).filter(Transaction.transfer_to_account_id.isnot(None))
+
+    if workspace_id:
+        by_type = by_type.filter(Transaction.workspace_id == workspace_id)
+        incoming = incoming.filter(Transaction.workspace_id == workspace_id)
+    if account_ids is not None:
+        by_type = by_type.filter(Transaction.account_id.in_(account_ids))
+        incoming = incoming.filter(Transaction.transfer_to_account_id.in_(account_ids))
+
+    for account_id, txn_type, amount, count in by_type.group_by(Transaction.account_id, Transaction.type):
+        account_totals = totals.setdefault(account_id, empty_totals())
+        column = TYPE_COLUMNS.get(txn_type)
+        if column:
+            account_totals[column] += amount or ZERO
+        account_totals['transaction_count'] += count
+
+    for account_id, amount, count in incoming.group_by(Transaction.transfer_to_account_id):
+        account_totals = totals.setdefault(account_id, empty_totals())
+        account_totals['transfer_in'] += amount or ZERO
+        account_totals['transaction_count'] += count
+
+    return totals
+
+
+def summarize(account: Account, totals: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Add derived figures to raw totals.
+
+    Transfers are included in income/expense totals so sums reconcile:
+    total_income = income (INCOME) + transfer_in (TRANSFER received)
+    total_expense = expense (EXPENSE) + transfer_out (TRANSFER sent)
+    """
+    total_income = totals['income'] + totals['transfer_in']
+    total_expense = totals['expense'] + totals['transfer_out']
+
+    summary = dict(totals)
+    summary['total_income'] = total_income
+    summary['total_expense'] = total_expense
+    summary['current_balance'] = account.initial_balance + total_income - total_expense
+    return summary
+
+
+def _ledger_totals(account: Account) -> Dict[str, Any]:
+    return {field: getattr(account.balance, field) for field in BALANCE_FIELDS}
+
+
+def get_account_balances(workspace_id: int) -> List[Tuple[Account, Dict[str, Any]]]:
+    """
+    Get every account of a workspace together with its balance summary.
+
+    Accounts and their ledger rows are loaded in one query. Accounts that
+    do not have a ledger row yet are computed with compute_totals, which
+    adds at most two grouped queries.
+
+    Returns:
+        List of (account, summary) tuples
+    """
+    accounts = Account.query.options(
+        joinedload(Account.balance)
+    ).filter_by(workspace_id=workspace_id).order_by(Account.id).all()
+
+    missing_ids = [a.id for a in accounts if a.balance is None]
+    computed = compute_totals(workspace_id, missing_ids) if missing_ids else {}
+
+    result = []
+    for account in accounts:
+        totals = _ledger_totals(account) if account.balance is not None else computed[account.id]
+        result.append((account, summarize(account, totals)))
+    return result
+
+
+def get_account_balance(account: Account) -> Dict[str, Any]:
+    """Get the balance summary for a single account."""
+    if account.balance is not None:
+        totals = _ledger_totals(account)
+    else:
+        totals = compute_totals(account.workspace_id, [account.id])[account.id]
+    return summarize(account, totals)
+
+
+def get_total_balance(workspace_id: int) -> Decimal:
+    """Get the combined current balance of all accounts in a workspace."""
+    return sum(
+        (summary['current_balance'] for _, summary in get_account_balances(workspace_id)),
+        ZERO
+    )
@@ -0,0 +1,174 @@
+"""Set-based transaction inserts shared by the bulk endpoint and the importer."""
+from datetime import datetime
+from decimal import Decimal
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
+from sqlalchemy import insert
+from app import db
+from app.models import Transaction, Account, Category
+from app.ledger import apply_transactions
+from app.cache import bump_workspace_generation
+from app.duplicates import transaction_fingerprint
+
+# Upper bound on rows accepted by POST /api/transactions/bulk
+MAX_BULK_ROWS = 5000
+
+
+def _is_id(value: Any) -> bool:
+    """Whether a JSON value is an integer id (true and false are not)."""
+    return isinstance(value, int) and not isinstance(value, bool)
+
+
+def parse_transaction(row: Any, account_ids: Set[int], category_ids: Set[int]) -> Tuple[Optional[Dict[str, Any]], Optional[str]]:
+    """
+    Validate one transaction dict against the workspace's account and category ids.
+
+    Applies the same rules as POST /api/transactions.
+
+    Returns:
+        (column values, None) for a valid row, or (None, error message)
+    """
+    if not isinstance(row, dict):
+        return None, 'Baris harus berupa object'
+
+    required_fields = ['account_id', 'type', 'amount', 'transaction_date']
+    missing = [field for field in required_fields if row.get(field) in (None, '')]
+    if missing:
+        return None, f'{", ".join(missing)} harus diisi'
+
+    txn_type = row['type']
+    if txn_type not in ['INCOME', 'EXPENSE', 'TRANSFER']:
+        return None, 'Type must be INCOME, EXPENSE, or TRANSFER'
+
+    try:
+        amount = Decimal(str(row['amount']))
+    except ArithmeticError:
+        return None, 'Invalid amount'
+    if not amount.is_finite() or amount <= 0:
+        return None, 'Amount must be positive'
+
+    try:
+        txn_date = datetime.strptime(str(row['transaction_date']), '%Y-%m-%d').date()
+    except ValueError as e:
+        return None, f'Invalid date format: {str(e)}'
+
+    account_id = row['account_id']
+    transfer_to_account_id = row.get('transfer_to_account_id') or None
+    category_id = row.get('category_id') or None
+    references = {
+        'account_id': account_id,
+        'transfer_to_account_id': transfer_to_account_id,
+        'category_id': category_id
+    }
+    for field, value in references.items():
+        if value is not None and not _is_id(value):
+            return None, f'{field} harus berupa bilangan bulat'
+
+    description = row.get('description', '')
+    if description is not None and not isinstance(description, str):
+        return None, 'description harus berupa teks'
+
+    if txn_type == 'TRANSFER':
+        if not transfer_to_account_id:
+            return None, 'transfer_to_account_id is required for TRANSFER'
+        if account_id == transfer_to_account_id:
+            return None, 'Cannot transfer to the same account'
+    elif not category_id:
+        return None, 'category_id is required for INCOME and EXPENSE'
+
+    if account_id not in account_ids:
+        return None, 'Invalid account'
+    if transfer_to_account_id and transfer_to_account_id not in account_ids:
+        return None, 'Invalid transfer account'
+    if category_id and category_id not in category_ids:
+        return None, 'Invalid category'
+
+    return {
+        'account_id': account_id,
+        'transfer_to_account_id': transfer_to_account_id,
+        'category_id': category_id,
+        'type': txn_type,
+        'amount': amount,
+        'transaction_date': txn_date,
+        'description': description
+    }, None
+
+
+def validate_transactions(workspace_id: int, rows: List[Any]) -> Tuple[List[Dict[str, Any]], List[Dict[str, Any]], List[int]]:
+    """
+    Validate transaction dicts for one workspace.
+
+    Referenced accounts and categories are checked with one IN query each.
+
+    Returns:
+        (column values of the valid rows, errors as {'index', 'error'},
+        input index of each valid row)
+    """
+    def referenced(*fields) -> Set[int]:
+        return {
+            row[field] for row in rows if isinstance(row, dict)
+            for field in fields if _is_id(row.get(field))
+        }
+
+    account_ids = set()
+    category_ids = set()
+    if referenced('account_id', 'transfer_to_account_id'):
+        account_ids = {account_id for (account_id,) in db.session.query(Account.id).filter(
+            Account.workspace_id == workspace_id,
+            Account.id.in_(referenced('account_id', 'transfer_to_account_id'))
+        )}
+    if referenced('category_id'):
+        category_ids = {category_id for (category_id,) in db.session.query(Category.id).filter(
+            Category.workspace_id == workspace_id,
+            Category.id.in_(referenced('category_id'))
+        )}
+
+    values = []
+    errors = []
+    indexes = []
+    for index, row in enumerate(rows):
+        parsed, error = parse_transaction(row, account_ids, category_ids)
+        if error:
+            errors.append({'index': index, 'error': error})
+        else:
+            values.append(parsed)
+            indexes.append(index)
+
+    return values, errors, indexes
+
+
+def insert_transactions(workspace_id: int, values: Iterable[Dict[str, Any]]) -> List[int]:
+    """
+    Insert validated transactions and book them into the ledger and rollups.
+
+    Uses one executemany INSERT ... RETURNING, one ledger UPDATE and a
+    constant number of rollup statements. Rows not fingerprinted by
+    app.duplicates.flag_duplicates get their fingerprint here. The caller
+    commits.
+
+    Args:
+        workspace_id: Workspace the rows belong to
+        values: Column values as returned by parse_transaction
+
+    Returns:
+        Ids of the new transactions, in input order
+    """
+    values = [dict(row, workspace_id=workspace_id) for row in values]
+    if not values:
+        return []
+
+    for row in values:
+        if not row.get('fingerprint'):
+            row['fingerprint'] = transaction_fingerprint(
+                workspace_id, row['account_id'], row['transaction_date'], row['amount'], row.get('description')
+            )
+
+    # Core insert: PostgreSQL batches this into multi-row INSERT ... RETURNING statements
+    table = Transaction.__table__
+    ids = db.session.scalars(
+        insert(table).returning(table.c.id, sort_by_parameter_order=True),
+        values
+    ).all()
+    apply_transactions(values)
+    bump_workspace_generation(workspace_id)
+
+    return ids
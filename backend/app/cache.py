@@ -0,0 +1,192 @@
+"""Response cache for read-heavy workspace endpoints.
+
+Cached responses are keyed by endpoint, workspace, the workspace's cache
+generation, today's date and the normalized query string. Every write route
+that changes data these endpoints read calls bump_workspace_generation in
+the same database transaction, so a cached response can never outlive the
+data it was computed from; stale generations simply stop being looked up
+and age out of the backend.
+
+Backends (RESPONSE_CACHE_BACKEND):
+    memory  - in-process LRU (default)
+    redis   - shared between worker processes, needs the redis package
+              and RESPONSE_CACHE_REDIS_URL
+    none    - disable caching
+"""
+import threading
+import time
+from collections import OrderedDict
+from datetime import date
+from functools import wraps
+from typing import Callable, Optional
+from flask import Flask, current_app, g, request
+from sqlalchemy import update
+from app import db
+from app.models import Workspace
+
+DEFAULT_TTL = 3600  # seconds
+DEFAULT_SIZE = 1024  # entries, memory backend only
+
+
+class MemoryCache:
+    """Thread-safe in-process LRU cache with per-entry expiry."""
+
+    def __init__(self, max_size: int = DEFAULT_SIZE):
+        self.max_size = max_size
+        self._data: 'OrderedDict[str, tuple]' = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[bytes]:
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                return None
+            expires_at, value = entry
+            if expires_at < time.monotonic():
+                del self._data[key]
+                return None
+            self._data.move_to_end(key)
+            return value
+
+    def set(self, key: str, value: bytes, ttl: int) -> None:
+        with self._lock:
+            self._data[key] = (time.monotonic() + ttl, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_size:
+                self._data.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+
+
+class RedisCache:
+    """Cache shared by all worker processes, stored in Redis."""
+
+    def __init__(self, url: str, prefix: str = 'recehku:response:'):
+        try:
+            import redis
+        except ImportError:
+            raise RuntimeError("RESPONSE_CACHE_BACKEND='redis' membutuhkan package redis (pip install redis)")
+        self.client = redis.Redis.from_url(url)
+        self.prefix = prefix
+
+    def get(self, key: str) -> Optional[bytes]:
+        return self.client.get(self.prefix + key)
+
+    def set(self, key: str, value: bytes, ttl: int) -> None:
+        self.client.set(self.prefix + key, value, ex=ttl)
+
+    def clear(self) -> None:
+        for key in self.client.scan_iter(self.prefix + '*'):
+            self.client.delete(key)
+
+
+def init_cache(app: Flask) -> None:
+    """Create the configured response cache backend for an app."""
+    backend = app.config.get('RESPONSE_CACHE_BACKEND', 'memory')
+
+    if backend == 'memory':
+        cache = MemoryCache(app.config.get('RESPONSE_CACHE_SIZE', DEFAULT_SIZE))
+    elif backend == 'redis':
+        cache = RedisCache(app.config['RESPONSE_CACHE_REDIS_URL'])
+    elif backend == 'none':
+        cache = None
+    else:
+        raise ValueError(f'RESPONSE_CACHE_BACKEND tidak dikenal: {backend}')
+
+    app.extensions['response_cache'] = cache
+
+
+def get_cache():
+    """Get the response cache of the current app (None when disabled)."""
+    return current_app.extensions.get('response_cache')
+
+
+def workspace_generation(workspace_id: int) -> Optional[int]:
+    """
+    Current cache generation of a workspace (None when it does not exist).
+
+    Read once per request and remembered until the request bumps it, so the
+    response cache and the category tree cache share one lookup.
+    """
+    generations = g.setdefault('cache_generations', {})
+    if workspace_id not in generations:
+        generations[workspace_id] = db.session.query(Workspace.cache_generation).filter(
+            Workspace.id == workspace_id
+        ).scalar()
+    return generations[workspace_id]
+
+
+def bump_workspace_generation(workspace_id: int) -> None:
+    """
+    Invalidate every cached response of a workspace.
+
+    Call before committing a write; the bump commits or rolls back together
+    with the data it invalidates.
+    """
+    g.pop('cache_generations', None)
+    db.session.execute(
+        update(Workspace)
+        .where(Workspace.id == workspace_id)
+        .values(cache_generation=Workspace.cache_generation + 1)
+        .execution_options(synchronize_session=False)
+    )
+
+
+def bump_workspace_generations(workspace_ids) -> None:
+    """
+    Invalidate the cached responses of several workspaces with one UPDATE.
+
+    Args:
+        workspace_ids: Workspace ids, or a select of them for data shared
+            between workspaces (gold prices)
+    """
+    g.pop('cache_generations', None)
+    db.session.execute(
+        update(Workspace)
+        .where(Workspace.id.in_(workspace_ids))
+        .values(cache_generation=Workspace.cache_generation + 1)
+        .execution_options(synchronize_session=False)
+    )
+
+
+def cached_response(f: Callable) -> Callable:
+    """
+    Cache successful JSON responses of a workspace-scoped GET endpoint.
+
+    Place below require_role so access is checked before a cached response
+    is served. The workspace is taken from the workspace_id query param.
+    """
+    @wraps(f)
+    def decorated_function(*args, **kwargs):
+        cache = get_cache()
+        workspace_id = request.args.get('workspace_id', type=int)
+        if cache is None or not workspace_id:
+            return f(*args, **kwargs)
+
+        generation = workspace_generation(workspace_id)
+        if generation is None:
+            return f(*args, **kwargs)
+
+        # Responses depend on "today" (current month, trends), so the date is part of the key
+        query = '&'.join(f'{k}={v}' for k, v in sorted(request.args.items(multi=True)))
+        key = f'{request.endpoint}:{workspace_id}:{generation}:{date.today().isoformat()}:{query}'
+
+        body = cache.get(key)
+        if body is not None:
+            response = current_app.response_class(body, status=200, mimetype=current_app.json.mimetype)
+            response.headers['X-Cache'] = 'HIT'
+            return response
+
+        rv = f(*args, **kwargs)
+        data, status = rv if isinstance(rv, tuple) else (rv, 200)
+        if status != 200 or not isinstance(data, dict):
+            return rv
+
+        response = current_app.json.response(data)
+        cache.set(key, response.get_data(), current_app.config.get('RESPONSE_CACHE_TTL', DEFAULT_TTL))
+        response.headers['X-Cache'] = 'MISS'
+        return response
+
+    return decorated_function
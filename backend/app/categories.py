@@ -0,0 +1,194 @@
+"""Category hierarchy of a workspace, loaded once and shared by budget and analytics code.
+
+get_category_tree returns an in-memory CategoryTree (id -> node and
+parent -> children indexes) built from a single query. Trees are cached per
+process under (workspace id, cache generation): every route that creates,
+updates or deletes categories bumps the workspace's generation in the same
+transaction, so each worker process looks up a fresh tree on its next
+request, exactly like the response cache. invalidate_category_tree frees
+the old trees of this process right away.
+"""
+from collections import defaultdict
+from typing import Any, Dict, Iterable, Iterator, List, Optional
+from app import db
+from app.models import Category
+from app.access import TTLCache
+from app.cache import workspace_generation
+
+# Trees of old generations are never looked up again; expiry only frees them
+EXPIRY = 3600  # seconds
+
+_trees = TTLCache(max_size=1000)
+
+
+class CategoryNode:
+    """A category without its ORM session: id, name, type and parent."""
+
+    def __init__(self, id: int, name: str, type: str, parent_id: Optional[int]):
+        self.id = id
+        self.name = name
+        self.type = type
+        self.parent_id = parent_id
+
+    def __repr__(self) -> str:
+        return f'<CategoryNode {self.id} {self.name}>'
+
+
+class CategoryTree:
+    """
+    Parent/child index over the categories of one workspace.
+
+    Categories whose parent is missing from the workspace are treated as
+    roots. Walks up the tree stop at cycles, which parent_id updates can
+    create.
+    """
+
+    def __init__(self, workspace_id: int, nodes: Iterable[CategoryNode]):
+        self.workspace_id = workspace_id
+        self.nodes: Dict[int, CategoryNode] = {node.id: node for node in nodes}
+        self._children: Dict[Optional[int], List[CategoryNode]] = defaultdict(list)
+        for node in self.nodes.values():
+            parent_id = node.parent_id if node.parent_id in self.nodes else None
+            self._children[parent_id].append(node)
+
+    def __contains__(self, category_id: Optional[int]) -> bool:
+        return category_id in self.nodes
+
+    def __iter__(self) -> Iterator[CategoryNode]:
+        return iter(self.nodes.values())
+
+    def __len__(self) -> int:
+        return len(self.nodes)
+
+    def get(self, category_id: Optional[int]) -> Optional[CategoryNode]:
+        return self.nodes.get(category_id)
+
+    def roots(self, category_type: Optional[str] = None) -> List[CategoryNode]:
+        """Top-level categories in id order, optionally of one type."""
+        return [node for node in self._children[None] if category_type is None or node.type == category_type]
+
+    def children(self, category_id: int) -> List[CategoryNode]:
+        """Direct children in id order."""
+        return self._children.get(category_id, [])
+
+    def ancestors(self, category_id: int) -> List[CategoryNode]:
+        """Parent, grandparent, ... up to the root."""
+        result = []
+        seen = {category_id}
+        node = self.nodes.get(category_id)
+        while node and node.parent_id in self.nodes and node.parent_id not in seen:
+            seen.add(node.parent_id)
+            node = self.nodes[node.parent_id]
+            result.append(node)
+        return result
+
+    def root(self, category_id: int) -> Optional[CategoryNode]:
+        """Top-level ancestor of a category (the category itself for roots)."""
+        ancestors = self.ancestors(category_id)
+        return ancestors[-1] if ancestors else self.nodes.get(category_id)
+
+    def descendants(self, category_id: int) -> List[CategoryNode]:
+        """All categories below one, depth first."""
+        result = []
+        seen = {category_id}
+        stack = list(reversed(self.children(category_id)))
+        while stack:
+            node = stack.pop()
+            if node.id in seen:
+                continue
+            seen.add(node.id)
+            result.append(node)
+            stack.extend(reversed(self.children(node.id)))
+        return result
+
+    def rollup(self, totals: Dict[int, Any]) -> Dict[int, Any]:
+        """
+        Add each category's total to all of its ancestors.
+
+        Args:
+            totals: Category id -> own total (ids outside the tree are ignored)
+
+        Returns:
+            Category id -> subtree total, for every category that has a total
+            itself or below it
+        """
+        result: Dict[int, Any] = {}
+        for category_id, total in totals.items():
+            if category_id not in self.nodes:
+                continue
+            for node in [self.nodes[category_id]] + self.ancestors(category_id):
+                result[node.id] = result[node.id] + total if node.id in result else total
+        return result
+
+    def nested(self, totals: Dict[int, Any], counts: Optional[Dict[int, int]] = None) -> List[Dict[str, Any]]:
+        """
+        Nest per-category totals into the tree, largest subtree first.
+
+        Only categories with a total themselves or below them are included.
+        Each node has category_id, category_name, type, total (its subtree),
+        own_total (the category alone), count when counts are given, and
+        children.
+        """
+        subtree_totals = self.rollup(totals)
+        subtree_counts = self.rollup(counts) if counts is not None else None
+
+        def build(nodes: List[CategoryNode]) -> List[Dict[str, Any]]:
+            result = []
+            for node in nodes:
+                if node.id not in subtree_totals:
+                    continue
+                entry = {
+                    'category_id': node.id,
+                    'category_name': node.name,
+                    'type': node.type,
+                    'total': subtree_totals[node.id],
+                    'own_total': totals.get(node.id, 0),
+                }
+                if subtree_counts is not None:
+                    entry['count'] = subtree_counts.get(node.id, 0)
+                entry['children'] = build(self.children(node.id))
+                result.append(entry)
+            result.sort(key=lambda entry: entry['total'], reverse=True)
+            return result
+
+        return build(self.roots())
+
+
+def load_category_tree(workspace_id: int) -> CategoryTree:
+    """Build the tree of a workspace with one query, bypassing the cache."""
+    rows = db.session.query(
+        Category.id,
+        Category.name,
+        Category.type,
+        Category.parent_id
+    ).filter(Category.workspace_id == workspace_id).order_by(Category.id)
+    return CategoryTree(workspace_id, [CategoryNode(*row) for row in rows])
+
+
+def get_category_tree(workspace_id: int, required_ids: Optional[Iterable[int]] = None) -> CategoryTree:
+    """
+    Get the (cached) category tree of a workspace.
+
+    Args:
+        workspace_id: Workspace id
+        required_ids: Category ids the caller is about to look up; the tree
+            is reloaded when one of them is missing from the cached copy
+    """
+    workspace_id = int(workspace_id)
+    key = (workspace_id, workspace_generation(workspace_id))
+    tree = _trees.get(key)
+    if tree is not None and required_ids is not None and any(
+        category_id is not None and category_id not in tree for category_id in required_ids
+    ):
+        tree = None
+
+    if tree is None:
+        tree = load_category_tree(workspace_id)
+        _trees.set(key, tree, EXPIRY)
+    return tree
+
+
+def invalidate_category_tree(workspace_id: int) -> None:
+    """Drop this process's cached trees of a workspace after its categories changed."""
+    workspace_id = int(workspace_id)
+    _trees.delete_where(lambda key: key[0] == workspace_id)
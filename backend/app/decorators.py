@@ -2,21 +2,14 @@
 from functools import wraps
 from flask import request, jsonify
 from flask_jwt_extended import get_jwt_identity
-from app.models import WorkspaceMember, Role, User
+from app.models import WorkspaceMember
+from app.access import get_workspace_role, user_is_owner
 from typing import List, Callable
 
 
 def get_user_role_in_workspace(user_id: int, workspace_id: int) -> str:
     """Get user's role name in a specific workspace."""
-    membership = WorkspaceMember.query.filter_by(
-        user_id=user_id,
-        workspace_id=workspace_id
-    ).first()
-
-    if not membership:
-        return None
-
-    return membership.role.name
+    return get_workspace_role(user_id, workspace_id)
 
 
 def check_workspace_permission(user_id: int, workspace_id: int, required_roles: List[str]) -> bool:
@@ -32,8 +25,7 @@ def check_workspace_permission(user_id: int, workspace_id: int, required_roles:
         True if user has permission, False otherwise
     """
     # Cek apakah user adalah Owner (Superadmin) - mereka bisa akses semua workspace
-    user = User.query.get(user_id)
-    if user and user.is_owner:
+    if user_is_owner(user_id):
         return True
 
     # Get user's role di workspace ini
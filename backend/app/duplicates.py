@@ -0,0 +1,214 @@
+"""Possible-duplicate detection for manual entry, bulk creation and imports.
+
+Every transaction stores a fingerprint: a hash of its workspace, account,
+date, amount and normalized description. Rows with equal fingerprints are
+flagged as possible duplicates. Lookups go through the (workspace_id,
+fingerprint) index, one IN query per batch.
+"""
+import hashlib
+import re
+from datetime import date
+from decimal import Decimal
+from typing import Any, Dict, Iterable, List, Optional
+from sqlalchemy import bindparam, func, update
+from app import db
+from app.models import Transaction
+
+BACKFILL_BATCH_SIZE = 1000
+
+
+def normalize_description(description: Optional[str]) -> str:
+    """Lowercase, drop punctuation and collapse whitespace ('Sarapan + Teningan' -> 'sarapan teningan')."""
+    text = re.sub(r'[^\w\s]', ' ', (description or '').lower())
+    return ' '.join(text.split())
+
+
+def transaction_fingerprint(workspace_id: int, account_id: int, transaction_date: date, amount: Any, description: Optional[str]) -> str:
+    """Fingerprint of one transaction, as stored in transactions.fingerprint."""
+    amount = Decimal(str(amount)).quantize(Decimal('0.01'))
+    key = f'{workspace_id}|{account_id}|{transaction_date.isoformat()}|{amount}|{normalize_description(description)}'
+    return hashlib.sha1(key.encode()).hexdigest()
+
+
+def fingerprint_of(transaction: Transaction) -> str:
+    """Fingerprint of an ORM transaction with its current values."""
+    return transaction_fingerprint(
+        transaction.workspace_id,
+        transaction.account_id,
+        transaction.transaction_date,
+        transaction.amount,
+        transaction.description
+    )
+
+
+def find_existing(workspace_id: int, fingerprints: Iterable[str], exclude_id: Optional[int] = None) -> Dict[str, List[int]]:
+    """
+    Ids of stored transactions per fingerprint, with one IN query.
+
+    Args:
+        workspace_id: Workspace to search
+        fingerprints: Fingerprints to look up
+        exclude_id: Transaction to leave out (the one being edited)
+    """
+    fingerprints = set(fingerprints)
+    if not fingerprints:
+        return {}
+
+    query = db.session.query(Transaction.fingerprint, Transaction.id).filter(
+        Transaction.workspace_id == workspace_id,
+        Transaction.fingerprint.in_(fingerprints)
+    )
+    if exclude_id:
+        query = query.filter(Transaction.id != exclude_id)
+
+    existing: Dict[str, List[int]] = {}
+    for fingerprint, transaction_id in query.order_by(Transaction.id):
+        existing.setdefault(fingerprint, []).append(transaction_id)
+    return existing
+
+
+def flag_duplicates(workspace_id: int, values: List[Dict[str, Any]], keys: Optional[List[Any]] = None,
+                    key_name: str = 'index', seen: Optional[Dict[str, Any]] = None) -> List[Dict[str, Any]]:
+    """
+    Fingerprint validated rows and flag possible duplicates.
+
+    Sets values[i]['fingerprint'] on every row. A row is flagged when a
+    stored transaction has the same fingerprint, or when an earlier row of
+    the same request does.
+
+    Args:
+        workspace_id: Workspace the rows belong to
+        values: Column values as returned by app.bulk.parse_transaction
+        keys: How each row is reported (request index, file line);
+            defaults to its position in values
+        key_name: Name of the key field in the flags
+        seen: Fingerprint -> key of rows already checked; pass the same
+            dict across batches to catch duplicates within a whole import
+
+    Returns:
+        One entry per flagged row: its key, matching transaction_ids and,
+        for repeats within the request, duplicate_of (key of the first row)
+    """
+    keys = list(range(len(values))) if keys is None else keys
+    seen = {} if seen is None else seen
+    for row in values:
+        row['fingerprint'] = transaction_fingerprint(
+            workspace_id,
+            row['account_id'],
+            row['transaction_date'],
+            row['amount'],
+            row.get('description')
+        )
+
+    existing = find_existing(workspace_id, [row['fingerprint'] for row in values])
+
+    flags = []
+    for key, row in zip(keys, values):
+        fingerprint = row['fingerprint']
+        flag = {}
+        if fingerprint in existing:
+            flag['transaction_ids'] = existing[fingerprint]
+        if fingerprint in seen:
+            flag['duplicate_of'] = seen[fingerprint]
+        else:
+            seen[fingerprint] = key
+        if flag:
+            flags.append({key_name: key, **flag})
+
+    return flags
+
+
+def duplicate_groups(workspace_id: int, limit: int = 100) -> List[Dict[str, Any]]:
+    """
+    Groups of stored transactions sharing a fingerprint, largest groups first.
+
+    Returns:
+        List of {'fingerprint', 'count', 'transaction_ids'}
+    """
+    groups = db.session.query(
+        Transaction.fingerprint,
+        func.count(Transaction.id)
+    ).filter(
+        Transaction.workspace_id == workspace_id,
+        Transaction.fingerprint.isnot(None)
+    ).group_by(Transaction.fingerprint).having(
+        func.count(Transaction.id) > 1
+    ).order_by(func.count(Transaction.id).desc(), Transaction.fingerprint).limit(limit).all()
+
+    ids = find_existing(workspace_id, [fingerprint for fingerprint, _ in groups])
+    return [
+        {'fingerprint': fingerprint, 'count': count, 'transaction_ids': ids.get(fingerprint, [])}
+        for fingerprint, count in groups
+    ]
+
+
+def _write_fingerprints(query, account_id: Optional[int] = None) -> int:
+    """
+    Recompute the fingerprints of the transactions a query selects.
+
+    Rows are read in id-keyset batches of BACKFILL_BATCH_SIZE, and each
+    batch is written with one executemany UPDATE before the next is read.
+
+    Args:
+        query: Query over the transactions to fingerprint
+        account_id: Fingerprint the rows as if they belonged to this account
+    """
+    query = query.with_entities(
+        Transaction.id,
+        Transaction.workspace_id,
+        Transaction.account_id,
+        Transaction.transaction_date,
+        Transaction.amount,
+        Transaction.description
+    ).order_by(Transaction.id)
+
+    table = Transaction.__table__
+    statement = update(table).where(table.c.id == bindparam('b_id'))
+    updated = 0
+    last_id = 0
+    while True:
+        rows = query.filter(Transaction.id > last_id).limit(BACKFILL_BATCH_SIZE).all()
+        if not rows:
+            return updated
+        db.session.execute(statement, [
+            {
+                'b_id': row.id,
+                'fingerprint': transaction_fingerprint(
+                    row.workspace_id,
+                    account_id or row.account_id,
+                    row.transaction_date,
+                    row.amount,
+                    row.description
+                )
+            }
+            for row in rows
+        ])
+        updated += len(rows)
+        last_id = rows[-1].id
+
+
+def backfill_fingerprints(workspace_id: Optional[int] = None) -> int:
+    """
+    Compute fingerprints for transactions that have none, in id-keyset batches.
+
+    Returns:
+        Number of transactions updated
+    """
+    query = db.session.query(Transaction).filter(Transaction.fingerprint.is_(None))
+    if workspace_id:
+        query = query.filter(Transaction.workspace_id == workspace_id)
+    return _write_fingerprints(query)
+
+
+def refingerprint_account(account_id: int, target_account_id: int) -> int:
+    """
+    Fingerprint an account's transactions for the account they are moving to.
+
+    Call before moving the transactions (merge_accounts), in the same
+    database transaction.
+
+    Returns:
+        Number of transactions updated
+    """
+    query = db.session.query(Transaction).filter(Transaction.account_id == account_id)
+    return _write_fingerprints(query, target_account_id)
@@ -0,0 +1,225 @@
+"""Gold price history reads and set-based writes of gold prices and settings.
+
+price_history serves per-source windows with day-over-day change computed
+by window functions, backed by the (source, date DESC) index.
+
+Both tables are written with INSERT ... ON CONFLICT DO UPDATE against their
+unique keys: (date, source) for gold_prices (uq_gold_prices_date_source)
+and (workspace_id, gold_type) for gold_price_settings
+(idx_gold_price_workspace_type). A backfill of several years of prices is
+one statement per batch instead of a lookup per row, and RETURNING tells
+which rows were created, updated or already up to date.
+"""
+from datetime import date, datetime
+from typing import Any, Dict, List, Optional
+from sqlalchemy import Boolean, func, literal_column, or_, select
+from sqlalchemy.orm import aliased
+from sqlalchemy.dialects import postgresql, sqlite
+from app import db
+from app.models import GoldPrice, GoldPriceSetting
+
+UPSERT_BATCH_SIZE = 1000
+
+
+def _insert(model):
+    """INSERT construct supporting ON CONFLICT for the current database."""
+    if db.engine.dialect.name == 'postgresql':
+        return postgresql.insert(model)
+    return sqlite.insert(model)
+
+
+def price_history(start: date, source: Optional[str] = None, limit: int = 30) -> List[Dict[str, Any]]:
+    """
+    Gold prices since a date, newest first, with the change per source.
+
+    previous_price and the changes compare each row with the previous
+    recorded day of the same source, computed with LAG in SQL. The last
+    row before start is read too, so the oldest row in the window has a
+    change as well.
+
+    Args:
+        start: First date included
+        source: Only this source (ANTAM, UBS, ...); all sources when None
+        limit: Maximum number of rows per source
+    """
+    before = aliased(GoldPrice)
+    # Day before the window of the same source, found through the (source, date) index
+    previous_day = select(func.max(before.date)).where(
+        before.source == GoldPrice.source,
+        before.date < start
+    ).scalar_subquery()
+
+    filters = [GoldPrice.date >= func.coalesce(previous_day, start)]
+    if source:
+        filters.append(GoldPrice.source == source)
+
+    by_source = {'partition_by': GoldPrice.source, 'order_by': GoldPrice.date}
+    previous_price = func.lag(GoldPrice.price_per_gram).over(**by_source)
+    previous_buyback = func.lag(GoldPrice.buyback_price).over(**by_source)
+    lagged = select(
+        GoldPrice.id,
+        GoldPrice.date,
+        GoldPrice.price_per_gram,
+        GoldPrice.buyback_price,
+        GoldPrice.source,
+        GoldPrice.notes,
+        GoldPrice.created_at,
+        GoldPrice.updated_at,
+        previous_price.label('previous_price'),
+        (GoldPrice.price_per_gram - previous_price).label('price_change'),
+        ((GoldPrice.price_per_gram - previous_price) * 100 / func.nullif(previous_price, 0)).label('price_change_percent'),
+        (GoldPrice.buyback_price - previous_buyback).label('buyback_change'),
+        func.row_number().over(partition_by=GoldPrice.source, order_by=GoldPrice.date.desc()).label('recency')
+    ).where(*filters).subquery('lagged_gold_price')
+
+    rows = db.session.execute(
+        select(lagged).where(
+            lagged.c.date >= start,
+            lagged.c.recency <= limit
+        ).order_by(lagged.c.date.desc(), lagged.c.source)
+    )
+
+    def number(value) -> Optional[float]:
+        return float(value) if value is not None else None
+
+    return [
+        {
+            'id': row.id,
+            'date': row.date.isoformat(),
+            'price_per_gram': float(row.price_per_gram),
+            'buyback_price': number(row.buyback_price),
+            'source': row.source,
+            'notes': row.notes,
+            'previous_price': number(row.previous_price),
+            'price_change': number(row.price_change),
+            'price_change_percent': round(float(row.price_change_percent), 2) if row.price_change_percent is not None else None,
+            'buyback_change': number(row.buyback_change),
+            'created_at': row.created_at.isoformat() if row.created_at else None,
+            'updated_at': row.updated_at.isoformat() if row.updated_at else None
+        }
+        for row in rows
+    ]
+
+
+def upsert_gold_prices(rows: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """
+    Insert or update daily gold prices keyed by (date, source).
+
+    An existing row is only rewritten when its price, buyback price or notes
+    differ; a missing buyback price or notes keeps the stored one. When a
+    key appears more than once, the last row wins.
+
+    Args:
+        rows: Dicts with date, price_per_gram, source and optionally
+            buyback_price and notes
+
+    Returns:
+        Dict with created, updated and skipped counts and the sources written
+    """
+    latest: Dict[tuple, Dict[str, Any]] = {}
+    for row in rows:
+        latest[(row['date'], row['source'])] = row
+    skipped = len(rows) - len(latest)
+
+    now = datetime.utcnow()
+    values = [
+        {
+            'date': row['date'],
+            'source': row['source'],
+            'price_per_gram': row['price_per_gram'],
+            'buyback_price': row.get('buyback_price'),
+            'notes': row.get('notes'),
+            'created_at': now,
+            'updated_at': now
+        }
+        for row in latest.values()
+    ]
+
+    table = GoldPrice.__table__
+    statement = _insert(table)
+    excluded = statement.excluded
+    buyback_price = func.coalesce(excluded.buyback_price, table.c.buyback_price)
+    notes = func.coalesce(excluded.notes, table.c.notes)
+    statement = statement.on_conflict_do_update(
+        index_elements=[table.c.date, table.c.source],
+        set_={
+            'price_per_gram': excluded.price_per_gram,
+            'buyback_price': buyback_price,
+            'notes': notes,
+            'updated_at': excluded.updated_at
+        },
+        # Leave identical rows alone, so they are not returned and count as skipped
+        where=or_(
+            table.c.price_per_gram.is_distinct_from(excluded.price_per_gram),
+            table.c.buyback_price.is_distinct_from(buyback_price),
+            table.c.notes.is_distinct_from(notes)
+        )
+    )
+    if db.engine.dialect.name == 'postgresql':
+        # A freshly inserted row version has no deleting transaction yet
+        inserted = literal_column('(xmax = 0)', Boolean)
+    else:
+        # SQLite has no xmax: inserted rows carry this statement's
+        # timestamp, updated rows keep their created_at
+        inserted = table.c.created_at == now
+    statement = statement.returning(table.c.source, inserted.label('inserted'))
+
+    created = updated = 0
+    sources = set()
+    for start in range(0, len(values), UPSERT_BATCH_SIZE):
+        batch = values[start:start + UPSERT_BATCH_SIZE]
+        written = db.session.execute(statement.values(batch)).all()
+        for source, was_inserted in written:
+            sources.add(source)
+            if was_inserted:
+                created += 1
+            else:
+                updated += 1
+        skipped += len(batch) - len(written)
+
+    return {'created': created, 'updated': updated, 'skipped': skipped, 'sources': sources}
+
+
+def upsert_gold_price_settings(workspace_id: int, rows: List[Dict[str, Any]], user_id: int, now: datetime) -> int:
+    """
+    Insert or update the gold price settings of a workspace in one statement.
+
+    Args:
+        workspace_id: Workspace id
+        rows: Dicts with gold_type, buy_price, buyback_price and source_link
+        user_id: User recorded as updated_by
+        now: Timestamp for created_at/updated_at
+
+    Returns:
+        Number of settings written
+    """
+    if not rows:
+        return 0
+
+    table = GoldPriceSetting.__table__
+    statement = _insert(table)
+    excluded = statement.excluded
+    statement = statement.values([
+        {
+            'workspace_id': workspace_id,
+            'gold_type': row['gold_type'],
+            'buy_price': row['buy_price'],
+            'buyback_price': row['buyback_price'],
+            'source_link': row.get('source_link'),
+            'updated_by': user_id,
+            'created_at': now,
+            'updated_at': now
+        }
+        for row in {row['gold_type']: row for row in rows}.values()
+    ]).on_conflict_do_update(
+        index_elements=[table.c.workspace_id, table.c.gold_type],
+        set_={
+            'buy_price': excluded.buy_price,
+            'buyback_price': excluded.buyback_price,
+            'source_link': excluded.source_link,
+            'updated_by': excluded.updated_by,
+            'updated_at': excluded.updated_at
+        }
+    ).returning(table.c.id)
+
+    return len(db.session.execute(statement).all())
@@ -0,0 +1,428 @@
+"""Streaming CSV/XLSX transaction import.
+
+Rows are read lazily from the file, mapped to transactions with a column
+mapping config, and inserted in batches through app.bulk. Categories and
+accounts of the workspace are loaded once and resolved in memory; names
+that do not exist yet are created once, not looked up per row.
+
+Mapping config (all keys optional, see DEFAULT_MAPPING):
+    columns           - transaction field -> column header in the file
+    date_format       - strptime format of the date column
+    decimal_separator - '.' (1,234.50) or ',' (1.234,50)
+    default_type      - type used when there is no type column
+    type_values       - file value -> INCOME/EXPENSE/TRANSFER (e.g. {"DB": "EXPENSE"})
+    signed_amounts    - negative amounts are EXPENSE, positive INCOME
+    categories        - file category name -> RecehKu category name
+    accounts          - file account name -> RecehKu account name
+    default_category  - category used when the row has none
+    create_missing    - create unknown categories and accounts
+"""
+import csv
+import io
+import re
+from datetime import date, datetime
+from decimal import Decimal, InvalidOperation
+from itertools import islice
+from typing import Any, Callable, Dict, IO, Iterator, List, Optional, Tuple
+from app import db
+from app.models import Account, Category
+from app.ledger import create_balance
+from app.bulk import parse_transaction, insert_transactions
+from app.cache import bump_workspace_generation
+from app.duplicates import flag_duplicates
+
+DEFAULT_BATCH_SIZE = 1000
+
+# Row errors (and duplicate flags) kept in the result; the rest are only counted
+MAX_REPORTED_ERRORS = 100
+
+DEFAULT_MAPPING = {
+    'columns': {
+        'date': 'date',
+        'description': 'description',
+        'amount': 'amount',
+        'type': 'type',
+        'category': 'category',
+        'account': 'account',
+        'transfer_to': 'transfer_to',
+    },
+    'date_format': '%Y-%m-%d',
+    'decimal_separator': '.',
+    'default_type': 'EXPENSE',
+    'type_values': {},
+    'signed_amounts': False,
+    'categories': {},
+    'accounts': {},
+    'default_category': None,
+    'create_missing': True,
+}
+
+REQUIRED_COLUMNS = ('date', 'amount', 'account')
+
+
+def load_mapping(config: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+    """
+    Merge a mapping config over DEFAULT_MAPPING.
+
+    Raises:
+        ValueError: Unknown keys or invalid values
+    """
+    config = config or {}
+    unknown = set(config) - set(DEFAULT_MAPPING)
+    if unknown:
+        raise ValueError(f'Key mapping tidak dikenal: {", ".join(sorted(unknown))}')
+
+    mapping = {**DEFAULT_MAPPING, **config}
+    mapping['columns'] = {**DEFAULT_MAPPING['columns'], **config.get('columns', {})}
+
+    unknown = set(mapping['columns']) - set(DEFAULT_MAPPING['columns'])
+    if unknown:
+        raise ValueError(f'Kolom mapping tidak dikenal: {", ".join(sorted(unknown))}')
+    if mapping['decimal_separator'] not in ('.', ','):
+        raise ValueError("decimal_separator harus '.' atau ','")
+    if mapping['default_type'] not in ('INCOME', 'EXPENSE'):
+        raise ValueError('default_type harus INCOME atau EXPENSE')
+    if any(value not in ('INCOME', 'EXPENSE', 'TRANSFER') for value in mapping['type_values'].values()):
+        raise ValueError('type_values harus berisi INCOME, EXPENSE atau TRANSFER')
+
+    return mapping
+
+
+def read_rows(stream: IO[bytes], filename: str = '') -> Iterator[Dict[str, Any]]:
+    """
+    Iterate over the data rows of a CSV or XLSX file as {header: value} dicts.
+
+    CSV is decoded incrementally (UTF-8, optional BOM). XLSX needs the
+    openpyxl package and is read in read-only (streaming) mode.
+    """
+    if filename.lower().endswith('.xlsx'):
+        try:
+            import openpyxl
+        except ImportError:
+            raise RuntimeError('Import XLSX membutuhkan package openpyxl (pip install openpyxl)')
+
+        workbook = openpyxl.load_workbook(stream, read_only=True, data_only=True)
+        try:
+            rows = workbook.active.iter_rows(values_only=True)
+            header = [str(cell).strip() if cell is not None else '' for cell in next(rows, [])]
+            for values in rows:
+                yield dict(zip(header, values))
+        finally:
+            workbook.close()
+        return
+
+    text = io.TextIOWrapper(stream, encoding='utf-8-sig', newline='')
+    sample = text.read(4096)
+    try:
+        dialect = csv.Sniffer().sniff(sample, delimiters=',;\t')
+    except csv.Error:
+        dialect = csv.excel
+
+    # Re-join the sniffed sample with the rest of the stream without rewinding
+    lines = _chain_text(sample, text)
+    reader = csv.DictReader(lines, dialect=dialect)
+    if reader.fieldnames:
+        reader.fieldnames = [name.strip() for name in reader.fieldnames]
+    yield from reader
+
+
+def _chain_text(head: str, rest: IO[str]) -> Iterator[str]:
+    """Lines of head followed by the remaining stream, for csv.reader."""
+    tail = rest.readline()
+    yield from io.StringIO(head + tail)
+    yield from rest
+
+
+def parse_amount(value: Any, decimal_separator: str = '.') -> Decimal:
+    """Parse an amount such as 'Rp 1.234.567,50', '(25,000)' or 1234.5."""
+    if isinstance(value, (int, float, Decimal)):
+        return Decimal(str(value))
+
+    text = str(value or '').strip()
+    negative = (text.startswith('(') and text.endswith(')')) or '-' in text
+    thousands = '.' if decimal_separator == ',' else ','
+    text = re.sub(r'[^0-9' + re.escape(decimal_separator) + re.escape(thousands) + ']', '', text)
+    text = text.replace(thousands, '').replace(decimal_separator, '.')
+    if not text:
+        raise InvalidOperation(value)
+
+    amount = Decimal(text)
+    return -amount if negative else amount
+
+
+def parse_date(value: Any, date_format: str) -> date:
+    """Parse a date cell (string, or a date/datetime from XLSX)."""
+    if isinstance(value, datetime):
+        return value.date()
+    if isinstance(value, date):
+        return value
+    return datetime.strptime(str(value).strip(), date_format).date()
+
+
+class Resolver:
+    """
+    In-memory name -> id lookup for a workspace's categories and accounts.
+
+    Loads both tables once. Unknown names are created on first use when
+    the mapping allows it; in dry-run mode they get placeholder ids instead.
+    """
+
+    def __init__(self, workspace_id: int, mapping: Dict[str, Any], dry_run: bool = False):
+        self.workspace_id = workspace_id
+        self.mapping = mapping
+        self.dry_run = dry_run
+        self.created_categories: List[str] = []
+        self.created_accounts: List[str] = []
+
+        self.categories: Dict[Tuple[str, str], int] = {}
+        for category in Category.query.filter_by(workspace_id=workspace_id).order_by(Category.id):
+            self.categories.setdefault((category.name.lower(), category.type), category.id)
+
+        self.accounts: Dict[str, int] = {}
+        for account in Account.query.filter_by(workspace_id=workspace_id).order_by(Account.id):
+            self.accounts.setdefault(account.name.lower(), account.id)
+
+        self.category_ids = set(self.categories.values())
+        self.account_ids = set(self.accounts.values())
+        self._placeholder = 0
+
+    def _new_id(self) -> int:
+        self._placeholder -= 1
+        return self._placeholder
+
+    def _category_name(self, name: Optional[str]) -> Optional[str]:
+        return self.mapping['categories'].get(name, name) or self.mapping['default_category']
+
+    def _account_name(self, name: Optional[str]) -> Optional[str]:
+        return self.mapping['accounts'].get(name, name)
+
+    def has_category(self, name: Optional[str], txn_type: str) -> bool:
+        """Whether category() would return an id, without creating anything."""
+        name = self._category_name(name)
+        if not name or txn_type not in ('INCOME', 'EXPENSE'):
+            return False
+        return (name.lower(), txn_type) in self.categories or self.mapping['create_missing']
+
+    def has_account(self, name: Optional[str]) -> bool:
+        """Whether account() would return an id, without creating anything."""
+        name = self._account_name(name)
+        if not name:
+            return False
+        return name.lower() in self.accounts or self.mapping['create_missing']
+
+    def same_account(self, name: Optional[str], other: Optional[str]) -> bool:
+        return (self._account_name(name) or '').lower() == (self._account_name(other) or '').lower()
+
+    def category(self, name: Optional[str], txn_type: str) -> Optional[int]:
+        name = self._category_name(name)
+        if not name or txn_type not in ('INCOME', 'EXPENSE'):
+            return None
+
+        key = (name.lower(), txn_type)
+        if key not in self.categories:
+            if not self.mapping['create_missing']:
+                return None
+            if self.dry_run:
+                category_id = self._new_id()
+            else:
+                category = Category(workspace_id=self.workspace_id, name=name, type=txn_type)
+                db.session.add(category)
+                db.session.flush()
+                category_id = category.id
+            self.categories[key] = category_id
+            self.category_ids.add(category_id)
+            self.created_categories.append(name)
+
+        return self.categories[key]
+
+    def account(self, name: Optional[str]) -> Optional[int]:
+        name = self._account_name(name)
+        if not name:
+            return None
+
+        key = name.lower()
+        if key not in self.accounts:
+            if not self.mapping['create_missing']:
+                return None
+            if self.dry_run:
+                account_id = self._new_id()
+            else:
+                account = Account(
+                    workspace_id=self.workspace_id,
+                    name=name,
+                    type='Cash' if key == 'cash' else 'Bank',
+                    initial_balance=Decimal('0')
+                )
+                create_balance(account)
+                db.session.add(account)
+                db.session.flush()
+                account_id = account.id
+            self.accounts[key] = account_id
+            self.account_ids.add(account_id)
+            self.created_accounts.append(name)
+
+        return self.accounts[key]
+
+
+def map_row(raw: Dict[str, Any], mapping: Dict[str, Any], resolver: Resolver) -> Dict[str, Any]:
+    """
+    Turn one file row into a transaction dict for parse_transaction.
+
+    Categories and accounts are only resolved (and created when missing)
+    once the row's type, amount, date and names have been checked.
+
+    Raises:
+        ValueError: The row cannot be mapped or is invalid
+    """
+    columns = mapping['columns']
+
+    def cell(field: str) -> Any:
+        value = raw.get(columns[field])
+        return value.strip() if isinstance(value, str) else value
+
+    try:
+        amount = parse_amount(cell('amount'), mapping['decimal_separator'])
+    except InvalidOperation:
+        raise ValueError(f'Jumlah tidak valid: {cell("amount")}')
+
+    try:
+        txn_date = parse_date(cell('date'), mapping['date_format'])
+    except (TypeError, ValueError):
+        raise ValueError(f'Tanggal tidak valid: {cell("date")}')
+
+    type_value = cell('type')
+    if type_value:
+        txn_type = mapping['type_values'].get(type_value, str(type_value).upper())
+    elif mapping['signed_amounts']:
+        txn_type = 'EXPENSE' if amount < 0 else 'INCOME'
+    else:
+        txn_type = mapping['default_type']
+
+    # Check the row before resolving names, so a rejected row creates no category or account
+    # (same messages as app.bulk.parse_transaction)
+    if txn_type not in ('INCOME', 'EXPENSE', 'TRANSFER'):
+        raise ValueError('Type must be INCOME, EXPENSE, or TRANSFER')
+    if amount == 0:
+        raise ValueError('Amount must be positive')
+
+    account_name = cell('account')
+    transfer_to = cell('transfer_to')
+
+    if not resolver.has_account(account_name):
+        raise ValueError('Invalid account' if account_name else 'account_id harus diisi')
+    if txn_type == 'TRANSFER':
+        if not transfer_to:
+            raise ValueError('transfer_to_account_id is required for TRANSFER')
+        if not resolver.has_account(transfer_to):
+            raise ValueError('Invalid transfer account')
+        if resolver.same_account(account_name, transfer_to):
+            raise ValueError('Cannot transfer to the same account')
+    elif not resolver.has_category(cell('category'), txn_type):
+        raise ValueError('category_id is required for INCOME and EXPENSE')
+
+    return {
+        'account_id': resolver.account(account_name),
+        'transfer_to_account_id': resolver.account(transfer_to) if txn_type == 'TRANSFER' else None,
+        'category_id': resolver.category(cell('category'), txn_type),
+        'type': txn_type,
+        'amount': abs(amount),
+        'transaction_date': txn_date.isoformat(),
+        'description': cell('description') or ''
+    }
+
+
+def import_transactions(workspace_id: int, rows: Iterator[Dict[str, Any]], mapping: Dict[str, Any],
+                        batch_size: int = DEFAULT_BATCH_SIZE, dry_run: bool = False,
+                        skip_duplicates: bool = False,
+                        progress: Optional[Callable[[Dict[str, Any]], None]] = None) -> Dict[str, Any]:
+    """
+    Import file rows into a workspace in batches.
+
+    Blank rows are ignored. Invalid rows are skipped and reported by line
+    number (the header is line 1). Rows matching a stored transaction or an
+    earlier row of the file are reported as possible duplicates. Creating a
+    category or account bumps the workspace's cache generation, even when
+    no row is inserted. The caller commits, or rolls back for a dry run.
+
+    Args:
+        workspace_id: Target workspace
+        rows: Rows from read_rows
+        mapping: Config from load_mapping
+        batch_size: Rows validated and inserted per batch
+        dry_run: Validate and resolve only; nothing is written
+        skip_duplicates: Do not import rows flagged as possible duplicates
+        progress: Called with the running totals after every batch
+
+    Returns:
+        Dict with rows_read, imported, error_count, errors, duplicate_count,
+        possible_duplicates and the names of created categories and accounts
+    """
+    resolver = Resolver(workspace_id, mapping, dry_run)
+    result = {
+        'rows_read': 0,
+        'imported': 0,
+        'error_count': 0,
+        'errors': [],
+        'duplicate_count': 0,
+        'possible_duplicates': [],
+        'dry_run': dry_run
+    }
+    # Fingerprint -> first line it was seen on, for duplicates within the file
+    seen: Dict[str, int] = {}
+
+    def report(line: int, error: str) -> None:
+        result['error_count'] += 1
+        if len(result['errors']) < MAX_REPORTED_ERRORS:
+            result['errors'].append({'line': line, 'error': error})
+
+    rows = iter(rows)
+    line = 1
+    while True:
+        batch = list(islice(rows, batch_size))
+        if not batch:
+            break
+
+        if line == 1:
+            missing = [mapping['columns'][field] for field in REQUIRED_COLUMNS if mapping['columns'][field] not in batch[0]]
+            if missing:
+                raise ValueError(f'Kolom tidak ditemukan di file: {", ".join(missing)}')
+
+        values = []
+        lines = []
+        blank = 0
+        for raw in batch:
+            line += 1
+            if all(value in (None, '') for value in raw.values()):
+                blank += 1
+                continue
+            try:
+                parsed, error = parse_transaction(map_row(raw, mapping, resolver), resolver.account_ids, resolver.category_ids)
+            except ValueError as e:
+                parsed, error = None, str(e)
+            if error:
+                report(line, error)
+            else:
+                values.append(parsed)
+                lines.append(line)
+
+        duplicates = flag_duplicates(workspace_id, values, lines, 'line', seen)
+        result['duplicate_count'] += len(duplicates)
+        result['possible_duplicates'].extend(duplicates[:MAX_REPORTED_ERRORS - len(result['possible_duplicates'])])
+        if skip_duplicates and duplicates:
+            skipped = {flag['line'] for flag in duplicates}
+            values = [row for line_number, row in zip(lines, values) if line_number not in skipped]
+
+        if not dry_run:
+            insert_transactions(workspace_id, values)
+
+        result['rows_read'] += len(batch) - blank
+        result['imported'] += len(values)
+        if progress:
+            progress(result)
+
+    if not dry_run and (resolver.created_categories or resolver.created_accounts):
+        bump_workspace_generation(workspace_id)
+
+    result['categories_created'] = resolver.created_categories
+    result['accounts_created'] = resolver.created_accounts
+    return result
@@ -0,0 +1,193 @@
+"""Per-account balance ledger maintained incrementally on every transaction write."""
+from decimal import Decimal
+from collections import defaultdict
+from typing import Dict, List, Optional, Tuple, Any
+from sqlalchemy import bindparam, update
+from sqlalchemy.orm import joinedload
+from app import db
+from app.models import Account, AccountBalance, Transaction
+from app.balances import ZERO, TYPE_COLUMNS, BALANCE_FIELDS, compute_totals, empty_totals
+from app.rollups import post_rollup, post_rollups
+
+
+def _post(account_id: int, values: Dict[str, Any]) -> None:
+    """Apply column deltas to one ledger row as a single UPDATE."""
+    db.session.execute(
+        update(AccountBalance)
+        .where(AccountBalance.account_id == account_id)
+        .values(**values)
+        .execution_options(synchronize_session=False)
+    )
+
+
+def _ledger_deltas(account_id: int, transfer_to_account_id: Optional[int], txn_type: str, amount: Any) -> List[Tuple[int, Dict[str, Any]]]:
+    """Per-account column deltas of one transaction, as (account_id, {field: delta}) pairs."""
+    amount = Decimal(str(amount))
+
+    main = {'transaction_count': 1}
+    column = TYPE_COLUMNS.get(txn_type)
+    if column:
+        main[column] = amount
+    deltas = [(account_id, main)]
+
+    if transfer_to_account_id and transfer_to_account_id != account_id:
+        incoming = {'transaction_count': 1}
+        if txn_type == 'TRANSFER':
+            incoming['transfer_in'] = amount
+        deltas.append((transfer_to_account_id, incoming))
+    elif transfer_to_account_id and txn_type == 'TRANSFER':
+        # Self-transfer (e.g. after merging two accounts): counted once, both legs booked
+        main['transfer_in'] = amount
+
+    return deltas
+
+
+def post_transaction(account_id: int, transfer_to_account_id: Optional[int], txn_type: str, amount: Any, sign: int = 1) -> None:
+    """
+    Add (sign=1) or remove (sign=-1) one transaction's effect on the ledger.
+
+    Rows are updated with relative UPDATE statements so concurrent writers never
+    overwrite each other, and the change commits or rolls back together with the
+    transaction row itself. Accounts without a ledger row are skipped; the
+    balance service computes their totals on read until rebuild_balances.py
+    seeds them.
+    """
+    for ledger_account_id, delta in _ledger_deltas(account_id, transfer_to_account_id, txn_type, amount):
+        _post(ledger_account_id, {
+            field: getattr(AccountBalance, field) + value * sign
+            for field, value in delta.items()
+        })
+
+
+def apply_transaction(transaction: Transaction) -> None:
+    """Book a new or updated transaction into the ledger and the daily rollups."""
+    post_transaction(transaction.account_id, transaction.transfer_to_account_id, transaction.type, transaction.amount, 1)
+    post_rollup(transaction, 1)
+
+
+def revert_transaction(transaction: Transaction) -> None:
+    """
+    Remove a transaction's current effect from the ledger and the daily rollups.
+
+    Must be called before the transaction is deleted or its account, type,
+    amount, category or date are changed, since it reads the values being
+    reverted.
+    """
+    post_transaction(transaction.account_id, transaction.transfer_to_account_id, transaction.type, transaction.amount, -1)
+    post_rollup(transaction, -1)
+
+
+def apply_transactions(rows: List[Dict[str, Any]]) -> None:
+    """
+    Book many newly inserted transactions into the ledger and the daily rollups.
+
+    Deltas are summed per account in Python and written with one executemany
+    UPDATE, so the statement count does not grow with the number of rows.
+
+    Args:
+        rows: Transaction column values (account_id, transfer_to_account_id,
+            type, amount, plus the rollup key columns)
+    """
+    totals = defaultdict(empty_totals)
+    for row in rows:
+        for account_id, delta in _ledger_deltas(row['account_id'], row.get('transfer_to_account_id'), row['type'], row['amount']):
+            for field, value in delta.items():
+                totals[account_id][field] += value
+
+    if totals:
+        table = AccountBalance.__table__
+        db.session.execute(
+            update(table)
+            .where(table.c.account_id == bindparam('b_account_id'))
+            .values({field: table.c[field] + bindparam(f'd_{field}') for field in BALANCE_FIELDS}),
+            [
+                {'b_account_id': account_id, **{f'd_{field}': value for field, value in fields.items()}}
+                for account_id, fields in totals.items()
+            ]
+        )
+
+    post_rollups(rows)
+
+
+def create_balance(account: Account) -> AccountBalance:
+    """Attach an empty ledger row to a newly created account."""
+    balance = AccountBalance(
+        workspace_id=account.workspace_id,
+        income=ZERO,
+        expense=ZERO,
+        transfer_in=ZERO,
+        transfer_out=ZERO,
+        transaction_count=0
+    )
+    account.balance = balance
+    return balance
+
+
+def rebuild_account(account_id: int) -> None:
+    """Recompute one account's ledger row from raw transactions."""
+    account = Account.query.get(account_id)
+    totals = compute_totals(account.workspace_id, [account_id])[account_id]
+
+    if account.balance is None:
+        create_balance(account)
+    for field, value in totals.items():
+        setattr(account.balance, field, value)
+    db.session.flush()
+
+
+def rebuild_balances(workspace_id: Optional[int] = None) -> int:
+    """
+    Recompute ledger rows from raw transactions.
+
+    Args:
+        workspace_id: Limit to one workspace (default: all workspaces)
+
+    Returns:
+        Number of accounts rebuilt
+    """
+    query = Account.query.options(joinedload(Account.balance))
+    if workspace_id:
+        query = query.filter_by(workspace_id=workspace_id)
+    accounts = query.all()
+
+    totals = compute_totals(workspace_id)
+    for account in accounts:
+        if account.balance is None:
+            create_balance(account)
+        for field, value in totals.get(account.id, empty_totals()).items():
+            setattr(account.balance, field, value)
+
+    db.session.flush()
+    return len(accounts)
+
+
+def verify_balances(workspace_id: Optional[int] = None) -> List[Dict[str, Any]]:
+    """
+    Compare ledger rows against raw transactions.
+
+    Returns:
+        List of mismatches, one entry per account and field
+    """
+    query = Account.query.options(joinedload(Account.balance))
+    if workspace_id:
+        query = query.filter_by(workspace_id=workspace_id)
+    accounts = query.all()
+
+    totals = compute_totals(workspace_id)
+    mismatches = []
+    for account in accounts:
+        if account.balance is None:
+            mismatches.append({'account_id': account.id, 'field': None, 'ledger': None, 'actual': None})
+            continue
+        for field in BALANCE_FIELDS:
+            ledger_value = getattr(account.balance, field)
+            actual_value = totals.get(account.id, empty_totals())[field]
+            if ledger_value != actual_value:
+                mismatches.append({
+                    'account_id': account.id,
+                    'field': field,
+                    'ledger': ledger_value,
+                    'actual': actual_value
+                })
+
+    return mismatches
@@ -28,6 +28,7 @@ class User(db.Model):
     hashed_password = db.Column(db.String(255), nullable=False)
     name = db.Column(db.String(100), nullable=False)
     is_owner = db.Column(db.Boolean, default=False, nullable=False)  # Super Admin flag
+    membership_version = db.Column(db.Integer, default=0, server_default='0', nullable=False)  # Bumped on role changes, checked against JWT role claims
     profile_picture = db.Column(db.String(255), nullable=True)  # Path to profile picture
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
 
@@ -44,6 +45,7 @@ class Workspace(db.Model):
 
     id = db.Column(db.Integer, primary_key=True)
     name = db.Column(db.String(100), nullable=False)
+    cache_generation = db.Column(db.Integer, default=0, server_default='0', nullable=False)  # Bumped on every data write, see app/cache.py
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
 
     # Relationships
@@ -95,11 +97,32 @@ class Account(db.Model):
     workspace = db.relationship('Workspace', back_populates='accounts')
     transactions = db.relationship('Transaction', foreign_keys='Transaction.account_id', back_populates='account', lazy='dynamic')
     transfer_transactions = db.relationship('Transaction', foreign_keys='Transaction.transfer_to_account_id', back_populates='transfer_to_account', lazy='dynamic')
+    balance = db.relationship('AccountBalance', back_populates='account', uselist=False, cascade='all, delete-orphan')
 
     def __repr__(self) -> str:
         return f'<Account {self.name}>'
 
 
+class AccountBalance(db.Model):
+    """Materialized per-account totals, maintained incrementally by the transaction write path."""
+    __tablename__ = 'account_balances'
+
+    account_id = db.Column(db.Integer, db.ForeignKey('accounts.id', ondelete='CASCADE'), primary_key=True)
+    workspace_id = db.Column(db.Integer, db.ForeignKey('workspaces.id', ondelete='CASCADE'), nullable=False, index=True)
+    income = db.Column(db.Numeric(15, 2), default=0, nullable=False)  # Sum of INCOME
+    expense = db.Column(db.Numeric(15, 2), default=0, nullable=False)  # Sum of EXPENSE
+    transfer_in = db.Column(db.Numeric(15, 2), default=0, nullable=False)  # Sum of TRANSFER received
+    transfer_out = db.Column(db.Numeric(15, 2), default=0, nullable=False)  # Sum of TRANSFER sent
+    transaction_count = db.Column(db.Integer, default=0, nullable=False)  # Transactions touching this account
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+    # Relationships
+    account = db.relationship('Account', back_populates='balance')
+
+    def __repr__(self) -> str:
+        return f'<AccountBalance account_id={self.account_id}>'
+
+
 class Category(db.Model):
     """Category model for organizing transactions."""
     __tablename__ = 'categories'
@@ -123,6 +146,31 @@ class Category(db.Model):
 class Transaction(db.Model):
     """Transaction model for recording financial transactions."""
     __tablename__ = 'transactions'
+    __table_args__ = (
+        # Transaction list and date-range scans; also serves ORDER BY transaction_date DESC, id DESC
+        db.Index('idx_transaction_workspace_date', 'workspace_id', 'transaction_date', 'id'),
+        # Income/expense totals and trends per workspace
+        db.Index('idx_transaction_workspace_type_date', 'workspace_id', 'type', 'transaction_date',
+                 postgresql_include=['amount', 'category_id']),
+        # Per-account balances
+        db.Index('idx_transaction_account_type', 'account_id', 'type',
+                 postgresql_include=['amount']),
+        db.Index('idx_transaction_transfer_to', 'transfer_to_account_id', 'type',
+                 postgresql_include=['amount'],
+                 postgresql_where=db.text('transfer_to_account_id IS NOT NULL')),
+        # Budget realization and recommendations per category
+        db.Index('idx_transaction_category_type_date', 'category_id', 'type', 'transaction_date',
+                 postgresql_include=['amount']),
+        # Duplicate detection, see app/duplicates.py
+        db.Index('idx_transaction_fingerprint', 'workspace_id', 'fingerprint'),
+        # Description search (PostgreSQL only), see app/search.py; the trigram index needs pg_trgm
+        db.Index('idx_transaction_description_fts',
+                 db.text("to_tsvector('simple', coalesce(description, ''))"),
+                 postgresql_using='gin').ddl_if(dialect='postgresql'),
+        db.Index('idx_transaction_description_trgm', 'description',
+                 postgresql_using='gin',
+                 postgresql_ops={'description': 'gin_trgm_ops'}).ddl_if(dialect='postgresql'),
+    )
 
     id = db.Column(db.Integer, primary_key=True)
     workspace_id = db.Column(db.Integer, db.ForeignKey('workspaces.id', ondelete='CASCADE'), nullable=False)
@@ -133,6 +181,7 @@ class Transaction(db.Model):
     amount = db.Column(db.Numeric(15, 2), nullable=False)
     transaction_date = db.Column(db.Date, nullable=False, default=datetime.utcnow)
     description = db.Column(db.Text, nullable=True)
+    fingerprint = db.Column(db.String(40), nullable=True)  # Hash of account, date, amount and normalized description
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
 
     # Relationships
@@ -145,6 +194,30 @@ class Transaction(db.Model):
         return f'<Transaction {self.type} {self.amount}>'
 
 
+class DailyRollup(db.Model):
+    """Pre-aggregated INCOME/EXPENSE totals per day, maintained by the transaction write path."""
+    __tablename__ = 'daily_rollups'
+    __table_args__ = (
+        # Write-path lookup and per-workspace date-range aggregation
+        db.Index('idx_daily_rollup_key', 'workspace_id', 'date', 'type', 'category_id', 'account_id'),
+        # Budget realization and recommendations per category
+        db.Index('idx_daily_rollup_category', 'category_id', 'type', 'date'),
+    )
+
+    # No unique key: rows are additive, so readers always SUM them
+    id = db.Column(db.Integer, primary_key=True)
+    workspace_id = db.Column(db.Integer, db.ForeignKey('workspaces.id', ondelete='CASCADE'), nullable=False)
+    date = db.Column(db.Date, nullable=False)
+    type = db.Column(db.String(20), nullable=False)  # INCOME, EXPENSE
+    category_id = db.Column(db.Integer, db.ForeignKey('categories.id', ondelete='SET NULL'), nullable=True)
+    account_id = db.Column(db.Integer, db.ForeignKey('accounts.id', ondelete='CASCADE'), nullable=False)
+    total = db.Column(db.Numeric(15, 2), default=0, nullable=False)  # Sum of amount
+    count = db.Column(db.Integer, default=0, nullable=False)  # Number of transactions
+
+    def __repr__(self) -> str:
+        return f'<DailyRollup {self.date} {self.type} {self.total}>'
+
+
 class WorkspaceInvitation(db.Model):
     """Workspace invitation model for inviting users."""
     __tablename__ = 'workspace_invitations'
@@ -257,6 +330,8 @@ class GoldPrice(db.Model):
     __tablename__ = 'gold_prices'
     __table_args__ = (
         db.UniqueConstraint('date', 'source', name='uq_gold_prices_date_source'),
+        # Per-source history and latest price lookups, see app/gold_prices.py and app/portfolio.py
+        db.Index('idx_gold_prices_source_date', 'source', db.text('date DESC')),
     )
 
     id = db.Column(db.Integer, primary_key=True)
@@ -0,0 +1,543 @@
+"""Investment valuation computed in SQL for the investments list and the gold summary.
+
+Buy value, current value and profit/loss are column expressions, so the
+list endpoint is one projected query (with the account name joined in) and
+the summary is one aggregate grouped by gold type and purchase month,
+however many small purchases a workspace has.
+
+Gold is marked to market on read: each investment's gold_type is joined to
+the latest buyback price on or before the valuation date, taken from the
+global gold_prices series or the workspace's own gold price setting,
+whichever was recorded later. Investment.current_price is only a manual
+fallback for investments without a market price, so a price change writes
+one row instead of touching every investment.
+"""
+from bisect import bisect_right
+from datetime import date, datetime, timedelta
+from decimal import Decimal
+from itertools import accumulate
+from typing import Any, Dict, Iterable, List, Optional
+from dateutil.relativedelta import relativedelta
+from sqlalchemy import and_, case, func, or_, select
+from app import db
+from app.models import Investment, Account, GoldPrice, GoldPriceSetting
+from app.cache import bump_workspace_generations
+from app.trends import GRANULARITIES, bucket_start, next_bucket
+
+ZERO = Decimal('0')
+
+# Months of purchases shown in the summary's monthly chart
+MONTHLY_PURCHASE_MONTHS = 6
+
+# Number of most recent purchases in the summary's modal vs profit chart
+INDIVIDUAL_INVESTMENT_LIMIT = 10
+
+
+def effective_quantity():
+    """Grams held: weight when set, quantity otherwise (matches the old model properties)."""
+    return func.coalesce(func.nullif(Investment.weight, 0), Investment.quantity)
+
+
+def buy_value():
+    return effective_quantity() * Investment.buy_price
+
+
+def latest_gold_prices(as_of: date):
+    """
+    Subquery with the latest buyback price per source on or before a date.
+
+    Columns: source, date, buyback_price. PostgreSQL picks the rows with
+    DISTINCT ON (source); other databases rank them with row_number().
+    """
+    recorded = and_(
+        GoldPrice.date <= as_of,
+        GoldPrice.source.isnot(None),
+        GoldPrice.buyback_price.isnot(None)
+    )
+
+    if db.engine.dialect.name == 'postgresql':
+        return select(
+            GoldPrice.source,
+            GoldPrice.date,
+            GoldPrice.buyback_price
+        ).where(recorded).distinct(GoldPrice.source).order_by(
+            GoldPrice.source, GoldPrice.date.desc()
+        ).subquery('latest_gold_price')
+
+    ranked = select(
+        GoldPrice.source,
+        GoldPrice.date,
+        GoldPrice.buyback_price,
+        func.row_number().over(partition_by=GoldPrice.source, order_by=GoldPrice.date.desc()).label('position')
+    ).where(recorded).subquery('ranked_gold_price')
+    return select(
+        ranked.c.source,
+        ranked.c.date,
+        ranked.c.buyback_price
+    ).where(ranked.c.position == 1).subquery('latest_gold_price')
+
+
+class Valuation:
+    """
+    Price per gram of investments as of one date.
+
+    join() adds the price lookups to an investment query as outer joins
+    (at most one row each, so rows are never multiplied); price and
+    current_value() can then be selected or aggregated.
+    """
+
+    def __init__(self, as_of: Optional[date] = None):
+        self.as_of = as_of or date.today()
+        self.latest = latest_gold_prices(self.as_of)
+
+        setting_date = func.date(GoldPriceSetting.updated_at)
+        # The workspace setting wins when it is at least as recent as the series
+        self.market_price = case(
+            (
+                and_(
+                    GoldPriceSetting.buyback_price.isnot(None),
+                    or_(self.latest.c.date.is_(None), setting_date >= self.latest.c.date)
+                ),
+                GoldPriceSetting.buyback_price
+            ),
+            else_=self.latest.c.buyback_price
+        )
+        self.price = func.coalesce(self.market_price, Investment.current_price)
+
+    def join(self, query):
+        gold = Investment.type == 'GOLD'
+        return query.outerjoin(
+            self.latest,
+            and_(gold, self.latest.c.source == Investment.gold_type)
+        ).outerjoin(
+            GoldPriceSetting,
+            and_(
+                gold,
+                GoldPriceSetting.workspace_id == Investment.workspace_id,
+                GoldPriceSetting.gold_type == Investment.gold_type,
+                func.date(GoldPriceSetting.updated_at) <= self.as_of
+            )
+        )
+
+    def current_value(self):
+        return effective_quantity() * self.price
+
+
+def invalidate_gold_valuations(gold_types: Iterable[Optional[str]]) -> None:
+    """
+    Bump the cache generation of every workspace holding one of the gold types.
+
+    gold_prices is shared by all workspaces, so a price write changes the
+    valuation of each workspace with investments of that source. Call
+    before committing the write.
+    """
+    gold_types = {gold_type for gold_type in gold_types if gold_type}
+    if not gold_types:
+        return
+    bump_workspace_generations(
+        select(Investment.workspace_id).where(
+            Investment.type == 'GOLD',
+            Investment.gold_type.in_(gold_types)
+        ).distinct()
+    )
+
+
+def priced_investment_counts(workspace_id: int) -> Dict[str, int]:
+    """Gold investments of a workspace and how many of them have a market price today."""
+    valuation = Valuation()
+    total, priced = valuation.join(db.session.query(
+        func.count(Investment.id),
+        func.count(valuation.market_price)
+    )).filter(
+        Investment.workspace_id == workspace_id,
+        Investment.type == 'GOLD'
+    ).one()
+    return {'total': total, 'priced': priced}
+
+
+def _month_column():
+    """SQL expression grouping purchase dates by month."""
+    if db.engine.dialect.name == 'postgresql':
+        return func.date_trunc('month', Investment.purchase_date)
+    # Other databases group per day; months are merged in Python
+    return Investment.purchase_date
+
+
+def _as_date(value: Any) -> date:
+    if isinstance(value, datetime):
+        return value.date()
+    if isinstance(value, str):
+        return datetime.strptime(value[:10], '%Y-%m-%d').date()
+    return value
+
+
+def list_investments(workspace_id: int, as_of: Optional[date] = None) -> List[Dict[str, Any]]:
+    """
+    Investments of a workspace with their valuation, newest purchase first.
+
+    Args:
+        workspace_id: Workspace id
+        as_of: Value the investments held on this date at its prices;
+            defaults to all investments at today's prices
+    """
+    valuation = Valuation(as_of)
+    buy = buy_value().label('total_buy_value')
+    current = valuation.current_value().label('total_current_value')
+
+    query = db.session.query(
+        Investment.id,
+        Investment.name,
+        Investment.type,
+        Investment.gold_type,
+        Investment.weight,
+        Investment.account_id,
+        Account.name.label('account_name'),
+        Investment.quantity,
+        Investment.buy_price,
+        valuation.price.label('current_price'),
+        Investment.purchase_date,
+        Investment.notes,
+        buy,
+        current
+    ).outerjoin(
+        Account, Investment.account_id == Account.id
+    ).filter(
+        Investment.workspace_id == workspace_id
+    )
+    if as_of:
+        query = query.filter(Investment.purchase_date <= as_of)
+
+    rows = valuation.join(query).order_by(Investment.purchase_date.desc(), Investment.id.desc())
+
+    result = []
+    for row in rows:
+        profit_loss = row.total_current_value - row.total_buy_value if row.total_current_value is not None else None
+        percentage = profit_loss / row.total_buy_value * 100 if profit_loss is not None and row.total_buy_value else None
+        result.append({
+            'id': row.id,
+            'name': row.name,
+            'type': row.type,
+            'gold_type': row.gold_type,
+            'weight': float(row.weight) if row.weight else None,
+            'account_id': row.account_id,
+            'account': {
+                'id': row.account_id,
+                'name': row.account_name,
+            } if row.account_name is not None else None,
+            'quantity': float(row.quantity),
+            'buy_price': float(row.buy_price),
+            'current_price': float(row.current_price) if row.current_price else None,
+            'purchase_date': row.purchase_date.isoformat(),
+            'notes': row.notes,
+            'total_buy_value': float(row.total_buy_value),
+            'total_current_value': float(row.total_current_value) if row.total_current_value else None,
+            'profit_loss': float(profit_loss) if profit_loss else None,
+            'profit_loss_percentage': float(percentage) if percentage else None,
+        })
+    return result
+
+
+def gold_summary(workspace_id: int, as_of: Optional[date] = None) -> Dict[str, Any]:
+    """
+    Totals, per gold type breakdown and monthly purchases of a workspace's gold.
+
+    One aggregate query grouped by (gold_type, purchase month) feeds the
+    totals, the gold type breakdown and the monthly chart; the newest
+    purchases for the per-investment chart come from a second, limited query.
+
+    Args:
+        workspace_id: Workspace id
+        as_of: Summarize the gold held on this date at its prices, with the
+            monthly chart ending there; defaults to today
+    """
+    valuation = Valuation(as_of)
+    month = _month_column().label('month')
+    recent = Investment.purchase_date >= valuation.as_of - relativedelta(months=MONTHLY_PURCHASE_MONTHS)
+    held = [Investment.workspace_id == workspace_id, Investment.type == 'GOLD']
+    if as_of:
+        held.append(Investment.purchase_date <= as_of)
+
+    groups = valuation.join(db.session.query(
+        Investment.gold_type,
+        month,
+        func.min(Investment.id),
+        func.count(Investment.id),
+        func.sum(effective_quantity()),
+        func.sum(buy_value()),
+        func.sum(valuation.current_value()),
+        # Purchases inside the monthly chart window
+        func.count(Investment.id).filter(recent),
+        func.sum(effective_quantity()).filter(recent),
+        func.sum(buy_value()).filter(recent)
+    )).filter(*held).group_by(Investment.gold_type, month).all()
+
+    if not groups:
+        return {
+            'summary': {
+                'total_investments': 0,
+                'total_weight': 0,
+                'total_buy_value': 0,
+                'total_current_value': 0,
+                'profit_loss': 0,
+                'profit_loss_percentage': 0
+            },
+            'by_gold_type': [],
+            'monthly_purchases': [],
+            'individual_investments': [],
+            'has_data': False
+        }
+
+    by_gold_type: Dict[str, Dict[str, Any]] = {}
+    first_id: Dict[str, int] = {}
+    monthly: Dict[date, Dict[str, Any]] = {}
+
+    for gold_type, month_value, min_id, count, grams, buy, current, recent_count, recent_grams, recent_buy in groups:
+        gold_type = gold_type or 'UNKNOWN'
+        grams, buy, current = float(grams or 0), float(buy or 0), float(current or 0)
+
+        entry = by_gold_type.setdefault(gold_type, {
+            'gold_type': gold_type,
+            'count': 0,
+            'total_weight': 0,
+            'total_buy_value': 0,
+            'total_current_value': 0,
+            'profit_loss': 0
+        })
+        entry['count'] += count
+        entry['total_weight'] += grams
+        entry['total_buy_value'] += buy
+        entry['total_current_value'] += current
+        entry['profit_loss'] = entry['total_current_value'] - entry['total_buy_value']
+        first_id[gold_type] = min(first_id.get(gold_type, min_id), min_id)
+
+        if recent_count:
+            # Days of one month are merged here when the database groups per day
+            month_start = bucket_start(_as_date(month_value), 'month')
+            purchases = monthly.setdefault(month_start, {
+                'month': month_start.strftime('%b %Y'),
+                'count': 0,
+                'total_weight': 0,
+                'total_value': 0
+            })
+            purchases['count'] += recent_count
+            purchases['total_weight'] += float(recent_grams or 0)
+            purchases['total_value'] += float(recent_buy or 0)
+
+    gold_types = sorted(by_gold_type.values(), key=lambda entry: first_id[entry['gold_type']])
+    total_weight = sum(entry['total_weight'] for entry in gold_types)
+    total_buy_value = sum(entry['total_buy_value'] for entry in gold_types)
+    total_current_value = sum(entry['total_current_value'] for entry in gold_types)
+    profit_loss = total_current_value - total_buy_value
+
+    for entry in gold_types:
+        entry['percentage'] = (entry['total_current_value'] / total_current_value * 100) if total_current_value > 0 else 0
+
+    # Newest purchases for the modal vs profit chart
+    newest = valuation.join(db.session.query(
+        Investment.gold_type,
+        Investment.weight,
+        Investment.quantity,
+        Investment.purchase_date,
+        buy_value(),
+        valuation.current_value()
+    )).filter(*held).order_by(
+        Investment.purchase_date.desc(), Investment.id.desc()
+    ).limit(INDIVIDUAL_INVESTMENT_LIMIT)
+
+    individual_investments = []
+    for gold_type, grams, quantity, purchase_date, buy, current in newest:
+        buy, current = float(buy), float(current) if current else 0
+        individual_investments.append({
+            'name': f"{gold_type} {grams or quantity}g",
+            'date': purchase_date.strftime('%d/%m/%Y'),
+            'modal': buy,
+            'keuntungan': current - buy,
+            'total': current
+        })
+
+    return {
+        'summary': {
+            'total_investments': sum(entry['count'] for entry in gold_types),
+            'total_weight': total_weight,
+            'total_buy_value': total_buy_value,
+            'total_current_value': total_current_value,
+            'profit_loss': profit_loss,
+            'profit_loss_percentage': (profit_loss / total_buy_value * 100) if total_buy_value > 0 else 0
+        },
+        'by_gold_type': gold_types,
+        'monthly_purchases': [monthly[key] for key in sorted(monthly)],
+        'individual_investments': individual_investments,
+        'has_data': True
+    }
+
+
+class _Holdings:
+    """Cumulative purchases of one gold type, sorted by purchase date."""
+
+    def __init__(self):
+        self.dates: List[date] = []
+        self.grams: List[Decimal] = []
+        self.buy_values: List[Decimal] = []
+        self.manual_values: List[Decimal] = []
+
+    def add(self, day: date, grams: Decimal, buy: Decimal, manual: Decimal) -> None:
+        self.dates.append(day)
+        self.grams.append(grams)
+        self.buy_values.append(buy)
+        self.manual_values.append(manual)
+
+    def finish(self) -> None:
+        self.grams = list(accumulate(self.grams))
+        self.buy_values = list(accumulate(self.buy_values))
+        self.manual_values = list(accumulate(self.manual_values))
+
+    def at(self, day: date):
+        """Grams, cost and manually priced value held at the end of a day."""
+        index = bisect_right(self.dates, day)
+        if index == 0:
+            return ZERO, ZERO, ZERO
+        return self.grams[index - 1], self.buy_values[index - 1], self.manual_values[index - 1]
+
+
+class _PriceSeries:
+    """Buyback prices of one gold type, sorted by date and forward-filled on lookup."""
+
+    def __init__(self):
+        self.points: Dict[date, Decimal] = {}
+        self.dates: List[date] = []
+        self.prices: List[Decimal] = []
+
+    def add(self, day: date, price: Decimal, override: bool = False) -> None:
+        if override or day not in self.points:
+            self.points[day] = price
+
+    def finish(self) -> None:
+        self.dates = sorted(self.points)
+        self.prices = [self.points[day] for day in self.dates]
+
+    def at(self, day: date) -> Optional[Decimal]:
+        index = bisect_right(self.dates, day)
+        return self.prices[index - 1] if index else None
+
+
+def value_series(workspace_id: int, start: Optional[date] = None, end: Optional[date] = None,
+                 granularity: str = 'month') -> List[Dict[str, Any]]:
+    """
+    Value of a workspace's gold at the end of each day, week or month.
+
+    Holdings are cumulative sums of grams per gold type over purchases
+    sorted by date; prices are the buyback series forward-filled from the
+    last known price. Four queries load purchases per day, the prices
+    inside the range, the last price before it and the workspace settings;
+    every bucket is then looked up by bisection instead of a query per day.
+
+    Prices follow Valuation. The workspace gold price setting is a price
+    from the day it was updated; on that day it wins over the gold_prices
+    series, and a later series price replaces it. Gold types with neither
+    use the investments' manual current_price.
+
+    Args:
+        workspace_id: Workspace id
+        start: First date included (default: first purchase)
+        end: Last date included (default: today)
+        granularity: day, week or month
+
+    Returns:
+        List of buckets with start, end (exclusive, like app.trends),
+        the valuation date (last day of the bucket), total_weight,
+        total_buy_value, total_value, profit_loss and the value per gold type
+    """
+    if granularity not in GRANULARITIES:
+        raise ValueError(f'granularity harus salah satu dari: {", ".join(GRANULARITIES)}')
+
+    end = end or date.today()
+    grams = effective_quantity()
+    purchases = db.session.query(
+        Investment.gold_type,
+        Investment.purchase_date,
+        func.sum(grams),
+        func.sum(buy_value()),
+        func.sum(grams * Investment.current_price)
+    ).filter(
+        Investment.workspace_id == workspace_id,
+        Investment.type == 'GOLD',
+        Investment.purchase_date <= end
+    ).group_by(
+        Investment.gold_type, Investment.purchase_date
+    ).order_by(Investment.purchase_date).all()
+
+    if not purchases:
+        return []
+    start = start or purchases[0].purchase_date
+    if start > end:
+        return []
+
+    holdings: Dict[str, _Holdings] = {}
+    for gold_type, purchase_date, total_grams, buy, manual in purchases:
+        holdings.setdefault(gold_type or 'UNKNOWN', _Holdings()).add(
+            purchase_date, total_grams or ZERO, buy or ZERO, manual or ZERO
+        )
+
+    series: Dict[str, _PriceSeries] = {gold_type: _PriceSeries() for gold_type in holdings}
+    sources = [gold_type for gold_type in holdings if gold_type != 'UNKNOWN']
+
+    # Prices inside the range, plus the last one before it to fill forward from
+    latest = latest_gold_prices(start)
+    points = db.session.query(latest.c.source, latest.c.date, latest.c.buyback_price).filter(
+        latest.c.source.in_(sources)
+    ).all() + db.session.query(GoldPrice.source, GoldPrice.date, GoldPrice.buyback_price).filter(
+        GoldPrice.source.in_(sources),
+        GoldPrice.date > start,
+        GoldPrice.date <= end,
+        GoldPrice.buyback_price.isnot(None)
+    ).all()
+    for source, day, price in points:
+        series[source].add(day, price)
+
+    settings = db.session.query(
+        GoldPriceSetting.gold_type,
+        GoldPriceSetting.updated_at,
+        GoldPriceSetting.buyback_price
+    ).filter(
+        GoldPriceSetting.workspace_id == workspace_id,
+        GoldPriceSetting.gold_type.in_(sources)
+    )
+    for gold_type, updated_at, price in settings:
+        # Same day as a series price: the workspace setting wins, as in Valuation
+        series[gold_type].add(_as_date(updated_at), price, override=True)
+
+    for entry in list(holdings.values()) + list(series.values()):
+        entry.finish()
+
+    buckets = []
+    current = bucket_start(start, granularity)
+    while current <= end:
+        following = next_bucket(current, granularity)
+        day = min(following - timedelta(days=1), end)
+
+        total_weight = total_buy = total_value = ZERO
+        by_gold_type = {}
+        for gold_type, held in holdings.items():
+            weight, buy, manual = held.at(day)
+            if not weight:
+                continue
+            price = series[gold_type].at(day)
+            value = weight * price if price is not None else manual
+            total_weight += weight
+            total_buy += buy
+            total_value += value
+            by_gold_type[gold_type] = float(value)
+
+        buckets.append({
+            'start': max(current, start).isoformat(),
+            'end': min(following, end + timedelta(days=1)).isoformat(),
+            'date': day.isoformat(),
+            'total_weight': float(total_weight),
+            'total_buy_value': float(total_buy),
+            'total_value': float(total_value),
+            'profit_loss': float(total_value - total_buy),
+            'by_gold_type': by_gold_type
+        })
+        current = following
+
+    return buckets
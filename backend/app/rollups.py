@@ -0,0 +1,247 @@
+"""Daily INCOME/EXPENSE rollups maintained incrementally on every transaction write.
+
+Each daily_rollups row sums the transactions of one (workspace, date, type,
+category, account). Analytics, budget and summary queries aggregate these
+rows instead of scanning raw transactions. TRANSFER transactions are not
+rolled up; no report reads them.
+"""
+from datetime import date
+from decimal import Decimal
+from typing import Any, Dict, List, Optional, Tuple
+from sqlalchemy import bindparam, delete, func, insert, select, update
+from app import db
+from app.models import DailyRollup, Transaction
+
+ROLLUP_TYPES = ('INCOME', 'EXPENSE')
+
+ROLLUP_KEY = ('workspace_id', 'date', 'type', 'category_id', 'account_id')
+
+
+def _key_filter(workspace_id: int, day: date, txn_type: str, category_id: Optional[int], account_id: int) -> List[Any]:
+    return [
+        DailyRollup.workspace_id == workspace_id,
+        DailyRollup.date == day,
+        DailyRollup.type == txn_type,
+        DailyRollup.category_id.is_(None) if category_id is None else DailyRollup.category_id == category_id,
+        DailyRollup.account_id == account_id,
+    ]
+
+
+def post_rollup(transaction: Transaction, sign: int = 1) -> None:
+    """
+    Add (sign=1) or remove (sign=-1) one transaction's effect on the rollups.
+
+    Uses a relative UPDATE of a single row, and inserts a row when the key
+    has none yet. Two writers racing on a new key may both insert; since
+    readers sum every row of a key, that only costs an extra row, which the
+    next rebuild_rollups compacts away.
+    """
+    if transaction.type not in ROLLUP_TYPES:
+        return
+
+    delta = Decimal(str(transaction.amount)) * sign
+    key = _key_filter(
+        transaction.workspace_id,
+        transaction.transaction_date,
+        transaction.type,
+        transaction.category_id,
+        transaction.account_id
+    )
+
+    # Only touch one row, so duplicate rows of a key are never double counted
+    first_row = select(func.min(DailyRollup.id)).where(*key).scalar_subquery()
+    result = db.session.execute(
+        update(DailyRollup)
+        .where(DailyRollup.id == first_row)
+        .values(total=DailyRollup.total + delta, count=DailyRollup.count + sign)
+        .execution_options(synchronize_session=False)
+    )
+
+    if result.rowcount == 0:
+        db.session.execute(insert(DailyRollup).values(
+            workspace_id=transaction.workspace_id,
+            date=transaction.transaction_date,
+            type=transaction.type,
+            category_id=transaction.category_id,
+            account_id=transaction.account_id,
+            total=delta,
+            count=sign
+        ))
+    elif sign < 0:
+        # Drop rows that no longer hold anything
+        db.session.execute(
+            delete(DailyRollup)
+            .where(*key, DailyRollup.count == 0, DailyRollup.total == 0)
+            .execution_options(synchronize_session=False)
+        )
+
+
+def post_rollups(rows: List[Dict[str, Any]]) -> None:
+    """
+    Add many newly inserted transactions to the rollups.
+
+    Rows are summed per rollup key in Python. Keys that already have a row
+    are updated with one executemany UPDATE, and the rest are inserted with
+    one multi-row INSERT.
+
+    Args:
+        rows: Transaction column values (workspace_id, transaction_date,
+            type, category_id, account_id, amount)
+    """
+    totals: Dict[Tuple, List[Any]] = {}
+    for row in rows:
+        if row['type'] not in ROLLUP_TYPES:
+            continue
+        key = (row['workspace_id'], row['transaction_date'], row['type'], row.get('category_id'), row['account_id'])
+        entry = totals.setdefault(key, [Decimal('0'), 0])
+        entry[0] += Decimal(str(row['amount']))
+        entry[1] += 1
+
+    if not totals:
+        return
+
+    # First row id of every key already present, from one query over the affected days
+    existing = {}
+    found = db.session.execute(
+        select(
+            DailyRollup.workspace_id,
+            DailyRollup.date,
+            DailyRollup.type,
+            DailyRollup.category_id,
+            DailyRollup.account_id,
+            func.min(DailyRollup.id)
+        ).where(
+            DailyRollup.workspace_id.in_({key[0] for key in totals}),
+            DailyRollup.date.in_({key[1] for key in totals})
+        ).group_by(
+            DailyRollup.workspace_id,
+            DailyRollup.date,
+            DailyRollup.type,
+            DailyRollup.category_id,
+            DailyRollup.account_id
+        )
+    )
+    for row in found:
+        existing[tuple(row[:5])] = row[5]
+
+    updates = [
+        {'b_id': existing[key], 'd_total': total, 'd_count': count}
+        for key, (total, count) in totals.items() if key in existing
+    ]
+    inserts = [
+        dict(zip(ROLLUP_KEY, key), total=total, count=count)
+        for key, (total, count) in totals.items() if key not in existing
+    ]
+
+    table = DailyRollup.__table__
+    if updates:
+        db.session.execute(
+            update(table)
+            .where(table.c.id == bindparam('b_id'))
+            .values(total=table.c.total + bindparam('d_total'), count=table.c.count + bindparam('d_count')),
+            updates
+        )
+    if inserts:
+        db.session.execute(insert(table), inserts)
+
+
+def move_rollups(source_account_id: int, target_account_id: int) -> None:
+    """Re-key rollups after all transactions of one account moved to another."""
+    db.session.execute(
+        update(DailyRollup)
+        .where(DailyRollup.account_id == source_account_id)
+        .values(account_id=target_account_id)
+        .execution_options(synchronize_session=False)
+    )
+
+
+def _transaction_totals(workspace_id: Optional[int] = None):
+    """Rollup rows computed from raw transactions, grouped by the rollup key."""
+    query = select(
+        Transaction.workspace_id,
+        Transaction.transaction_date,
+        Transaction.type,
+        Transaction.category_id,
+        Transaction.account_id,
+        func.sum(Transaction.amount),
+        func.count(Transaction.id)
+    ).where(Transaction.type.in_(ROLLUP_TYPES))
+
+    if workspace_id:
+        query = query.where(Transaction.workspace_id == workspace_id)
+
+    return query.group_by(
+        Transaction.workspace_id,
+        Transaction.transaction_date,
+        Transaction.type,
+        Transaction.category_id,
+        Transaction.account_id
+    )
+
+
+def rebuild_rollups(workspace_id: Optional[int] = None) -> int:
+    """
+    Recompute rollups from raw transactions with one INSERT ... SELECT.
+
+    Args:
+        workspace_id: Limit to one workspace (default: all workspaces)
+
+    Returns:
+        Number of rollup rows written
+    """
+    clear = delete(DailyRollup)
+    if workspace_id:
+        clear = clear.where(DailyRollup.workspace_id == workspace_id)
+    db.session.execute(clear.execution_options(synchronize_session=False))
+
+    result = db.session.execute(
+        insert(DailyRollup).from_select(list(ROLLUP_KEY) + ['total', 'count'], _transaction_totals(workspace_id))
+    )
+    db.session.flush()
+    return result.rowcount
+
+
+def verify_rollups(workspace_id: Optional[int] = None) -> List[Dict[str, Any]]:
+    """
+    Compare rollups against raw transactions.
+
+    Returns:
+        List of mismatches, one entry per rollup key
+    """
+    rollups = select(
+        DailyRollup.workspace_id,
+        DailyRollup.date,
+        DailyRollup.type,
+        DailyRollup.category_id,
+        DailyRollup.account_id,
+        func.sum(DailyRollup.total),
+        func.sum(DailyRollup.count)
+    )
+    if workspace_id:
+        rollups = rollups.where(DailyRollup.workspace_id == workspace_id)
+    rollups = rollups.group_by(
+        DailyRollup.workspace_id,
+        DailyRollup.date,
+        DailyRollup.type,
+        DailyRollup.category_id,
+        DailyRollup.account_id
+    )
+
+    def totals(statement) -> Dict[Tuple, Tuple[Decimal, int]]:
+        return {tuple(row[:5]): (row[5] or Decimal('0'), row[6] or 0) for row in db.session.execute(statement)}
+
+    expected = totals(_transaction_totals(workspace_id))
+    actual = totals(rollups)
+
+    mismatches = []
+    for key in sorted(set(expected) | set(actual), key=str):
+        expected_value = expected.get(key, (Decimal('0'), 0))
+        actual_value = actual.get(key, (Decimal('0'), 0))
+        if expected_value != actual_value:
+            mismatches.append({
+                'key': dict(zip(ROLLUP_KEY, key)),
+                'rollup': actual_value,
+                'actual': expected_value
+            })
+
+    return mismatches
@@ -2,32 +2,20 @@
 from flask import Blueprint, request, jsonify
 from flask_jwt_extended import jwt_required, get_jwt_identity
 from app import db
-from app.models import Account, WorkspaceMember, Transaction
+from app.models import Account, Transaction
 from app.decorators import require_role, get_user_role_in_workspace
-from sqlalchemy import func
+from app.access import check_workspace_access
+from app.ledger import create_balance, rebuild_account
+from app.balances import get_account_balances, get_account_balance
+from app.cache import bump_workspace_generation
+from app.rollups import move_rollups
+from app.duplicates import refingerprint_account
 from decimal import Decimal
 from typing import Tuple, Dict, Any
 
 account_bp = Blueprint('account', __name__)
 
 
-def check_workspace_access(user_id: int, workspace_id: int) -> bool:
-    """Check if user has access to workspace."""
-    from app.models import User
-
-    # Check if user is Owner (Superadmin) - they can access all workspaces
-    user = User.query.get(user_id)
-    if user and user.is_owner:
-        return True
-
-    # Check normal membership
-    membership = WorkspaceMember.query.filter_by(
-        user_id=user_id,
-        workspace_id=workspace_id
-    ).first()
-    return membership is not None
-
-
 @account_bp.route('', methods=['GET'])
 @jwt_required()
 @require_role('Owner', 'Admin', 'Member', 'Viewer')
@@ -52,56 +40,19 @@ def get_accounts() -> Tuple[Dict[str, Any], int]:
         if not check_workspace_access(current_user_id, workspace_id):
             return {'error': 'Akses ditolak'}, 403
 
-        accounts = Account.query.filter_by(workspace_id=workspace_id).all()
-
         account_list = []
-        for account in accounts:
-            # Calculate current balance
-            income = db.session.query(func.sum(Transaction.amount)).filter(
-                Transaction.account_id == account.id,
-                Transaction.type == 'INCOME'
-            ).scalar() or Decimal('0')
-
-            expense = db.session.query(func.sum(Transaction.amount)).filter(
-                Transaction.account_id == account.id,
-                Transaction.type == 'EXPENSE'
-            ).scalar() or Decimal('0')
-
-            transfer_out = db.session.query(func.sum(Transaction.amount)).filter(
-                Transaction.account_id == account.id,
-                Transaction.type == 'TRANSFER'
-            ).scalar() or Decimal('0')
-
-            transfer_in = db.session.query(func.sum(Transaction.amount)).filter(
-                Transaction.transfer_to_account_id == account.id,
-                Transaction.type == 'TRANSFER'
-            ).scalar() or Decimal('0')
-
-            # Include transfers into income/expense totals so sums reconcile:
-            # total_income = income (INCOME) + transfer_in (TRANSFER received)
-            # total_expense = expense (EXPENSE) + transfer_out (TRANSFER sent)
-            total_income = income + transfer_in
-            total_expense = expense + transfer_out
-
-            current_balance = account.initial_balance + total_income - total_expense
-
-            # Count transactions using this account
-            transaction_count = Transaction.query.filter(
-                (Transaction.account_id == account.id) |
-                (Transaction.transfer_to_account_id == account.id)
-            ).count()
-
+        for account, balance in get_account_balances(workspace_id):
             account_list.append({
                 'id': account.id,
                 'name': account.name,
                 'type': account.type,
                 'initial_balance': float(account.initial_balance),
-                'current_balance': float(current_balance),
-                'total_income': float(total_income),
-                'total_expense': float(total_expense),
-                'total_transfer_in': float(transfer_in),
-                'total_transfer_out': float(transfer_out),
-                'transaction_count': transaction_count,
+                'current_balance': float(balance['current_balance']),
+                'total_income': float(balance['total_income']),
+                'total_expense': float(balance['total_expense']),
+                'total_transfer_in': float(balance['transfer_in']),
+                'total_transfer_out': float(balance['transfer_out']),
+                'transaction_count': balance['transaction_count'],
                 'created_at': account.created_at.isoformat()
             })
 
@@ -151,7 +102,9 @@ def create_account() -> Tuple[Dict[str, Any], int]:
             type=data['type'],
             initial_balance=Decimal(str(data.get('initial_balance', 0)))
         )
+        create_balance(account)
         db.session.add(account)
+        bump_workspace_generation(account.workspace_id)
         db.session.commit()
 
         return {
@@ -190,32 +143,7 @@ def get_account(account_id: int) -> Tuple[Dict[str, Any], int]:
         if not check_workspace_access(current_user_id, account.workspace_id):
             return {'error': 'Akses ditolak'}, 403
 
-        # Calculate current balance
-        income = db.session.query(func.sum(Transaction.amount)).filter(
-            Transaction.account_id == account.id,
-            Transaction.type == 'INCOME'
-        ).scalar() or Decimal('0')
-
-        expense = db.session.query(func.sum(Transaction.amount)).filter(
-            Transaction.account_id == account.id,
-            Transaction.type == 'EXPENSE'
-        ).scalar() or Decimal('0')
-
-        transfer_out = db.session.query(func.sum(Transaction.amount)).filter(
-            Transaction.account_id == account.id,
-            Transaction.type == 'TRANSFER'
-        ).scalar() or Decimal('0')
-
-        transfer_in = db.session.query(func.sum(Transaction.amount)).filter(
-            Transaction.transfer_to_account_id == account.id,
-            Transaction.type == 'TRANSFER'
-        ).scalar() or Decimal('0')
-
-        # Include transfers into income/expense totals so sums reconcile
-        total_income = income + transfer_in
-        total_expense = expense + transfer_out
-
-        current_balance = account.initial_balance + total_income - total_expense
+        balance = get_account_balance(account)
 
         return {
             'account': {
@@ -223,9 +151,9 @@ def get_account(account_id: int) -> Tuple[Dict[str, Any], int]:
                 'name': account.name,
                 'type': account.type,
                 'initial_balance': float(account.initial_balance),
-                'current_balance': float(current_balance),
-                'total_income': float(total_income),
-                'total_expense': float(total_expense),
+                'current_balance': float(balance['current_balance']),
+                'total_income': float(balance['total_income']),
+                'total_expense': float(balance['total_expense']),
                 'created_at': account.created_at.isoformat()
             }
         }, 200
@@ -274,6 +202,7 @@ def update_account(account_id: int) -> Tuple[Dict[str, Any], int]:
         if 'initial_balance' in data:
             account.initial_balance = Decimal(str(data['initial_balance']))
 
+        bump_workspace_generation(account.workspace_id)
         db.session.commit()
 
         return {
@@ -325,6 +254,7 @@ def delete_account(account_id: int) -> Tuple[Dict[str, Any], int]:
                 'transaction_count': transaction_count
             }, 400
 
+        bump_workspace_generation(account.workspace_id)
         db.session.delete(account)
         db.session.commit()
 
@@ -389,6 +319,9 @@ def merge_accounts(account_id: int) -> Tuple[Dict[str, Any], int]:
         if not target_account:
             return {'error': 'Akun tujuan tidak ditemukan'}, 404
 
+        # Fingerprints include the account, so the moved rows get the target's
+        refingerprint_account(account_id, target_account_id)
+
         # Move all transactions from source to target
         # Update transactions where source_account is the main account
         Transaction.query.filter_by(account_id=account_id).update({
@@ -400,31 +333,13 @@ def merge_accounts(account_id: int) -> Tuple[Dict[str, Any], int]:
             'transfer_to_account_id': target_account_id
         })
 
-        # Recalculate target account balance
-        income = db.session.query(func.sum(Transaction.amount)).filter(
-            Transaction.account_id == target_account_id,
-            Transaction.type == 'INCOME'
-        ).scalar() or Decimal('0')
-
-        expense = db.session.query(func.sum(Transaction.amount)).filter(
-            Transaction.account_id == target_account_id,
-            Transaction.type == 'EXPENSE'
-        ).scalar() or Decimal('0')
-
-        transfer_out = db.session.query(func.sum(Transaction.amount)).filter(
-            Transaction.account_id == target_account_id,
-            Transaction.type == 'TRANSFER'
-        ).scalar() or Decimal('0')
-
-        transfer_in = db.session.query(func.sum(Transaction.amount)).filter(
-            Transaction.transfer_to_account_id == target_account_id,
-            Transaction.type == 'TRANSFER'
-        ).scalar() or Decimal('0')
-
-        new_balance = target_account.initial_balance + income - expense - transfer_out + transfer_in
-        target_account.current_balance = new_balance
+        # Recalculate target account ledger from its merged transactions
+        rebuild_account(target_account_id)
+        move_rollups(account_id, target_account_id)
+        balance = get_account_balance(target_account)
 
         # Delete source account
+        bump_workspace_generation(source_account.workspace_id)
         db.session.delete(source_account)
         db.session.commit()
 
@@ -433,7 +348,7 @@ def merge_accounts(account_id: int) -> Tuple[Dict[str, Any], int]:
             'target_account': {
                 'id': target_account.id,
                 'name': target_account.name,
-                'current_balance': float(target_account.current_balance)
+                'current_balance': float(balance['current_balance'])
             }
         }, 200
 
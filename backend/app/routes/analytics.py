@@ -2,34 +2,22 @@
 from flask import Blueprint, request, jsonify
 from flask_jwt_extended import jwt_required, get_jwt_identity
 from app import db
-from app.models import Transaction, Account, Category, WorkspaceMember
+from app.models import DailyRollup, Account, Category
 from app.decorators import require_role
+from app.access import check_workspace_access
+from app.cache import cached_response
+from app.balances import get_account_balances
+from app.trends import get_trend, GRANULARITIES, EXCLUDED_EXPENSE_CATEGORY
+from app.categories import get_category_tree
+from app.portfolio import gold_summary
 from sqlalchemy import func, extract
 from datetime import datetime, timedelta, date
 from decimal import Decimal
 from typing import Tuple, Dict, Any
-import calendar
 
 analytics_bp = Blueprint('analytics', __name__)
 
 
-def check_workspace_access(user_id: int, workspace_id: int) -> bool:
-    """Check if user has access to workspace."""
-    from app.models import User
-
-    # Check if user is Owner (Superadmin) - they can access all workspaces
-    user = User.query.get(user_id)
-    if user and user.is_owner:
-        return True
-
-    # Check normal membership
-    membership = WorkspaceMember.query.filter_by(
-        user_id=user_id,
-        workspace_id=workspace_id
-    ).first()
-    return membership is not None
-
-
 def generate_ai_insights(data: Dict[str, Any]) -> list:
     """Generate AI-powered financial insights and recommendations."""
     insights = []
@@ -226,6 +214,7 @@ def generate_ai_insights(data: Dict[str, Any]) -> list:
 @analytics_bp.route('/dashboard', methods=['GET'])
 @jwt_required()
 @require_role('Owner', 'Admin', 'Member', 'Viewer')
+@cached_response
 def get_dashboard_analytics() -> Tuple[Dict[str, Any], int]:
     """
     Get comprehensive dashboard analytics with AI insights.
@@ -233,15 +222,20 @@ def get_dashboard_analytics() -> Tuple[Dict[str, Any], int]:
     Query params:
         workspace_id: int (required)
         months: int (optional, default 6) - number of months for trend analysis
+        granularity: str (optional) - day, week or month (default: day for 1 month, month otherwise)
     """
     try:
         current_user_id = int(get_jwt_identity())
         workspace_id = request.args.get('workspace_id', type=int)
         months = request.args.get('months', type=int, default=6)
+        granularity = request.args.get('granularity') or ('day' if months == 1 else 'month')
 
         if not workspace_id:
             return {'error': 'workspace_id harus diisi'}, 400
 
+        if granularity not in GRANULARITIES:
+            return {'error': f'granularity harus salah satu dari: {", ".join(GRANULARITIES)}'}, 400
+
         if not check_workspace_access(current_user_id, workspace_id):
             return {'error': 'Akses ditolak'}, 403
 
@@ -251,47 +245,23 @@ def get_dashboard_analytics() -> Tuple[Dict[str, Any], int]:
         start_of_month = date(today.year, today.month, 1)
 
         # Total saldo semua akun
-        accounts = Account.query.filter_by(workspace_id=workspace_id).all()
-        total_balance = sum(float(acc.initial_balance) for acc in accounts)
-
-        # Hitung perubahan saldo dari transaksi
-        for account in accounts:
-            income = db.session.query(func.sum(Transaction.amount)).filter(
-                Transaction.account_id == account.id,
-                Transaction.type == 'INCOME'
-            ).scalar() or Decimal('0')
-
-            expense = db.session.query(func.sum(Transaction.amount)).filter(
-                Transaction.account_id == account.id,
-                Transaction.type == 'EXPENSE'
-            ).scalar() or Decimal('0')
-
-            transfer_in = db.session.query(func.sum(Transaction.amount)).filter(
-                Transaction.transfer_to_account_id == account.id,
-                Transaction.type == 'TRANSFER'
-            ).scalar() or Decimal('0')
-
-            transfer_out = db.session.query(func.sum(Transaction.amount)).filter(
-                Transaction.account_id == account.id,
-                Transaction.type == 'TRANSFER'
-            ).scalar() or Decimal('0')
-
-            account_balance = float(account.initial_balance) + float(income) - float(expense) + float(transfer_in) - float(transfer_out)
-            total_balance += account_balance - float(account.initial_balance)
+        account_balances = get_account_balances(workspace_id)
+        accounts = [account for account, _ in account_balances]
+        total_balance = float(sum(balance['current_balance'] for _, balance in account_balances))
 
         # Income dan expense bulan ini (exclude Investasi Emas)
-        current_month_income = db.session.query(func.sum(Transaction.amount)).filter(
-            Transaction.workspace_id == workspace_id,
-            Transaction.type == 'INCOME',
-            Transaction.transaction_date >= start_of_month
+        current_month_income = db.session.query(func.sum(DailyRollup.total)).filter(
+            DailyRollup.workspace_id == workspace_id,
+            DailyRollup.type == 'INCOME',
+            DailyRollup.date >= start_of_month
         ).scalar() or Decimal('0')
 
-        current_month_expense = db.session.query(func.sum(Transaction.amount)).join(
-            Category, Transaction.category_id == Category.id
+        current_month_expense = db.session.query(func.sum(DailyRollup.total)).join(
+            Category, DailyRollup.category_id == Category.id
         ).filter(
-            Transaction.workspace_id == workspace_id,
-            Transaction.type == 'EXPENSE',
-            Transaction.transaction_date >= start_of_month,
+            DailyRollup.workspace_id == workspace_id,
+            DailyRollup.type == 'EXPENSE',
+            DailyRollup.date >= start_of_month,
             Category.name != 'Investasi Emas'
         ).scalar() or Decimal('0')
 
@@ -312,13 +282,13 @@ def get_dashboard_analytics() -> Tuple[Dict[str, Any], int]:
 
         expense_by_category = db.session.query(
             Category.name.label('category_name'),
-            func.sum(Transaction.amount).label('total')
+            func.sum(DailyRollup.total).label('total')
         ).join(
-            Transaction, Transaction.category_id == Category.id
+            DailyRollup, DailyRollup.category_id == Category.id
         ).filter(
-            Transaction.workspace_id == workspace_id,
-            Transaction.type == 'EXPENSE',
-            Transaction.transaction_date >= period_start,
+            DailyRollup.workspace_id == workspace_id,
+            DailyRollup.type == 'EXPENSE',
+            DailyRollup.date >= period_start,
             Category.name != 'Investasi Emas'
         ).group_by(Category.name).all()
 
@@ -327,108 +297,57 @@ def get_dashboard_analytics() -> Tuple[Dict[str, Any], int]:
             for cat in expense_by_category
         ]
 
-        # Trend data - daily for current month, monthly for longer periods
+        # Trend data - daily for current month, monthly for longer periods (one grouped query per type)
         trend_data = []
         month_ranges = []
-        is_daily_view = (months == 1)
-
-        if is_daily_view:
-            # Daily data for current month (use date objects)
-            days_in_month = calendar.monthrange(today.year, today.month)[1]
-
-            for day in range(1, today.day + 1):
-                day_date = date(today.year, today.month, day)
-
-                day_income = db.session.query(func.sum(Transaction.amount)).filter(
-                    Transaction.workspace_id == workspace_id,
-                    Transaction.type == 'INCOME',
-                    Transaction.transaction_date >= day_date,
-                    Transaction.transaction_date <= day_date
-                ).scalar() or Decimal('0')
-
-                day_expense = db.session.query(func.sum(Transaction.amount)).join(
-                    Category, Transaction.category_id == Category.id
-                ).filter(
-                    Transaction.workspace_id == workspace_id,
-                    Transaction.type == 'EXPENSE',
-                    Transaction.transaction_date >= day_date,
-                    Transaction.transaction_date <= day_date,
-                    Category.name != 'Investasi Emas'
-                ).scalar() or Decimal('0')
-
-                trend_data.append({
-                    'label': str(day),
-                    'date': day_date.strftime('%Y-%m-%d'),
-                    'income': float(day_income),
-                    'expense': float(day_expense),
-                    'savings': float(day_income - day_expense)
-                })
-        else:
-            # Monthly data for multiple months (calendar-aware)
-            total_months = today.year * 12 + (today.month - 1)
+        is_daily_view = (granularity == 'day')
+
+        for bucket in get_trend(workspace_id, period_start, today, granularity):
+            bucket_date = bucket['start']
+            point = {
+                'income': float(bucket['income']),
+                'expense': float(bucket['expense']),
+                'savings': float(bucket['income'] - bucket['expense'])
+            }
 
-            # For debugging/verification include the exact start/end date used for each month
-            month_ranges = []
-
-            for i in range(months - 1, -1, -1):
-                month_index = total_months - i
-                month_year = month_index // 12
-                month_month = (month_index % 12) + 1
-                month_start = date(month_year, month_month, 1)
-
-                if i > 0:
-                    # next month's first day as date
-                    next_index = month_index + 1
-                    next_year = next_index // 12
-                    next_month = (next_index % 12) + 1
-                    month_end = date(next_year, next_month, 1)
-                else:
-                    # current month: end is tomorrow (exclusive) so include today
-                    month_end = today + timedelta(days=1)
-
-                month_income = db.session.query(func.sum(Transaction.amount)).filter(
-                    Transaction.workspace_id == workspace_id,
-                    Transaction.type == 'INCOME',
-                    Transaction.transaction_date >= month_start,
-                    Transaction.transaction_date < month_end
-                ).scalar() or Decimal('0')
-
-                month_expense = db.session.query(func.sum(Transaction.amount)).join(
-                    Category, Transaction.category_id == Category.id
-                ).filter(
-                    Transaction.workspace_id == workspace_id,
-                    Transaction.type == 'EXPENSE',
-                    Transaction.transaction_date >= month_start,
-                    Transaction.transaction_date < month_end,
-                    Category.name != 'Investasi Emas'
-                ).scalar() or Decimal('0')
-
-                trend_data.append({
-                    'label': month_start.strftime('%b %Y'),
-                    'month_num': month_start.month,
-                    'year': month_start.year,
-                    'income': float(month_income),
-                    'expense': float(month_expense),
-                    'savings': float(month_income - month_expense)
+            if granularity == 'day':
+                point.update({
+                    'label': str(bucket_date.day),
+                    'date': bucket_date.strftime('%Y-%m-%d')
                 })
+            elif granularity == 'week':
+                point.update({
+                    'label': bucket_date.strftime('%d %b'),
+                    'date': bucket_date.strftime('%Y-%m-%d')
+                })
+            else:
+                point.update({
+                    'label': bucket_date.strftime('%b %Y'),
+                    'month_num': bucket_date.month,
+                    'year': bucket_date.year
+                })
+
+            trend_data.append(point)
+            if not is_daily_view:
+                # For debugging/verification include the exact start/end date used for each bucket
                 month_ranges.append({
-                    'label': month_start.strftime('%b %Y'),
-                    'start': month_start.isoformat(),
-                    'end': month_end.isoformat()
+                    'label': point['label'],
+                    'start': bucket_date.isoformat(),
+                    'end': bucket['end'].isoformat()
                 })
 
         # Top spending categories (all time, exclude Investasi Emas)
         top_categories = db.session.query(
             Category.name.label('category_name'),
-            func.sum(Transaction.amount).label('total'),
-            func.count(Transaction.id).label('count')
+            func.sum(DailyRollup.total).label('total'),
+            func.sum(DailyRollup.count).label('count')
         ).join(
-            Transaction, Transaction.category_id == Category.id
+            DailyRollup, DailyRollup.category_id == Category.id
         ).filter(
-            Transaction.workspace_id == workspace_id,
-            Transaction.type == 'EXPENSE',
+            DailyRollup.workspace_id == workspace_id,
+            DailyRollup.type == 'EXPENSE',
             Category.name != 'Investasi Emas'
-        ).group_by(Category.name).order_by(func.sum(Transaction.amount).desc()).limit(5).all()
+        ).group_by(Category.name).order_by(func.sum(DailyRollup.total).desc()).limit(5).all()
 
         top_spending = [
             {
@@ -445,7 +364,7 @@ def get_dashboard_analytics() -> Tuple[Dict[str, Any], int]:
             'total_income': float(current_month_income),
             'total_expense': float(current_month_expense),
             'expense_by_category': expense_categories,
-            'monthly_trend': trend_data if not is_daily_view else [],
+            'monthly_trend': trend_data if granularity == 'month' else [],
             'top_spending': top_spending,
             'months': months
         }
@@ -469,6 +388,7 @@ def get_dashboard_analytics() -> Tuple[Dict[str, Any], int]:
             },
             'trend_data': trend_data,
             'is_daily_view': is_daily_view,
+            'granularity': granularity,
             'expense_by_category': expense_categories,
             'top_spending_categories': top_spending,
             'trend_ranges': month_ranges,
@@ -492,6 +412,7 @@ def get_dashboard_analytics() -> Tuple[Dict[str, Any], int]:
 @analytics_bp.route('/daily-comparison', methods=['GET'])
 @jwt_required()
 @require_role('Owner', 'Admin', 'Member', 'Viewer')
+@cached_response
 def get_daily_comparison() -> Tuple[Dict[str, Any], int]:
     """
     Get daily income vs expense comparison.
@@ -499,107 +420,62 @@ def get_daily_comparison() -> Tuple[Dict[str, Any], int]:
     Query params:
         workspace_id: int (required)
         months: int (optional, default 1) - 1 for current month, or N for last N months
+        granularity: str (optional) - day, week or month (default: day for 1 month, month otherwise)
     """
     try:
         current_user_id = int(get_jwt_identity())
         workspace_id = request.args.get('workspace_id', type=int)
         months = request.args.get('months', type=int, default=1)
+        granularity = request.args.get('granularity') or ('day' if months == 1 else 'month')
 
         if not workspace_id:
             return {'error': 'workspace_id harus diisi'}, 400
 
+        if granularity not in GRANULARITIES:
+            return {'error': f'granularity harus salah satu dari: {", ".join(GRANULARITIES)}'}, 400
+
         if not check_workspace_access(current_user_id, workspace_id):
             return {'error': 'Akses ditolak'}, 403
 
         # Use date objects to avoid datetime vs date mismatches
-        now_dt = datetime.now()
-        today = now_dt.date()
+        today = datetime.now().date()
         daily_data = []
 
         if months == 1:
-            # Current month only (daily aggregation)
-            start_of_month_dt = datetime(now_dt.year, now_dt.month, 1)
-            days_in_month = calendar.monthrange(now_dt.year, now_dt.month)[1]
-
-            for day in range(1, days_in_month + 1):
-                day_dt = start_of_month_dt.replace(day=day)
-
-                # Only include dates up to today
-                if day_dt.date() > today:
-                    break
-
-                # Get income for this day
-                daily_income = db.session.query(func.sum(Transaction.amount)).filter(
-                    Transaction.workspace_id == workspace_id,
-                    Transaction.type == 'INCOME',
-                    func.date(Transaction.transaction_date) == day_dt.date()
-                ).scalar() or Decimal('0')
-
-                # Get expense for this day (exclude Investasi Emas)
-                daily_expense = db.session.query(func.sum(Transaction.amount)).join(
-                    Category, Transaction.category_id == Category.id
-                ).filter(
-                    Transaction.workspace_id == workspace_id,
-                    Transaction.type == 'EXPENSE',
-                    func.date(Transaction.transaction_date) == day_dt.date(),
-                    Category.name != 'Investasi Emas'
-                ).scalar() or Decimal('0')
-
-                daily_data.append({
-                    'date': day_dt.strftime('%Y-%m-%d'),
-                    'day': day,
-                    'day_name': day_dt.strftime('%a'),
-                    'income': float(daily_income),
-                    'expense': float(daily_expense),
-                    'net': float(daily_income - daily_expense)
-                })
+            # Current month only
+            period_start = date(today.year, today.month, 1)
         else:
-            # Multiple months - aggregate by calendar month (calendar-aware)
-            total_months = today.year * 12 + (today.month - 1)
+            # Multiple months - calendar-aware start of the first month
+            start_total = today.year * 12 + (today.month - 1) - (months - 1)
+            period_start = date(start_total // 12, start_total % 12 + 1, 1)
+
+        for bucket in get_trend(workspace_id, period_start, today, granularity):
+            bucket_date = bucket['start']
+            point = {
+                'date': bucket_date.strftime('%Y-%m-%d'),
+                'income': float(bucket['income']),
+                'expense': float(bucket['expense']),
+                'net': float(bucket['income'] - bucket['expense'])
+            }
 
-            for i in range(months - 1, -1, -1):
-                month_index = total_months - i
-                month_year = month_index // 12
-                month_month = (month_index % 12) + 1
-                month_start = date(month_year, month_month, 1)
-
-                if i > 0:
-                    next_index = month_index + 1
-                    next_year = next_index // 12
-                    next_month = (next_index % 12) + 1
-                    month_end = date(next_year, next_month, 1)
-                else:
-                    # current month: end is tomorrow (exclusive) to include today
-                    month_end = today + timedelta(days=1)
-
-                # Get income for this month
-                month_income = db.session.query(func.sum(Transaction.amount)).filter(
-                    Transaction.workspace_id == workspace_id,
-                    Transaction.type == 'INCOME',
-                    Transaction.transaction_date >= month_start,
-                    Transaction.transaction_date < month_end
-                ).scalar() or Decimal('0')
-
-                # Get expense for this month (exclude Investasi Emas)
-                month_expense = db.session.query(func.sum(Transaction.amount)).join(
-                    Category, Transaction.category_id == Category.id
-                ).filter(
-                    Transaction.workspace_id == workspace_id,
-                    Transaction.type == 'EXPENSE',
-                    Transaction.transaction_date >= month_start,
-                    Transaction.transaction_date < month_end,
-                    Category.name != 'Investasi Emas'
-                ).scalar() or Decimal('0')
-
-                daily_data.append({
-                    'date': month_start.strftime('%Y-%m-%d'),
-                    'month': month_start.strftime('%b'),
-                    'month_full': month_start.strftime('%B %Y'),
-                    'income': float(month_income),
-                    'expense': float(month_expense),
-                    'net': float(month_income - month_expense)
+            if granularity == 'day':
+                point.update({
+                    'day': bucket_date.day,
+                    'day_name': bucket_date.strftime('%a')
+                })
+            elif granularity == 'week':
+                point.update({
+                    'week': bucket_date.strftime('%d %b'),
+                    'week_end': (bucket['end'] - timedelta(days=1)).strftime('%Y-%m-%d')
+                })
+            else:
+                point.update({
+                    'month': bucket_date.strftime('%b'),
+                    'month_full': bucket_date.strftime('%B %Y')
                 })
 
+            daily_data.append(point)
+
         # Calculate summary
         total_income = sum(d['income'] for d in daily_data)
         total_expense = sum(d['expense'] for d in daily_data)
@@ -618,6 +494,7 @@ def get_daily_comparison() -> Tuple[Dict[str, Any], int]:
             },
             'period': period_label,
             'months': months,
+            'granularity': granularity,
             'is_current_month': months == 1
         }, 200
 
@@ -628,6 +505,7 @@ def get_daily_comparison() -> Tuple[Dict[str, Any], int]:
 @analytics_bp.route('/income-by-category', methods=['GET'])
 @jwt_required()
 @require_role('Owner', 'Admin', 'Member', 'Viewer')
+@cached_response
 def get_income_by_category() -> Tuple[Dict[str, Any], int]:
     """
     Aggregate INCOME by category for a workspace and optional date range.
@@ -652,20 +530,20 @@ def get_income_by_category() -> Tuple[Dict[str, Any], int]:
 
         q = db.session.query(
             Category.name.label('category_name'),
-            func.sum(Transaction.amount).label('total')
-        ).join(Transaction, Transaction.category_id == Category.id).filter(
-            Transaction.workspace_id == workspace_id,
-            Transaction.type == 'INCOME'
+            func.sum(DailyRollup.total).label('total')
+        ).join(DailyRollup, DailyRollup.category_id == Category.id).filter(
+            DailyRollup.workspace_id == workspace_id,
+            DailyRollup.type == 'INCOME'
         )
 
         if request.args.get('start_date'):
             start_date = datetime.strptime(request.args.get('start_date'), '%Y-%m-%d').date()
-            q = q.filter(Transaction.transaction_date >= start_date)
+            q = q.filter(DailyRollup.date >= start_date)
         if request.args.get('end_date'):
             end_date = datetime.strptime(request.args.get('end_date'), '%Y-%m-%d').date()
-            q = q.filter(Transaction.transaction_date <= end_date)
+            q = q.filter(DailyRollup.date <= end_date)
 
-        q = q.group_by(Category.name).order_by(func.sum(Transaction.amount).desc())
+        q = q.group_by(Category.name).order_by(func.sum(DailyRollup.total).desc())
         results = q.limit(top_n).all()
 
         data = [{'category_name': r.category_name, 'total': float(r.total)} for r in results]
@@ -674,22 +552,119 @@ def get_income_by_category() -> Tuple[Dict[str, Any], int]:
         return {'error': f'Gagal mengumpulkan data: {str(e)}'}, 500
 
 
+@analytics_bp.route('/category-breakdown', methods=['GET'])
+@jwt_required()
+@require_role('Owner', 'Admin', 'Member', 'Viewer')
+@cached_response
+def get_category_breakdown() -> Tuple[Dict[str, Any], int]:
+    """
+    Totals per category as a nested tree, with children rolled up into their parents.
+
+    Totals are grouped by category id in one rollup query and nested with
+    the cached category tree, so same-named categories stay apart and the
+    client does not need to re-aggregate.
+
+    Query params:
+        workspace_id: int (required)
+        type: str (optional, default EXPENSE) - INCOME or EXPENSE
+        start_date: YYYY-MM-DD (optional)
+        end_date: YYYY-MM-DD (optional)
+        include_investments: bool (optional, default false) - keep the "Investasi Emas" expense category
+    """
+    try:
+        current_user_id = int(get_jwt_identity())
+        workspace_id = request.args.get('workspace_id', type=int)
+        txn_type = request.args.get('type', 'EXPENSE')
+        include_investments = request.args.get('include_investments', 'false').lower() == 'true'
+
+        if not workspace_id:
+            return {'error': 'workspace_id harus diisi'}, 400
+
+        if txn_type not in ('INCOME', 'EXPENSE'):
+            return {'error': 'type harus INCOME atau EXPENSE'}, 400
+
+        if not check_workspace_access(current_user_id, workspace_id):
+            return {'error': 'Akses ditolak'}, 403
+
+        q = db.session.query(
+            DailyRollup.category_id,
+            func.sum(DailyRollup.total),
+            func.sum(DailyRollup.count)
+        ).filter(
+            DailyRollup.workspace_id == workspace_id,
+            DailyRollup.type == txn_type
+        )
+
+        if request.args.get('start_date'):
+            start_date = datetime.strptime(request.args.get('start_date'), '%Y-%m-%d').date()
+            q = q.filter(DailyRollup.date >= start_date)
+        if request.args.get('end_date'):
+            end_date = datetime.strptime(request.args.get('end_date'), '%Y-%m-%d').date()
+            q = q.filter(DailyRollup.date <= end_date)
+
+        rows = q.group_by(DailyRollup.category_id).all()
+        tree = get_category_tree(workspace_id, required_ids=[category_id for category_id, _, _ in rows])
+
+        # Investment purchases are an asset, not spending, unless asked for
+        excluded = set()
+        if txn_type == 'EXPENSE' and not include_investments:
+            for node in tree:
+                if node.name == EXCLUDED_EXPENSE_CATEGORY:
+                    excluded.add(node.id)
+                    excluded.update(child.id for child in tree.descendants(node.id))
+
+        totals = {}
+        counts = {}
+        uncategorized = {'total': 0.0, 'count': 0}
+        for category_id, total, count in rows:
+            if not total or category_id in excluded:
+                continue
+            if category_id in tree:
+                totals[category_id] = float(total)
+                counts[category_id] = int(count)
+            else:
+                uncategorized['total'] += float(total)
+                uncategorized['count'] += int(count)
+
+        categories = tree.nested(totals, counts)
+        grand_total = sum(entry['total'] for entry in categories) + uncategorized['total']
+
+        def add_percentages(entries):
+            for entry in entries:
+                entry['percentage'] = round(entry['total'] / grand_total * 100, 2) if grand_total else 0
+                add_percentages(entry['children'])
+
+        add_percentages(categories)
+
+        return {
+            'type': txn_type,
+            'total': grand_total,
+            'categories': categories,
+            'uncategorized': uncategorized
+        }, 200
+    except ValueError as e:
+        return {'error': f'Invalid date format: {str(e)}'}, 400
+    except Exception as e:
+        return {'error': f'Gagal mengambil breakdown kategori: {str(e)}'}, 500
+
+
 @analytics_bp.route('/gold-investment-summary', methods=['GET'])
 @jwt_required()
 @require_role('Owner', 'Admin', 'Member', 'Viewer')
+@cached_response
 def get_gold_investment_summary() -> Tuple[Dict[str, Any], int]:
     """
     Get gold investment summary and analytics.
 
     Query params:
         workspace_id: int (required)
+        as_of: str (optional) - YYYY-MM-DD, summarize the gold held on that
+            date at that date's prices
 
     Returns:
         JSON with investment summary, breakdown by gold type, and profit/loss analysis
     """
     try:
-        from app.models import Investment
-
         current_user_id = int(get_jwt_identity())
         workspace_id = request.args.get('workspace_id', type=int)
 
@@ -699,120 +674,12 @@ def get_gold_investment_summary() -> Tuple[Dict[str, Any], int]:
         if not check_workspace_access(current_user_id, workspace_id):
             return {'error': 'Akses ditolak'}, 403
 
-        # Get all gold investments for workspace
-        investments = Investment.query.filter_by(
-            workspace_id=workspace_id,
-            type='GOLD'
-        ).all()
-
-        if not investments:
-            return {
-                'summary': {
-                    'total_investments': 0,
-                    'total_weight': 0,
-                    'total_buy_value': 0,
-                    'total_current_value': 0,
-                    'profit_loss': 0,
-                    'profit_loss_percentage': 0
-                },
-                'by_gold_type': [],
-                'monthly_purchases': [],
-                'individual_investments': [],
-                'has_data': False
-            }, 200
-
-        # Calculate summary
-        total_weight = sum(float(inv.weight or inv.quantity) for inv in investments)
-        total_buy_value = sum(float(inv.total_buy_value) for inv in investments)
-        total_current_value = sum(float(inv.total_current_value) if inv.total_current_value else 0 for inv in investments)
-        profit_loss = total_current_value - total_buy_value
-        profit_loss_percentage = (profit_loss / total_buy_value * 100) if total_buy_value > 0 else 0
-
-        # Breakdown by gold type
-        by_gold_type = {}
-        for inv in investments:
-            gold_type = inv.gold_type or 'UNKNOWN'
-            if gold_type not in by_gold_type:
-                by_gold_type[gold_type] = {
-                    'gold_type': gold_type,
-                    'count': 0,
-                    'total_weight': 0,
-                    'total_buy_value': 0,
-                    'total_current_value': 0,
-                    'profit_loss': 0
-                }
-
-            by_gold_type[gold_type]['count'] += 1
-            by_gold_type[gold_type]['total_weight'] += float(inv.weight or inv.quantity)
-            by_gold_type[gold_type]['total_buy_value'] += float(inv.total_buy_value)
-            by_gold_type[gold_type]['total_current_value'] += float(inv.total_current_value) if inv.total_current_value else 0
-            by_gold_type[gold_type]['profit_loss'] = by_gold_type[gold_type]['total_current_value'] - by_gold_type[gold_type]['total_buy_value']
-
-        # Add percentage to each gold type
-        for gold_type in by_gold_type.values():
-            gold_type['percentage'] = (gold_type['total_current_value'] / total_current_value * 100) if total_current_value > 0 else 0
-
-        # Monthly purchases (last 6 months)
-        from datetime import date
-        from dateutil.relativedelta import relativedelta
-
-        today = date.today()
-        six_months_ago = today - relativedelta(months=6)
-
-        monthly_purchases = {}
-        for inv in investments:
-            if inv.purchase_date >= six_months_ago:
-                month_key = inv.purchase_date.strftime('%Y-%m')
-                month_label = inv.purchase_date.strftime('%b %Y')
-
-                if month_key not in monthly_purchases:
-                    monthly_purchases[month_key] = {
-                        'month': month_label,
-                        'count': 0,
-                        'total_weight': 0,
-                        'total_value': 0
-                    }
-
-                monthly_purchases[month_key]['count'] += 1
-                monthly_purchases[month_key]['total_weight'] += float(inv.weight or inv.quantity)
-                monthly_purchases[month_key]['total_value'] += float(inv.total_buy_value)
-
-        # Sort monthly purchases by date
-        monthly_data = sorted(monthly_purchases.values(), key=lambda x: x['month'])
-
-        # Individual investments data for chart (modal vs keuntungan)
-        individual_investments = []
-        for inv in investments:
-            current_value = float(inv.total_current_value) if inv.total_current_value else 0
-            buy_value = float(inv.total_buy_value)
-            profit = current_value - buy_value
-
-            individual_investments.append({
-                'name': f"{inv.gold_type} {inv.weight or inv.quantity}g",
-                'date': inv.purchase_date.strftime('%d/%m/%Y'),
-                'modal': buy_value,
-                'keuntungan': profit,
-                'total': current_value
-            })
-
-        # Sort by date (newest first) and limit to last 10 for readability
-        individual_investments.sort(key=lambda x: x['date'], reverse=True)
-        individual_investments = individual_investments[:10]
+        as_of = request.args.get('as_of')
+        as_of = datetime.strptime(as_of, '%Y-%m-%d').date() if as_of else None
 
-        return {
-            'summary': {
-                'total_investments': len(investments),
-                'total_weight': total_weight,
-                'total_buy_value': total_buy_value,
-                'total_current_value': total_current_value,
-                'profit_loss': profit_loss,
-                'profit_loss_percentage': profit_loss_percentage
-            },
-            'by_gold_type': list(by_gold_type.values()),
-            'monthly_purchases': monthly_data,
-            'individual_investments': individual_investments,
-            'has_data': True
-        }, 200
+        return gold_summary(workspace_id, as_of), 200
 
+    except ValueError as e:
+        return {'error': f'Invalid date format: {str(e)}'}, 400
     except Exception as e:
         return {'error': f'Gagal mengambil data investasi emas: {str(e)}'}, 500
@@ -1,8 +1,9 @@
 """Authentication routes."""
 from flask import Blueprint, request, jsonify, send_from_directory
-from flask_jwt_extended import create_access_token, jwt_required, get_jwt_identity
+from flask_jwt_extended import create_refresh_token, jwt_required, get_jwt_identity
 from app import db, bcrypt
 from app.models import User, Workspace, WorkspaceMember, Role
+from app.access import issue_access_token
 from typing import Tuple, Dict, Any
 from werkzeug.utils import secure_filename
 import os
@@ -76,11 +77,13 @@ def register() -> Tuple[Dict[str, Any], int]:
         db.session.commit()
 
         # Create access token
-        access_token = create_access_token(identity=str(user.id))
+        access_token = issue_access_token(user)
+        refresh_token = create_refresh_token(identity=str(user.id))
 
         return {
             'message': 'Pendaftaran berhasil',
             'access_token': access_token,
+            'refresh_token': refresh_token,
             'user': {
                 'id': user.id,
                 'email': user.email,
@@ -141,11 +144,13 @@ def login() -> Tuple[Dict[str, Any], int]:
             })
 
         # Create access token
-        access_token = create_access_token(identity=str(user.id))
+        access_token = issue_access_token(user)
+        refresh_token = create_refresh_token(identity=str(user.id))
 
         return {
             'message': 'Login berhasil',
             'access_token': access_token,
+            'refresh_token': refresh_token,
             'user': {
                 'id': user.id,
                 'email': user.email,
@@ -159,6 +164,31 @@ def login() -> Tuple[Dict[str, Any], int]:
         return {'error': f'Login gagal: {str(e)}'}, 500
 
 
+@auth_bp.route('/refresh', methods=['POST'])
+@jwt_required(refresh=True)
+def refresh() -> Tuple[Dict[str, Any], int]:
+    """
+    Issue a new access token using a refresh token.
+
+    The new token carries the user's current workspace roles, so call this
+    after a role change when JWT_ROLE_CLAIMS is enabled.
+
+    Returns:
+        JSON response with a new access token
+    """
+    try:
+        current_user_id = int(get_jwt_identity())
+        user = User.query.get(current_user_id)
+
+        if not user:
+            return {'error': 'Pengguna tidak ditemukan'}, 404
+
+        return {'access_token': issue_access_token(user)}, 200
+
+    except Exception as e:
+        return {'error': f'Gagal memperbarui token: {str(e)}'}, 500
+
+
 @auth_bp.route('/me', methods=['GET'])
 @jwt_required()
 def get_current_user() -> Tuple[Dict[str, Any], int]:
@@ -4,11 +4,14 @@ from flask_jwt_extended import jwt_required, get_jwt_identity
 from datetime import datetime, date
 from decimal import Decimal
 from typing import Dict, Any, Tuple, List
-from sqlalchemy import and_, func, extract
+from collections import defaultdict
+from sqlalchemy import and_, or_, func, extract
 from pytz import timezone
 from app import db
-from app.models import BudgetPlan, BudgetAllocation, Category, Transaction, Investment
+from app.models import BudgetPlan, BudgetAllocation, Category, DailyRollup, Investment
 from app.decorators import require_role
+from app.access import check_workspace_access
+from app.categories import CategoryNode, CategoryTree, get_category_tree
 
 budget_bp = Blueprint('budget', __name__)
 
@@ -21,18 +24,9 @@ def get_wib_now():
     return datetime.now(WIB)
 
 
-def check_workspace_access(user_id: int, workspace_id: int) -> bool:
-    """Check if user has access to workspace."""
-    from app.models import WorkspaceMember
-    return WorkspaceMember.query.filter_by(
-        user_id=user_id,
-        workspace_id=workspace_id
-    ).first() is not None
-
-
 def calculate_income_for_period(workspace_id: int, period_start: date, period_end: date) -> Decimal:
     """
-    Calculate total income from transactions within the budget period.
+    Calculate total income from transactions within the budget period, read from daily rollups.
 
     Example: Budget period 2024-11-27 to 2024-12-29
     Income calculated from all INCOME transactions in that date range.
@@ -40,52 +34,90 @@ def calculate_income_for_period(workspace_id: int, period_start: date, period_en
     """
     # Sum all INCOME transactions within the budget period
     total_income = db.session.query(
-        func.coalesce(func.sum(Transaction.amount), 0)
+        func.coalesce(func.sum(DailyRollup.total), 0)
     ).filter(
         and_(
-            Transaction.workspace_id == workspace_id,
-            Transaction.type == 'INCOME',
-            Transaction.transaction_date >= period_start,
-            Transaction.transaction_date <= period_end
+            DailyRollup.workspace_id == workspace_id,
+            DailyRollup.type == 'INCOME',
+            DailyRollup.date >= period_start,
+            DailyRollup.date <= period_end
         )
     ).scalar()
 
     return Decimal(str(total_income))
 
 
-def build_hierarchical_allocations(allocations):
-    """Build hierarchical allocation structure from flat list"""
-    # Get all categories involved
-    category_ids = [a.category_id for a in allocations]
-    if not category_ids:
-        return []
+def calculate_income_for_plans(plans: List[BudgetPlan]) -> Dict[int, Decimal]:
+    """
+    Calculate income for several budget plans with one grouped query.
+
+    Each plan gets the sum of INCOME transactions within its own period, as
+    calculate_income_for_period would return.
+
+    Returns:
+        Dict of plan id -> total income
+    """
+    plan_ids = [plan.id for plan in plans]
+    if not plan_ids:
+        return {}
+
+    totals = db.session.query(
+        BudgetPlan.id,
+        func.sum(DailyRollup.total)
+    ).join(
+        DailyRollup,
+        and_(
+            DailyRollup.workspace_id == BudgetPlan.workspace_id,
+            DailyRollup.type == 'INCOME',
+            DailyRollup.date >= BudgetPlan.period_start,
+            DailyRollup.date <= BudgetPlan.period_end
+        )
+    ).filter(
+        BudgetPlan.id.in_(plan_ids)
+    ).group_by(BudgetPlan.id).all()
 
-    categories = Category.query.filter(Category.id.in_(category_ids)).all()
+    income = {plan_id: Decimal('0') for plan_id in plan_ids}
+    for plan_id, total in totals:
+        income[plan_id] = Decimal(str(total or 0))
+    return income
+
+
+def build_hierarchical_allocations(allocations, tree: CategoryTree):
+    """
+    Build hierarchical allocation structure from flat list.
+
+    Args:
+        allocations: BudgetAllocation rows of one plan
+        tree: Category tree of the workspace
+    """
+    if not allocations:
+        return []
 
-    # Create mapping
     allocation_map = {a.category_id: a for a in allocations}
-    category_map = {c.id: c for c in categories}
 
-    # Find parent categories
+    # Find parent categories and group allocations under them
     parent_ids = set()
-    for cat in categories:
+    children_by_parent = defaultdict(list)
+    for alloc in allocations:
+        cat = tree.get(alloc.category_id)
+        if not cat:
+            continue
         if cat.parent_id is None:
             parent_ids.add(cat.id)
-        elif cat.parent_id not in category_ids:
-            # Child exists but parent not in allocations, get parent
-            parent = Category.query.get(cat.parent_id)
-            if parent:
-                category_map[parent.id] = parent
-                parent_ids.add(parent.id)
+        else:
+            children_by_parent[cat.parent_id].append(alloc)
+            if cat.parent_id not in allocation_map:
+                # Child exists but parent not in allocations
+                parent_ids.add(cat.parent_id)
 
     result = []
 
     for parent_id in parent_ids:
-        parent_cat = category_map.get(parent_id)
+        parent_cat = tree.get(parent_id)
         if not parent_cat:
             continue
 
-        children_allocs = [a for a in allocations if category_map.get(a.category_id) and category_map.get(a.category_id).parent_id == parent_id]
+        children_allocs = children_by_parent.get(parent_id)
 
         if children_allocs:
             # Has children
@@ -93,7 +125,7 @@ def build_hierarchical_allocations(allocations):
             children_data = []
 
             for child_alloc in children_allocs:
-                child_cat = category_map[child_alloc.category_id]
+                child_cat = tree.get(child_alloc.category_id)
                 children_data.append({
                     'category_id': child_cat.id,
                     'category_name': child_cat.name,
@@ -125,44 +157,41 @@ def build_hierarchical_allocations(allocations):
     return result
 
 
-def build_hierarchical_realization(realization_list):
-    """Build hierarchical realization structure from flat list"""
+def build_hierarchical_realization(realization_list, tree: CategoryTree):
+    """
+    Build hierarchical realization structure from flat list.
+
+    Args:
+        realization_list: Flat realization entries, one per category
+        tree: Category tree of the workspace
+    """
     if not realization_list:
         return []
 
-    # Get all category IDs
-    category_ids = [r['category_id'] for r in realization_list]
-    categories = Category.query.filter(Category.id.in_(category_ids)).all()
-
-    # Create mapping
     realization_map = {r['category_id']: r for r in realization_list}
-    category_map = {c.id: c for c in categories}
 
-    # Collect all parent IDs and ensure parents are in category_map
+    # Group realizations under their parent category
     parent_ids = set()
-    for cat in categories:
+    children_by_parent = defaultdict(list)
+    for real in realization_list:
+        cat = tree.get(real['category_id'])
+        if not cat:
+            continue
         if cat.parent_id is None:
             # This is a parent category
             parent_ids.add(cat.id)
         else:
-            # This is a child, ensure parent is loaded
-            if cat.parent_id not in category_map:
-                parent = Category.query.get(cat.parent_id)
-                if parent:
-                    category_map[parent.id] = parent
             parent_ids.add(cat.parent_id)
+            children_by_parent[cat.parent_id].append(real)
 
     result = []
 
     for parent_id in sorted(parent_ids):
-        parent_cat = category_map.get(parent_id)
+        parent_cat = tree.get(parent_id)
         if not parent_cat:
             continue
 
-        # Find children realizations
-        children_realizations = [r for r in realization_list
-                                if category_map.get(r['category_id'])
-                                and category_map.get(r['category_id']).parent_id == parent_id]
+        children_realizations = children_by_parent.get(parent_id)
 
         if children_realizations:
             # Has children - calculate parent totals
@@ -212,6 +241,85 @@ def build_hierarchical_realization(realization_list):
     return result
 
 
+# Share of income per parent category name when there is no spending history
+# (case-insensitive substring match, first match wins)
+CATEGORY_WEIGHTS = {
+    'makanan': 0.25,           # 25% - Food & Beverage
+    'minum': 0.25,
+    'food': 0.25,
+    'transportasi': 0.15,      # 15% - Transportation
+    'transport': 0.15,
+    'tagihan': 0.15,           # 15% - Bills & Utilities
+    'utilitas': 0.15,
+    'kesehatan': 0.10,         # 10% - Health
+    'health': 0.10,
+    'pendidikan': 0.10,        # 10% - Education
+    'education': 0.10,
+    'hiburan': 0.08,           # 8% - Entertainment
+    'entertainment': 0.08,
+    'shopping': 0.07,          # 7% - Shopping
+    'belanja': 0.07,
+    'tabungan': 0.05,          # 5% - Savings
+    'saving': 0.05,
+    'investasi': 0.05,         # 5% - Investment
+    'investment': 0.05,
+}
+DEFAULT_CATEGORY_WEIGHT = 0.05
+
+
+def get_category_weight(name: str) -> float:
+    """Get the default income share for a parent category by name."""
+    name_lower = name.lower()
+    return next((weight for key, weight in CATEGORY_WEIGHTS.items() if key in name_lower), DEFAULT_CATEGORY_WEIGHT)
+
+
+def get_monthly_spending(workspace_id: int, start: date, end: date, months: int = 3) -> Dict[int, float]:
+    """Average monthly EXPENSE per category between start (inclusive) and end (exclusive), in one grouped query."""
+    totals = db.session.query(
+        DailyRollup.category_id,
+        func.sum(DailyRollup.total)
+    ).filter(
+        DailyRollup.workspace_id == workspace_id,
+        DailyRollup.type == 'EXPENSE',
+        DailyRollup.date >= start,
+        DailyRollup.date < end,
+        DailyRollup.category_id.isnot(None)
+    ).group_by(DailyRollup.category_id)
+
+    return {category_id: float(total) / months for category_id, total in totals if total and total > 0}
+
+
+def _build_recommendation(parent: CategoryNode, children: List[CategoryNode], amounts: List[float], parent_amount: float) -> Dict:
+    return {
+        'category_id': parent.id,
+        'category_name': parent.name,
+        'allocated_amount': int(round(parent_amount)),
+        'is_system_recommended': True,
+        'is_parent': True,
+        'children': [
+            {
+                'category_id': child.id,
+                'category_name': child.name,
+                'allocated_amount': int(round(amount)),
+                'is_system_recommended': True
+            }
+            for child, amount in zip(children, amounts)
+        ]
+    }
+
+
+def _absorb_rounding_difference(recommendations: List[Dict], income_amount: float) -> None:
+    """Add the rounding remainder to the first parent with children (and its first child)."""
+    difference = int(income_amount) - sum(r['allocated_amount'] for r in recommendations)
+    if difference == 0:
+        return
+    for rec in recommendations:
+        if rec.get('is_parent') and rec.get('children'):
+            rec['allocated_amount'] += difference
+            rec['children'][0]['allocated_amount'] += difference
+            break
+
+
 def generate_budget_recommendations(workspace_id: int, income_amount: float, period_start: date, period_end: date) -> List[Dict]:
     """
     Generate hierarchical budget allocation recommendations based on historical spending.
@@ -220,250 +328,93 @@ def generate_budget_recommendations(workspace_id: int, income_amount: float, per
     - 30% Wants (lifestyle)
     - 20% Savings/Investment
 
+    History is loaded with one grouped query and the hierarchy comes from the
+    cached category tree, so cost does not grow with queries per category.
+
     Returns hierarchical structure with parent categories and their children.
     """
-    # Get categories for this workspace
-    categories = Category.query.filter_by(workspace_id=workspace_id).all()
+    tree = get_category_tree(workspace_id)
 
-    if not categories:
+    if not tree:
         return []
 
-    # Separate parent and child categories
-    parent_categories = [c for c in categories if c.type == 'EXPENSE' and c.parent_id is None]
-    child_categories = [c for c in categories if c.type == 'EXPENSE' and c.parent_id is not None]
+    # Top-level expense categories and their expense children
+    parent_categories = tree.roots('EXPENSE')
+    children_by_parent = {}
+    for parent in parent_categories:
+        children = [c for c in tree.children(parent.id) if c.type == 'EXPENSE']
+        if children:
+            children_by_parent[parent.id] = children
+
+    parents_with_children = [p for p in parent_categories if p.id in children_by_parent]
+    childless_parents = [p for p in parent_categories if p.id not in children_by_parent]
 
-    # Calculate historical spending per category (last 3 months average)
+    # Historical spending per leaf category (last 3 months average).
+    # Leaves are child categories plus parents without children.
     from dateutil.relativedelta import relativedelta
     three_months_ago = period_start - relativedelta(months=3)
+    monthly_spending = get_monthly_spending(workspace_id, three_months_ago, period_start)
 
-    historical_spending = {}
-    total_historical = 0
-
-    # Calculate for child categories (leaf nodes)
-    for cat in child_categories:
-        expenses = db.session.query(
-            func.sum(Transaction.amount)
-        ).filter(
-            and_(
-                Transaction.category_id == cat.id,
-                Transaction.type == 'EXPENSE',
-                Transaction.transaction_date >= three_months_ago,
-                Transaction.transaction_date < period_start
-            )
-        ).scalar() or 0
-
-        monthly_avg = float(expenses) / 3 if expenses > 0 else 0
-        historical_spending[cat.id] = monthly_avg
-        total_historical += monthly_avg
-
-    # For parent categories without children, treat them as leaf nodes
-    for cat in parent_categories:
-        if not any(c.parent_id == cat.id for c in child_categories):
-            expenses = db.session.query(
-                func.sum(Transaction.amount)
-            ).filter(
-                and_(
-                    Transaction.category_id == cat.id,
-                    Transaction.type == 'EXPENSE',
-                    Transaction.transaction_date >= three_months_ago,
-                    Transaction.transaction_date < period_start
-                )
-            ).scalar() or 0
-
-            monthly_avg = float(expenses) / 3 if expenses > 0 else 0
-            historical_spending[cat.id] = monthly_avg
-            total_historical += monthly_avg
+    leaf_ids = [c.id for children in children_by_parent.values() for c in children]
+    leaf_ids += [p.id for p in childless_parents]
+    total_historical = sum(monthly_spending.get(category_id, 0) for category_id in leaf_ids)
 
     recommendations = []
 
-    # Build hierarchical recommendations
-    if total_historical == 0:
-        # Use realistic budget allocation based on typical spending patterns
-        # Define percentage ranges for different category types (case-insensitive matching)
-        category_weights_map = {
-            'makanan': 0.25,           # 25% - Food & Beverage
-            'minum': 0.25,
-            'food': 0.25,
-            'transportasi': 0.15,      # 15% - Transportation
-            'transport': 0.15,
-            'tagihan': 0.15,           # 15% - Bills & Utilities
-            'utilitas': 0.15,
-            'kesehatan': 0.10,         # 10% - Health
-            'health': 0.10,
-            'pendidikan': 0.10,        # 10% - Education
-            'education': 0.10,
-            'hiburan': 0.08,           # 8% - Entertainment
-            'entertainment': 0.08,
-            'shopping': 0.07,          # 7% - Shopping
-            'belanja': 0.07,
-            'tabungan': 0.05,          # 5% - Savings
-            'saving': 0.05,
-            'investasi': 0.05,         # 5% - Investment
-            'investment': 0.05,
-        }
-
-        # Count categories with children
-        parents_with_children = [p for p in parent_categories if any(c.parent_id == p.id for c in child_categories)]
-
-        if parents_with_children:
-            # Calculate total weight for categories that exist
-            existing_weights = {}
-            total_weight = 0
-            for parent in parents_with_children:
-                # Match category name with weights (case-insensitive)
-                weight = 0.05  # Default 5%
-                parent_name_lower = parent.name.lower()
-                for key, value in category_weights_map.items():
-                    if key in parent_name_lower:
-                        weight = value
-                        break
-
-                existing_weights[parent.id] = weight
-                total_weight += weight
-
-            # Normalize weights to ensure 100% allocation
-            if total_weight > 0:
-                for parent_id in existing_weights:
-                    existing_weights[parent_id] = existing_weights[parent_id] / total_weight
-
-            # Track total allocated to verify 100%
-            total_allocated = 0
-
-            # Only process parents with children (that have weights assigned)
-            for parent in parents_with_children:
-                children_list = [c for c in child_categories if c.parent_id == parent.id]
-
-                # Get allocation percentage for this parent
-                parent_percentage = existing_weights.get(parent.id, 0)
-                parent_allocation = income_amount * parent_percentage
-                total_allocated += parent_allocation
-
-                # Distribute parent budget among children with weighted distribution
-                # First child gets more (typically the most important)
-                children_total_weight = sum(1.0 / (i + 1) for i in range(len(children_list)))
-                children_data = []
-
-                for idx, child in enumerate(children_list):
-                    child_weight = 1.0 / (idx + 1)
-                    child_allocation = parent_allocation * (child_weight / children_total_weight)
-
-                    children_data.append({
-                        'category_id': child.id,
-                        'category_name': child.name,
-                        'allocated_amount': int(round(child_allocation)),
-                        'is_system_recommended': True
-                    })
-
-                recommendations.append({
-                    'category_id': parent.id,
-                    'category_name': parent.name,
-                    'allocated_amount': int(round(parent_allocation)),
-                    'is_system_recommended': True,
-                    'is_parent': True,
-                    'children': children_data
-                })
+    if total_historical == 0 and not parents_with_children:
+        return recommendations
 
-            # Add parent categories without children with 0 allocation
-            for parent in parent_categories:
-                if parent not in parents_with_children:
-                    recommendations.append({
-                        'category_id': parent.id,
-                        'category_name': parent.name,
-                        'allocated_amount': 0,
-                        'is_system_recommended': True,
-                        'is_parent': False
-                    })
-
-            # Adjust last category to ensure exactly 100% allocation
-            if recommendations:
-                actual_total = sum(r['allocated_amount'] for r in recommendations)
-                difference = int(income_amount) - actual_total
-                if difference != 0:
-                    # Add difference to the first category with children
-                    for rec in recommendations:
-                        if rec.get('is_parent') and rec.get('children'):
-                            rec['allocated_amount'] += difference
-                            # Also adjust first child
-                            if rec['children']:
-                                rec['children'][0]['allocated_amount'] += difference
-                            break
+    if total_historical == 0:
+        # Use realistic budget allocation based on typical spending patterns:
+        # weight parents by name, normalize to 100%, then split each parent
+        # among its children with 1/rank weights (first child gets the most)
+        weights = [get_category_weight(p.name) for p in parents_with_children]
+        total_weight = sum(weights)
+        shares = [w / total_weight for w in weights] if total_weight > 0 else weights
+
+        for parent, share in zip(parents_with_children, shares):
+            children = children_by_parent[parent.id]
+            parent_allocation = income_amount * share
+            rank_weights = [1.0 / (i + 1) for i in range(len(children))]
+            rank_total = sum(rank_weights)
+            amounts = [parent_allocation * w / rank_total for w in rank_weights]
+            recommendations.append(_build_recommendation(parent, children, amounts, parent_allocation))
     else:
-        # Use historical data - normalize to 100% of income
-        parents_with_children = [p for p in parent_categories if any(c.parent_id == p.id for c in child_categories)]
-
+        # Use historical data - each child gets its share of total historical spending
         for parent in parents_with_children:
-            children_list = [c for c in child_categories if c.parent_id == parent.id]
-
-            # Calculate total for children
-            children_data = []
-            parent_total = 0
-
-            for child in children_list:
-                if child.id in historical_spending:
-                    historical_pct = historical_spending[child.id] / total_historical if total_historical > 0 else 0
-                    recommended_amount = income_amount * historical_pct
-
-                    children_data.append({
-                        'category_id': child.id,
-                        'category_name': child.name,
-                        'allocated_amount': int(round(recommended_amount)),
-                        'is_system_recommended': True
-                    })
-                    parent_total += recommended_amount
-                else:
-                    # Child has no historical data, allocate 0
-                    children_data.append({
-                        'category_id': child.id,
-                        'category_name': child.name,
-                        'allocated_amount': 0,
-                        'is_system_recommended': True
-                    })
-
-            if children_data:
-                recommendations.append({
-                    'category_id': parent.id,
-                    'category_name': parent.name,
-                    'allocated_amount': int(round(parent_total)),
-                    'is_system_recommended': True,
-                    'is_parent': True,
-                    'children': children_data
-                })
-
-        # Add parent categories without children with 0 allocation
-        for parent in parent_categories:
-            if parent not in parents_with_children:
-                recommendations.append({
-                    'category_id': parent.id,
-                    'category_name': parent.name,
-                    'allocated_amount': 0,
-                    'is_system_recommended': True,
-                    'is_parent': False
-                })
+            children = children_by_parent[parent.id]
+            amounts = [income_amount * monthly_spending.get(c.id, 0) / total_historical for c in children]
+            recommendations.append(_build_recommendation(parent, children, amounts, sum(amounts)))
+
+    # Add parent categories without children with 0 allocation
+    for parent in childless_parents:
+        recommendations.append({
+            'category_id': parent.id,
+            'category_name': parent.name,
+            'allocated_amount': 0,
+            'is_system_recommended': True,
+            'is_parent': False
+        })
+
+    if not parents_with_children:
+        return recommendations
 
-        # Normalize to 100% if historical data doesn't reach 100%
-        if recommendations:
-            actual_total = sum(r['allocated_amount'] for r in recommendations if r.get('is_parent'))
-            if actual_total > 0 and actual_total < income_amount:
-                # Scale up all allocations proportionally to reach 100%
-                scale_factor = income_amount / actual_total
-
-                for rec in recommendations:
-                    if rec.get('is_parent') and rec.get('children'):
-                        # Scale parent and all children
-                        rec['allocated_amount'] = int(round(rec['allocated_amount'] * scale_factor))
-                        for child in rec['children']:
-                            child['allocated_amount'] = int(round(child['allocated_amount'] * scale_factor))
-
-                # Final adjustment to ensure exact 100%
-                actual_total = sum(r['allocated_amount'] for r in recommendations)
-                difference = int(income_amount) - actual_total
-                if difference != 0:
-                    for rec in recommendations:
-                        if rec.get('is_parent') and rec.get('children'):
-                            rec['allocated_amount'] += difference
-                            if rec['children']:
-                                rec['children'][0]['allocated_amount'] += difference
-                            break
+    if total_historical == 0:
+        _absorb_rounding_difference(recommendations, income_amount)
+        return recommendations
+
+    # Normalize to 100% if historical data doesn't reach 100%
+    actual_total = sum(r['allocated_amount'] for r in recommendations if r.get('is_parent'))
+    if 0 < actual_total < income_amount:
+        # Scale up all allocations proportionally to reach 100%
+        scale_factor = income_amount / actual_total
+        for rec in recommendations:
+            if rec.get('is_parent') and rec.get('children'):
+                rec['allocated_amount'] = int(round(rec['allocated_amount'] * scale_factor))
+                for child in rec['children']:
+                    child['allocated_amount'] = int(round(child['allocated_amount'] * scale_factor))
+
+        _absorb_rounding_difference(recommendations, income_amount)
 
     return recommendations
 
@@ -484,18 +435,29 @@ def get_budget_plans() -> Tuple[Dict[str, Any], int]:
             return {'error': 'Akses ditolak'}, 403
 
         plans = BudgetPlan.query.filter_by(workspace_id=workspace_id).order_by(BudgetPlan.period_start.desc()).all()
+        plan_ids = [plan.id for plan in plans]
+
+        # Allocations of all plans in one query; the category tree comes from its cache
+        allocations_by_plan = defaultdict(list)
+        if plan_ids:
+            for alloc in BudgetAllocation.query.filter(
+                BudgetAllocation.budget_plan_id.in_(plan_ids)
+            ).order_by(BudgetAllocation.id):
+                allocations_by_plan[alloc.budget_plan_id].append(alloc)
+        tree = get_category_tree(
+            workspace_id,
+            required_ids=[alloc.category_id for allocs in allocations_by_plan.values() for alloc in allocs]
+        )
+
+        # For DRAFT status, recalculate actual income from transactions
+        draft_income = calculate_income_for_plans([plan for plan in plans if plan.status == 'DRAFT'])
 
         result = []
         for plan in plans:
-            allocations = build_hierarchical_allocations(plan.allocations)
+            allocations = build_hierarchical_allocations(allocations_by_plan[plan.id], tree)
 
-            # For DRAFT status, recalculate actual income from transactions
             if plan.status == 'DRAFT':
-                actual_income = calculate_income_for_period(
-                    plan.workspace_id,
-                    plan.period_start,
-                    plan.period_end
-                )
+                actual_income = draft_income[plan.id]
             else:
                 # ACTIVE status uses frozen income_amount
                 actual_income = plan.income_amount
@@ -841,41 +803,73 @@ def get_budget_realization(plan_id: int) -> Tuple[Dict[str, Any], int]:
         if not check_workspace_access(current_user_id, budget_plan.workspace_id):
             return {'error': 'Akses ditolak'}, 403
 
-        # Get actual spending per category during budget period
+        # Actual spending per category during the budget period
+        spent = db.session.query(
+            DailyRollup.category_id.label('category_id'),
+            func.sum(DailyRollup.total).label('total')
+        ).filter(
+            DailyRollup.workspace_id == budget_plan.workspace_id,
+            DailyRollup.type == 'EXPENSE',
+            DailyRollup.date >= budget_plan.period_start,
+            DailyRollup.date <= budget_plan.period_end
+        ).group_by(DailyRollup.category_id).subquery()
+
+        allocations = db.session.query(
+            BudgetAllocation.id.label('id'),
+            BudgetAllocation.category_id.label('category_id'),
+            BudgetAllocation.allocated_amount.label('allocated_amount')
+        ).filter(BudgetAllocation.budget_plan_id == budget_plan.id).subquery()
+
+        # One row per category that is budgeted or has spending (like "Investasi Emas");
+        # budgeted categories first, in allocation order
+        rows = db.session.query(
+            Category.id,
+            allocations.c.allocated_amount,
+            spent.c.total
+        ).outerjoin(
+            allocations, allocations.c.category_id == Category.id
+        ).outerjoin(
+            spent, spent.c.category_id == Category.id
+        ).filter(
+            Category.workspace_id == budget_plan.workspace_id,
+            or_(allocations.c.id.isnot(None), spent.c.total > 0)
+        ).order_by(
+            allocations.c.id.is_(None), allocations.c.id, Category.id
+        ).all()
+
+        # Category tree for names and hierarchy
+        tree = get_category_tree(budget_plan.workspace_id, required_ids=[row[0] for row in rows])
+
         realization = []
         total_budgeted = 0
         total_spent = 0
 
-        # Track categories that have budget allocation
-        allocated_category_ids = set()
-
-        for allocation in budget_plan.allocations:
-            allocated_category_ids.add(allocation.category_id)
-
-            # Calculate actual spending
-            actual_spent = db.session.query(
-                func.sum(Transaction.amount)
-            ).filter(
-                and_(
-                    Transaction.category_id == allocation.category_id,
-                    Transaction.type == 'EXPENSE',
-                    Transaction.transaction_date >= budget_plan.period_start,
-                    Transaction.transaction_date <= budget_plan.period_end
-                )
-            ).scalar() or 0
+        for category_id, allocated_amount, amount in rows:
+            actual_spent = float(amount or 0)
+            total_spent += actual_spent
 
-            actual_spent = float(actual_spent)
-            allocated = float(allocation.allocated_amount)
+            if allocated_amount is None:
+                # Spending from a category not in the budget
+                realization.append({
+                    'category_id': category_id,
+                    'category_name': tree.get(category_id).name,
+                    'allocated_amount': 0,
+                    'actual_spent': actual_spent,
+                    'variance': actual_spent,
+                    'variance_percentage': 0,
+                    'status': 'unbudgeted'
+                })
+                continue
 
+            allocated = float(allocated_amount)
             total_budgeted += allocated
-            total_spent += actual_spent
 
             variance = actual_spent - allocated
             variance_pct = (variance / allocated * 100) if allocated > 0 else 0
 
             realization.append({
-                'category_id': allocation.category_id,
-                'category_name': allocation.category.name,
+                'category_id': category_id,
+                'category_name': tree.get(category_id).name,
                 'allocated_amount': allocated,
                 'actual_spent': actual_spent,
                 'variance': variance,
@@ -883,43 +877,8 @@ def get_budget_realization(plan_id: int) -> Tuple[Dict[str, Any], int]:
                 'status': 'over' if variance > 0 else 'under' if variance < 0 else 'on_track'
             })
 
-        # Include spending from categories not in budget (like "Investasi Emas")
-        unbudgeted_spending = db.session.query(
-            Transaction.category_id,
-            Category.name,
-            func.sum(Transaction.amount).label('total')
-        ).join(
-            Category, Transaction.category_id == Category.id
-        ).filter(
-            and_(
-                Transaction.workspace_id == budget_plan.workspace_id,
-                Transaction.type == 'EXPENSE',
-                Transaction.transaction_date >= budget_plan.period_start,
-                Transaction.transaction_date <= budget_plan.period_end,
-                ~Transaction.category_id.in_(allocated_category_ids)
-            )
-        ).group_by(
-            Transaction.category_id,
-            Category.name
-        ).all()
-
-        for category_id, category_name, amount in unbudgeted_spending:
-            if amount and float(amount) > 0:
-                actual_spent = float(amount)
-                total_spent += actual_spent
-
-                realization.append({
-                    'category_id': category_id,
-                    'category_name': category_name,
-                    'allocated_amount': 0,
-                    'actual_spent': actual_spent,
-                    'variance': actual_spent,
-                    'variance_percentage': 0,
-                    'status': 'unbudgeted'
-                })
-
         # Build hierarchical structure
-        hierarchical_realization = build_hierarchical_realization(realization)
+        hierarchical_realization = build_hierarchical_realization(realization, tree)
 
         return {
             'budget_plan': {
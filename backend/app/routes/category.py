@@ -2,30 +2,16 @@
 from flask import Blueprint, request, jsonify
 from flask_jwt_extended import jwt_required, get_jwt_identity
 from app import db
-from app.models import Category, WorkspaceMember
+from app.models import Category
 from app.decorators import require_role
+from app.access import check_workspace_access
+from app.cache import bump_workspace_generation
+from app.categories import invalidate_category_tree
 from typing import Tuple, Dict, Any
 
 category_bp = Blueprint('category', __name__)
 
 
-def check_workspace_access(user_id: int, workspace_id: int) -> bool:
-    """Check if user has access to workspace."""
-    from app.models import User
-
-    # Check if user is Owner (Superadmin) - they can access all workspaces
-    user = User.query.get(user_id)
-    if user and user.is_owner:
-        return True
-
-    # Check normal membership
-    membership = WorkspaceMember.query.filter_by(
-        user_id=user_id,
-        workspace_id=workspace_id
-    ).first()
-    return membership is not None
-
-
 @category_bp.route('', methods=['GET'])
 @jwt_required()
 @require_role('Owner', 'Admin', 'Member', 'Viewer')
@@ -123,7 +109,9 @@ def create_category() -> Tuple[Dict[str, Any], int]:
             parent_id=data.get('parent_id')
         )
         db.session.add(category)
+        bump_workspace_generation(category.workspace_id)
         db.session.commit()
+        invalidate_category_tree(category.workspace_id)
 
         return {
             'message': 'Kategori berhasil dibuat',
@@ -217,7 +205,9 @@ def update_category(category_id: int) -> Tuple[Dict[str, Any], int]:
         if 'parent_id' in data:
             category.parent_id = data['parent_id']
 
+        bump_workspace_generation(category.workspace_id)
         db.session.commit()
+        invalidate_category_tree(category.workspace_id)
 
         return {
             'message': 'Kategori berhasil diperbarui',
@@ -259,8 +249,11 @@ def delete_category(category_id: int) -> Tuple[Dict[str, Any], int]:
         if category.transactions.count() > 0:
             return {'error': 'Kategori tidak dapat dihapus karena sudah digunakan dalam transaksi'}, 400
 
+        workspace_id = category.workspace_id
+        bump_workspace_generation(workspace_id)
         db.session.delete(category)
         db.session.commit()
+        invalidate_category_tree(workspace_id)
 
         return {'message': 'Kategori berhasil dihapus'}, 200
 
@@ -1,5 +1,6 @@
 """Routes for managing daily gold prices."""
 from datetime import datetime, date
+from decimal import Decimal
 from typing import Dict, Any, Tuple
 from flask import Blueprint, request
 from flask_jwt_extended import jwt_required, get_jwt_identity
@@ -7,6 +8,8 @@ from sqlalchemy import desc, asc
 from app import db
 from app.models import GoldPrice
 from app.decorators import require_role
+from app.portfolio import invalidate_gold_valuations
+from app.gold_prices import upsert_gold_prices
 
 gold_price_bp = Blueprint('gold_price', __name__, url_prefix='/api/gold-prices')
 
@@ -20,6 +23,7 @@ def get_gold_prices() -> Tuple[Dict[str, Any], int]:
     Query Parameters:
         - start_date: Filter from this date (YYYY-MM-DD)
         - end_date: Filter until this date (YYYY-MM-DD)
+        - source: Only prices of this source (e.g. ANTAM)
         - limit: Number of records to return (default: 100)
         - order: 'asc' or 'desc' (default: 'desc' - newest first)
     """
@@ -28,8 +32,11 @@ def get_gold_prices() -> Tuple[Dict[str, Any], int]:
         end_date = request.args.get('end_date')
         limit = request.args.get('limit', type=int, default=100)
         order = request.args.get('order', 'desc')
+        source = request.args.get('source')
 
         query = GoldPrice.query
+        if source:
+            query = query.filter(GoldPrice.source == source)
 
         # Apply date filters
         if start_date:
@@ -91,13 +98,27 @@ def get_latest_gold_price() -> Tuple[Dict[str, Any], int]:
 @gold_price_bp.route('/date/<date_str>', methods=['GET'])
 @jwt_required()
 def get_gold_price_by_date(date_str: str) -> Tuple[Dict[str, Any], int]:
-    """Get gold price for a specific date."""
+    """
+    Get gold price for a specific date.
+
+    Query Parameters:
+        - source: Price source (e.g. ANTAM); required when the date has
+          prices from more than one source
+    """
     try:
         price_date = datetime.strptime(date_str, '%Y-%m-%d').date()
-        price = GoldPrice.query.filter_by(date=price_date).first()
+        source = request.args.get('source')
 
-        if not price:
+        query = GoldPrice.query.filter_by(date=price_date)
+        if source:
+            query = query.filter_by(source=source)
+        prices = query.limit(2).all()
+
+        if not prices:
             return {'error': f'Tidak ada data harga emas untuk tanggal {date_str}'}, 404
+        if len(prices) > 1:
+            return {'error': f'Ada beberapa sumber harga emas untuk tanggal {date_str}, source harus diisi'}, 400
+        price = prices[0]
 
         return {
             'id': price.id,
@@ -144,20 +165,23 @@ def create_gold_price() -> Tuple[Dict[str, Any], int]:
         except ValueError:
             return {'error': 'Format tanggal tidak valid. Gunakan YYYY-MM-DD'}, 400
 
-        # Check if price already exists for this date
-        existing_price = GoldPrice.query.filter_by(date=price_date).first()
+        source = data.get('source', 'Manual')
+
+        # Check if price already exists for this date and source (uq_gold_prices_date_source)
+        existing_price = GoldPrice.query.filter_by(date=price_date, source=source).first()
         if existing_price:
-            return {'error': f'Harga emas untuk tanggal {data["date"]} sudah ada'}, 400
+            return {'error': f'Harga emas {source} untuk tanggal {data["date"]} sudah ada'}, 400
 
         # Create new gold price
         new_price = GoldPrice(
             date=price_date,
             price_per_gram=data['price_per_gram'],
-            source=data.get('source', 'Manual'),
+            source=source,
             notes=data.get('notes')
         )
 
         db.session.add(new_price)
+        invalidate_gold_valuations([new_price.source])
         db.session.commit()
 
         return {
@@ -195,6 +219,8 @@ def update_gold_price(price_id: int) -> Tuple[Dict[str, Any], int]:
             return {'error': 'Harga emas tidak ditemukan'}, 404
 
         data = request.get_json()
+        # Investments of the old source are revalued too when the source changes
+        affected_sources = [price.source]
 
         # Update fields
         if 'price_per_gram' in data:
@@ -206,6 +232,7 @@ def update_gold_price(price_id: int) -> Tuple[Dict[str, Any], int]:
 
         price.updated_at = datetime.utcnow()
 
+        invalidate_gold_valuations(affected_sources + [price.source])
         db.session.commit()
 
         return {
@@ -233,6 +260,7 @@ def delete_gold_price(price_id: int) -> Tuple[Dict[str, Any], int]:
         if not price:
             return {'error': 'Harga emas tidak ditemukan'}, 404
 
+        invalidate_gold_valuations([price.source])
         db.session.delete(price)
         db.session.commit()
 
@@ -247,7 +275,11 @@ def delete_gold_price(price_id: int) -> Tuple[Dict[str, Any], int]:
 @require_role('Owner', 'Admin')
 def bulk_create_gold_prices() -> Tuple[Dict[str, Any], int]:
     """
-    Bulk create gold price entries.
+    Bulk create or update gold price entries.
+
+    Entries are upserted on (date, source) in batches; an existing entry is
+    updated when its prices or notes differ and counted as skipped when
+    they are the same.
 
     Expected JSON:
         {
@@ -255,7 +287,8 @@ def bulk_create_gold_prices() -> Tuple[Dict[str, Any], int]:
                 {
                     "date": "2026-01-01",
                     "price_per_gram": 1250000,
-                    "source": "Manual"
+                    "buyback_price": 1150000,
+                    "source": "ANTAM"
                 },
                 {
                     "date": "2026-01-02",
@@ -271,39 +304,31 @@ def bulk_create_gold_prices() -> Tuple[Dict[str, Any], int]:
         if not data.get('prices') or not isinstance(data['prices'], list):
             return {'error': 'Data prices harus berupa array'}, 400
 
-        created_count = 0
-        skipped_count = 0
+        rows = []
         errors = []
 
         for price_data in data['prices']:
             try:
-                # Parse date
-                price_date = datetime.strptime(price_data['date'], '%Y-%m-%d').date()
-
-                # Check if exists
-                if GoldPrice.query.filter_by(date=price_date).first():
-                    skipped_count += 1
-                    continue
-
-                # Create price
-                new_price = GoldPrice(
-                    date=price_date,
-                    price_per_gram=price_data['price_per_gram'],
-                    source=price_data.get('source', 'Manual'),
-                    notes=price_data.get('notes')
-                )
-                db.session.add(new_price)
-                created_count += 1
-
+                buyback_price = price_data.get('buyback_price')
+                rows.append({
+                    'date': datetime.strptime(price_data['date'], '%Y-%m-%d').date(),
+                    'price_per_gram': Decimal(str(price_data['price_per_gram'])),
+                    'buyback_price': Decimal(str(buyback_price)) if buyback_price is not None else None,
+                    'source': price_data.get('source', 'Manual'),
+                    'notes': price_data.get('notes')
+                })
             except Exception as e:
                 errors.append(f"Error on date {price_data.get('date')}: {str(e)}")
 
+        result = upsert_gold_prices(rows)
+        invalidate_gold_valuations(result['sources'])
         db.session.commit()
 
         return {
-            'message': f'Berhasil menambahkan {created_count} harga emas',
-            'created': created_count,
-            'skipped': skipped_count,
+            'message': f'Berhasil menambahkan {result["created"]} dan memperbarui {result["updated"]} harga emas',
+            'created': result['created'],
+            'updated': result['updated'],
+            'skipped': result['skipped'],
             'errors': errors
         }, 201
     except Exception as e:
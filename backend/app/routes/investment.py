@@ -2,9 +2,17 @@
 from flask import Blueprint, request, jsonify
 from flask_jwt_extended import jwt_required, get_jwt_identity
 from app import db
-from app.models import Investment, WorkspaceMember, Transaction, Category, Account, GoldPriceSetting, GoldPrice
+from app.models import Investment, Transaction, Category, Account, GoldPriceSetting
 from app.decorators import require_role
-from datetime import datetime, date
+from app.access import check_workspace_access
+from app.ledger import apply_transaction, revert_transaction
+from app.cache import bump_workspace_generation, cached_response
+from app.duplicates import fingerprint_of
+from app.categories import invalidate_category_tree
+from app.portfolio import list_investments, invalidate_gold_valuations, priced_investment_counts, value_series
+from app.trends import GRANULARITIES
+from app.gold_prices import price_history, upsert_gold_prices, upsert_gold_price_settings
+from datetime import datetime, date, timedelta
 from decimal import Decimal
 from typing import Tuple, Dict, Any
 import requests
@@ -25,32 +33,17 @@ def formatCurrency(amount: float) -> str:
     return f"Rp {amount:,.0f}".replace(',', '.')
 
 
-def check_workspace_access(user_id: int, workspace_id: int) -> bool:
-    """Check if user has access to workspace."""
-    from app.models import User
-
-    # Check if user is Owner (Superadmin)
-    user = User.query.get(user_id)
-    if user and user.is_owner:
-        return True
-
-    # Check normal membership
-    membership = WorkspaceMember.query.filter_by(
-        user_id=user_id,
-        workspace_id=workspace_id
-    ).first()
-    return membership is not None
-
-
 @investment_bp.route('', methods=['GET'])
 @jwt_required()
 @require_role('Owner', 'Admin', 'Member', 'Viewer')
 def get_investments() -> Tuple[Dict[str, Any], int]:
     """
-    Get all investments for a workspace.
+    Get all investments for a workspace, valued at the latest gold buyback prices.
 
     Query params:
         workspace_id: int (required)
+        as_of: str (optional) - YYYY-MM-DD, value the investments held on
+            that date at that date's prices
 
     Returns:
         JSON response with list of investments
@@ -65,36 +58,65 @@ def get_investments() -> Tuple[Dict[str, Any], int]:
         if not check_workspace_access(current_user_id, workspace_id):
             return {'error': 'Anda tidak memiliki akses ke workspace ini'}, 403
 
-        investments = Investment.query.filter_by(workspace_id=workspace_id).order_by(Investment.purchase_date.desc()).all()
+        as_of = request.args.get('as_of')
+        if as_of:
+            try:
+                as_of = datetime.strptime(as_of, '%Y-%m-%d').date()
+            except ValueError:
+                return {'error': 'Format tanggal tidak valid (gunakan YYYY-MM-DD)'}, 400
 
-        return {
-            'investments': [{
-                'id': inv.id,
-                'name': inv.name,
-                'type': inv.type,
-                'gold_type': inv.gold_type,
-                'weight': float(inv.weight) if inv.weight else None,
-                'account_id': inv.account_id,
-                'account': {
-                    'id': inv.account.id,
-                    'name': inv.account.name,
-                } if inv.account else None,
-                'quantity': float(inv.quantity),
-                'buy_price': float(inv.buy_price),
-                'current_price': float(inv.current_price) if inv.current_price else None,
-                'purchase_date': inv.purchase_date.isoformat(),
-                'notes': inv.notes,
-                'total_buy_value': float(inv.total_buy_value),
-                'total_current_value': float(inv.total_current_value) if inv.total_current_value else None,
-                'profit_loss': float(inv.profit_loss) if inv.profit_loss else None,
-                'profit_loss_percentage': float(inv.profit_loss_percentage) if inv.profit_loss_percentage else None,
-            } for inv in investments]
-        }, 200
+        return {'investments': list_investments(workspace_id, as_of or None)}, 200
 
     except Exception as e:
         return {'error': f'Gagal mengambil data investasi: {str(e)}'}, 500
 
 
+@investment_bp.route('/value-series', methods=['GET'])
+@jwt_required()
+@require_role('Owner', 'Admin', 'Member', 'Viewer')
+@cached_response
+def get_value_series() -> Tuple[Dict[str, Any], int]:
+    """
+    Get the value of a workspace's gold over time, for the portfolio chart.
+
+    Query params:
+        workspace_id: int (required)
+        granularity: str (optional, default month) - day, week or month
+        start_date: str (optional) - YYYY-MM-DD, default first purchase
+        end_date: str (optional) - YYYY-MM-DD, default today
+
+    Returns:
+        JSON response with one point per bucket, valued at the bucket's last day
+    """
+    try:
+        current_user_id = int(get_jwt_identity())
+        workspace_id = request.args.get('workspace_id', type=int)
+        granularity = request.args.get('granularity', 'month')
+
+        if not workspace_id:
+            return {'error': 'workspace_id harus diisi'}, 400
+
+        if granularity not in GRANULARITIES:
+            return {'error': f'granularity harus salah satu dari: {", ".join(GRANULARITIES)}'}, 400
+
+        if not check_workspace_access(current_user_id, workspace_id):
+            return {'error': 'Anda tidak memiliki akses ke workspace ini'}, 403
+
+        try:
+            start_date = request.args.get('start_date')
+            end_date = request.args.get('end_date')
+            start_date = datetime.strptime(start_date, '%Y-%m-%d').date() if start_date else None
+            end_date = datetime.strptime(end_date, '%Y-%m-%d').date() if end_date else None
+        except ValueError:
+            return {'error': 'Format tanggal tidak valid (gunakan YYYY-MM-DD)'}, 400
+
+        series = value_series(workspace_id, start_date, end_date, granularity)
+        return {'granularity': granularity, 'series': series}, 200
+
+    except Exception as e:
+        return {'error': f'Gagal mengambil nilai portofolio: {str(e)}'}, 500
+
+
 @investment_bp.route('', methods=['POST'])
 @jwt_required()
 @require_role('Owner', 'Admin', 'Member')
@@ -164,6 +186,7 @@ def create_investment() -> Tuple[Dict[str, Any], int]:
 
         # Create expense transaction if account is specified
         transaction = None
+        created_category = False
         if data.get('account_id'):
             # Find or create "Investasi Emas" category
             category = Category.query.filter_by(
@@ -182,6 +205,7 @@ def create_investment() -> Tuple[Dict[str, Any], int]:
                 )
                 db.session.add(category)
                 db.session.flush()
+                created_category = True
 
             # Create transaction
             transaction = Transaction(
@@ -194,13 +218,18 @@ def create_investment() -> Tuple[Dict[str, Any], int]:
                 description=f"Pembelian {data['name']} - {weight}g @ {formatCurrency(float(buy_price))}/g",
                 created_at=get_wib_now()
             )
+            transaction.fingerprint = fingerprint_of(transaction)
             db.session.add(transaction)
             db.session.flush()
+            apply_transaction(transaction)
 
             # Link transaction to investment
             investment.transaction_id = transaction.id
 
+        bump_workspace_generation(investment.workspace_id)
         db.session.commit()
+        if created_category:
+            invalidate_category_tree(investment.workspace_id)
 
         return {
             'message': 'Investasi berhasil ditambahkan',
@@ -253,6 +282,7 @@ def update_investment(investment_id: int) -> Tuple[Dict[str, Any], int]:
             investment.notes = data['notes']
 
         investment.updated_at = get_wib_now()
+        bump_workspace_generation(investment.workspace_id)
         db.session.commit()
 
         return {'message': 'Investasi berhasil diperbarui'}, 200
@@ -281,8 +311,10 @@ def delete_investment(investment_id: int) -> Tuple[Dict[str, Any], int]:
         if investment.transaction_id:
             transaction = Transaction.query.get(investment.transaction_id)
             if transaction:
+                revert_transaction(transaction)
                 db.session.delete(transaction)
 
+        bump_workspace_generation(investment.workspace_id)
         db.session.delete(investment)
         db.session.commit()
 
@@ -425,6 +457,7 @@ def set_gold_price() -> Tuple[Dict[str, Any], int]:
             db.session.add(setting)
             message = f'Harga {data["gold_type"]} berhasil ditambahkan'
 
+        bump_workspace_generation(workspace_id)
         db.session.commit()
 
         return {
@@ -476,8 +509,7 @@ def set_all_gold_prices() -> Tuple[Dict[str, Any], int]:
             return {'error': 'prices harus diisi'}, 400
 
         valid_types = ['ANTAM', 'GALERI24', 'UBS']
-        updated_count = 0
-        today = date.today()
+        settings = []
 
         for price_data in prices:
             gold_type = price_data.get('gold_type')
@@ -486,67 +518,35 @@ def set_all_gold_prices() -> Tuple[Dict[str, Any], int]:
 
             buy_price = price_data.get('buy_price')
             buyback_price = price_data.get('buyback_price')
-            source_link = price_data.get('source_link')
 
             if not buy_price or not buyback_price:
                 continue
 
-            # Check if setting exists
-            setting = GoldPriceSetting.query.filter_by(
-                workspace_id=workspace_id,
-                gold_type=gold_type
-            ).first()
-
-            if setting:
-                # Update existing
-                setting.buy_price = Decimal(str(buy_price))
-                setting.buyback_price = Decimal(str(buyback_price))
-                setting.source_link = source_link
-                setting.updated_by = current_user_id
-                setting.updated_at = get_wib_now()
-            else:
-                # Create new
-                setting = GoldPriceSetting(
-                    workspace_id=workspace_id,
-                    gold_type=gold_type,
-                    buy_price=Decimal(str(buy_price)),
-                    buyback_price=Decimal(str(buyback_price)),
-                    source_link=source_link,
-                    updated_by=current_user_id,
-                    created_at=get_wib_now(),
-                    updated_at=get_wib_now()
-                )
-                db.session.add(setting)
-
-            # Save to gold_prices history table
-            # Check if price already exists for today and this gold type
-            existing_gold_price = GoldPrice.query.filter_by(
-                date=today,
-                source=gold_type
-            ).first()
+            settings.append({
+                'gold_type': gold_type,
+                'buy_price': Decimal(str(buy_price)),
+                'buyback_price': Decimal(str(buyback_price)),
+                'source_link': price_data.get('source_link')
+            })
 
-            if existing_gold_price:
-                # Update existing price for today
-                existing_gold_price.price_per_gram = Decimal(str(buy_price))
-                existing_gold_price.buyback_price = Decimal(str(buyback_price))
-                if source_link:
-                    existing_gold_price.notes = f"Link: {source_link}"
-                existing_gold_price.updated_at = get_wib_now()
-            else:
-                # Create new price record for today
-                new_gold_price = GoldPrice(
-                    date=today,
-                    price_per_gram=Decimal(str(buy_price)),
-                    buyback_price=Decimal(str(buyback_price)),
-                    source=gold_type,
-                    notes=f"Link: {source_link}" if source_link else None,
-                    created_at=get_wib_now(),
-                    updated_at=get_wib_now()
-                )
-                db.session.add(new_gold_price)
+        updated_count = upsert_gold_price_settings(workspace_id, settings, current_user_id, get_wib_now())
 
-            updated_count += 1
+        # Save to gold_prices history table, one row per gold type for today
+        today = date.today()
+        upsert_gold_prices([
+            {
+                'date': today,
+                'source': setting['gold_type'],
+                'price_per_gram': setting['buy_price'],
+                'buyback_price': setting['buyback_price'],
+                'notes': f"Link: {setting['source_link']}" if setting['source_link'] else None
+            }
+            for setting in settings
+        ])
 
+        bump_workspace_generation(workspace_id)
+        # Today's gold_prices rows are shared with every workspace holding these types
+        invalidate_gold_valuations(setting['gold_type'] for setting in settings)
         db.session.commit()
 
         return {
@@ -564,7 +564,10 @@ def set_all_gold_prices() -> Tuple[Dict[str, Any], int]:
 @require_role('Owner', 'Admin', 'Member')
 def update_current_price(investment_id: int) -> Tuple[Dict[str, Any], int]:
     """
-    Update current price of an investment.
+    Update the manual current price of an investment.
+
+    The manual price is only used while no gold price or workspace gold
+    price setting exists for the investment's gold type.
 
     Request body:
         current_price: float (required)
@@ -588,6 +591,7 @@ def update_current_price(investment_id: int) -> Tuple[Dict[str, Any], int]:
 
         investment.current_price = Decimal(str(data['current_price']))
         investment.updated_at = get_wib_now()
+        bump_workspace_generation(investment.workspace_id)
         db.session.commit()
 
         return {
@@ -606,7 +610,11 @@ def update_current_price(investment_id: int) -> Tuple[Dict[str, Any], int]:
 @require_role('Owner', 'Admin', 'Member')
 def auto_update_all_prices() -> Tuple[Dict[str, Any], int]:
     """
-    Auto-update all gold investment prices based on their gold_type.
+    Report how many gold investments are valued at a market price.
+
+    Investments are valued on read from the latest gold prices, so nothing
+    is written; the endpoint is kept for clients that still call it after
+    changing prices.
 
     Request body:
         workspace_id: int (required)
@@ -625,46 +633,16 @@ def auto_update_all_prices() -> Tuple[Dict[str, Any], int]:
         if not check_workspace_access(current_user_id, workspace_id):
             return {'error': 'Anda tidak memiliki akses ke workspace ini'}, 403
 
-        # Get workspace-specific gold prices
-        price_settings = GoldPriceSetting.query.filter_by(workspace_id=workspace_id).all()
-
-        if not price_settings:
-            return {'error': 'Belum ada pengaturan harga emas untuk workspace ini. Silakan atur harga terlebih dahulu.'}, 400
-
-        # Build prices dictionary from settings
-        prices = {}
-        for setting in price_settings:
-            prices[setting.gold_type] = {
-                'buyback': float(setting.buyback_price),
-                'sell': float(setting.buy_price)
-            }
-
-        # Get all gold investments in workspace
-        investments = Investment.query.filter_by(
-            workspace_id=workspace_id,
-            type='GOLD'
-        ).all()
-
-        updated_count = 0
-        for investment in investments:
-            if investment.gold_type and investment.gold_type in prices:
-                # Use buyback price for current price
-                buyback_price = prices[investment.gold_type]['buyback']
-                investment.current_price = Decimal(str(buyback_price))
-                investment.updated_at = get_wib_now()
-                updated_count += 1
-
-        db.session.commit()
+        counts = priced_investment_counts(workspace_id)
 
         return {
-            'message': f'{updated_count} investasi berhasil diperbarui',
-            'updated_count': updated_count,
-            'total_investments': len(investments),
+            'message': f'{counts["priced"]} investasi dinilai dengan harga emas terbaru',
+            'updated_count': counts['priced'],
+            'total_investments': counts['total'],
             'timestamp': get_wib_now().isoformat()
         }, 200
 
     except Exception as e:
-        db.session.rollback()
         return {'error': f'Gagal memperbarui harga otomatis: {str(e)}'}, 500
 
 
@@ -672,52 +650,39 @@ def auto_update_all_prices() -> Tuple[Dict[str, Any], int]:
 @jwt_required()
 def get_gold_price_history() -> Tuple[Dict[str, Any], int]:
     """
-    Get gold price history from gold_prices table.
+    Get gold price history from gold_prices table, with the change per source.
 
     Query params:
-        limit: int (optional, default 30) - number of records to return
+        limit: int (optional, default 30) - number of records per source
         days: int (optional, default 30) - number of days to look back
+        source: str (optional) - only this gold type (ANTAM, GALERI24, UBS)
 
     Returns:
-        JSON response with price history
+        JSON response with price history, newest first
     """
     try:
         limit = request.args.get('limit', 30, type=int)
         days = request.args.get('days', 30, type=int)
+        source = request.args.get('source')
 
-        # Get recent gold prices ordered by date descending
-        gold_prices = GoldPrice.query.order_by(
-            GoldPrice.date.desc()
-        ).limit(limit).all()
-
-        history = []
-        for price in gold_prices:
-            history.append({
-                'id': price.id,
-                'date': price.date.isoformat(),
-                'price_per_gram': float(price.price_per_gram),
-                'buyback_price': float(price.buyback_price) if price.buyback_price else None,
-                'source': price.source,
-                'notes': price.notes,
-                'created_at': price.created_at.isoformat() if price.created_at else None,
-                'updated_at': price.updated_at.isoformat() if price.updated_at else None
-            })
+        if limit < 1 or days < 1:
+            return {'error': 'limit dan days harus lebih dari 0'}, 400
+
+        history = price_history(date.today() - timedelta(days=days), source, limit)
 
-        # Calculate price change if we have at least 2 records
-        price_change = None
-        price_change_percent = None
-        if len(history) >= 2:
-            latest = history[0]['price_per_gram']
-            previous = history[1]['price_per_gram']
-            price_change = latest - previous
-            price_change_percent = (price_change / previous) * 100 if previous > 0 else 0
+        # Latest row of each source; its change is against the same source's previous day
+        latest_by_source = {}
+        for price in history:
+            latest_by_source.setdefault(price['source'], price)
+        latest = history[0] if history else None
 
         return {
             'history': history,
             'count': len(history),
-            'latest_price': history[0] if history else None,
-            'price_change': price_change,
-            'price_change_percent': round(price_change_percent, 2) if price_change_percent is not None else None
+            'latest_price': latest,
+            'latest_by_source': latest_by_source,
+            'price_change': latest['price_change'] if latest else None,
+            'price_change_percent': latest['price_change_percent'] if latest else None
         }, 200
 
     except Exception as e:
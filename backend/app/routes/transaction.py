@@ -1,32 +1,149 @@
 """Transaction routes."""
-from flask import Blueprint, request, jsonify
+from flask import Blueprint, Response, request, jsonify, stream_with_context
 from flask_jwt_extended import jwt_required, get_jwt_identity
 from app import db
-from app.models import Transaction, WorkspaceMember, Account, Category
+from app.models import Transaction, Account, Category, DailyRollup
 from app.decorators import require_role
-from sqlalchemy import func, and_, or_, extract
+from app.access import check_workspace_access
+from app.ledger import apply_transaction, revert_transaction
+from app.balances import get_total_balance
+from app.cache import cached_response, bump_workspace_generation
+from app.bulk import MAX_BULK_ROWS, validate_transactions, insert_transactions
+from app.duplicates import fingerprint_of, find_existing, flag_duplicates, duplicate_groups
+from app.importer import DEFAULT_BATCH_SIZE, load_mapping, read_rows, import_transactions
+from app.search import search_filter, search_rank
+from app.categories import invalidate_category_tree
+from sqlalchemy import func, and_, or_
+from sqlalchemy.orm import aliased, joinedload
 from datetime import datetime, date
 from decimal import Decimal
+import base64
+import binascii
+import csv
+import io
+import json
 from typing import Tuple, Dict, Any, Optional
 
 transaction_bp = Blueprint('transaction', __name__)
 
+# Export formats and their mimetypes
+EXPORT_FORMATS = {
+    'csv': 'text/csv',
+    'jsonl': 'application/x-ndjson',
+}
+
+EXPORT_COLUMNS = [
+    'id', 'transaction_date', 'type', 'amount', 'description',
+    'account', 'transfer_to_account', 'category', 'created_at'
+]
+
+# Rows fetched from the server-side cursor, and written to the response, at a time
+EXPORT_CHUNK_SIZE = 1000
+
+# Largest page of the transaction list; per_page is clamped to 1..MAX_PER_PAGE
+MAX_PER_PAGE = 1000
+
+
+# Relationships read by serialize_transaction, loaded in the same query
+TRANSACTION_RELATIONS = (
+    joinedload(Transaction.account),
+    joinedload(Transaction.transfer_to_account),
+    joinedload(Transaction.category),
+)
+
+
+def serialize_transaction(txn: Transaction) -> Dict[str, Any]:
+    """Convert a transaction with its account and category to a dict."""
+    txn_data = {
+        'id': txn.id,
+        'type': txn.type,
+        'amount': float(txn.amount),
+        'transaction_date': txn.transaction_date.isoformat(),
+        'description': txn.description,
+        'created_at': txn.created_at.isoformat(),
+        'account': {
+            'id': txn.account.id,
+            'name': txn.account.name
+        } if txn.account else None
+    }
+
+    if txn.transfer_to_account_id:
+        txn_data['transfer_to_account'] = {
+            'id': txn.transfer_to_account.id,
+            'name': txn.transfer_to_account.name
+        }
+
+    if txn.category_id:
+        txn_data['category'] = {
+            'id': txn.category.id,
+            'name': txn.category.name,
+            'type': txn.category.type
+        }
+
+    return txn_data
+
+
+def encode_cursor(txn: Transaction, rank: Optional[float] = None) -> str:
+    """
+    Encode the (transaction_date, id) position of a transaction as an opaque cursor.
+
+    Search results are ordered by rank first, so their cursors carry it too.
+    """
+    raw = f'{txn.transaction_date.isoformat()}|{txn.id}'
+    if rank is not None:
+        raw += f'|{float(rank)!r}'
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip('=')
+
+
+def decode_cursor(cursor: str, ranked: bool = False) -> Tuple[date, int, Optional[float]]:
+    """Decode a cursor produced by encode_cursor. Raises ValueError when malformed."""
+    try:
+        raw = base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4)).decode()
+        parts = raw.split('|')
+        if len(parts) != (3 if ranked else 2):
+            raise ValueError(raw)
+        rank = float(parts[2]) if ranked else None
+        return datetime.strptime(parts[0], '%Y-%m-%d').date(), int(parts[1]), rank
+    except (ValueError, UnicodeDecodeError, binascii.Error):
+        raise ValueError('cursor tidak valid')
+
+
+def filter_transactions(query, workspace_id: int):
+    """
+    Apply the workspace and list filters from the query string to a transaction query.
+
+    Shared by the list and export endpoints. Raises ValueError on a malformed date.
+    """
+    query = query.filter(Transaction.workspace_id == workspace_id)
+
+    if request.args.get('start_date'):
+        start_date = datetime.strptime(request.args.get('start_date'), '%Y-%m-%d').date()
+        query = query.filter(Transaction.transaction_date >= start_date)
+
+    if request.args.get('end_date'):
+        end_date = datetime.strptime(request.args.get('end_date'), '%Y-%m-%d').date()
+        query = query.filter(Transaction.transaction_date <= end_date)
+
+    if request.args.get('type'):
+        query = query.filter(Transaction.type == request.args.get('type'))
+
+    if request.args.get('account_id'):
+        account_id = request.args.get('account_id', type=int)
+        query = query.filter(
+            or_(
+                Transaction.account_id == account_id,
+                Transaction.transfer_to_account_id == account_id
+            )
+        )
 
-def check_workspace_access(user_id: int, workspace_id: int) -> bool:
-    """Check if user has access to workspace."""
-    from app.models import User
+    if request.args.get('category_id'):
+        category_id = request.args.get('category_id', type=int)
+        query = query.filter(Transaction.category_id == category_id)
 
-    # Check if user is Owner (Superadmin) - they can access all workspaces
-    user = User.query.get(user_id)
-    if user and user.is_owner:
-        return True
+    if request.args.get('q', '').strip():
+        query = query.filter(search_filter(request.args.get('q').strip()))
 
-    # Check normal membership
-    membership = WorkspaceMember.query.filter_by(
-        user_id=user_id,
-        workspace_id=workspace_id
-    ).first()
-    return membership is not None
+    return query
 
 
 @transaction_bp.route('', methods=['GET'])
@@ -43,6 +160,11 @@ def get_transactions() -> Tuple[Dict[str, Any], int]:
         type: str (optional) - INCOME, EXPENSE, TRANSFER
         account_id: int (optional)
         category_id: int (optional)
+        q: str (optional) - search descriptions; results are ordered by relevance, then date
+        cursor: str (optional) - keyset pagination; pass '' for the first page, then next_cursor
+        page: int (optional, default 1) - offset pagination, used when cursor is absent
+        per_page: int (optional, default 200, at most 1000)
+        include_total: bool (optional, default true) - set false to skip the COUNT query
 
     Returns:
         JSON response with list of transactions
@@ -58,81 +180,173 @@ def get_transactions() -> Tuple[Dict[str, Any], int]:
         if not check_workspace_access(current_user_id, workspace_id):
             return {'error': 'Akses ditolak'}, 403
 
-        # Build query
-        query = Transaction.query.filter_by(workspace_id=workspace_id)
+        # Build query (related accounts and category are joined in, not lazy-loaded per row)
+        query = filter_transactions(Transaction.query.options(*TRANSACTION_RELATIONS), workspace_id)
 
-        # Apply filters
-        if request.args.get('start_date'):
-            start_date = datetime.strptime(request.args.get('start_date'), '%Y-%m-%d').date()
-            query = query.filter(Transaction.transaction_date >= start_date)
+        # Pagination support
+        per_page = min(max(request.args.get('per_page', type=int, default=200), 1), MAX_PER_PAGE)
+        cursor = request.args.get('cursor')
+        include_total = request.args.get('include_total', 'true').lower() != 'false'
+
+        # Search results come with their rank, which leads the ordering
+        search = request.args.get('q', '').strip()
+        rank = search_rank(search) if search else None
+        if rank is not None:
+            query = query.add_columns(rank.label('rank')).order_by(rank.desc())
+
+        # Stable ordering: many rows share a date, so id breaks ties
+        query = query.order_by(Transaction.transaction_date.desc(), Transaction.id.desc())
+
+        if cursor is not None:
+            # Keyset pagination: constant cost per page regardless of depth
+            total = query.order_by(None).count() if include_total else None
+            if cursor:
+                try:
+                    cursor_date, cursor_id, cursor_rank = decode_cursor(cursor, ranked=rank is not None)
+                except ValueError as e:
+                    return {'error': str(e)}, 400
+                after_cursor = or_(
+                    Transaction.transaction_date < cursor_date,
+                    and_(Transaction.transaction_date == cursor_date, Transaction.id < cursor_id)
+                )
+                if rank is not None:
+                    after_cursor = or_(rank < cursor_rank, and_(rank == cursor_rank, after_cursor))
+                query = query.filter(after_cursor)
 
-        if request.args.get('end_date'):
-            end_date = datetime.strptime(request.args.get('end_date'), '%Y-%m-%d').date()
-            query = query.filter(Transaction.transaction_date <= end_date)
+            rows = query.limit(per_page + 1).all()
+            has_more = len(rows) > per_page
+            rows = rows[:per_page]
+        else:
+            page = request.args.get('page', type=int, default=1)
+            pagination = query.paginate(page=page, per_page=per_page, error_out=False, count=include_total)
+            rows = pagination.items
+            has_more = bool(rows) and len(rows) == per_page
+
+        if rank is not None:
+            transactions = [txn for txn, _ in rows]
+            ranks = [row_rank for _, row_rank in rows]
+        else:
+            transactions = rows
+            ranks = [None] * len(rows)
 
-        if request.args.get('type'):
-            query = query.filter_by(type=request.args.get('type'))
+        pagination_data = {
+            'per_page': per_page,
+            'next_cursor': encode_cursor(transactions[-1], ranks[-1]) if has_more else None
+        }
+        if cursor is None:
+            pagination_data['page'] = page
+            if include_total:
+                pagination_data['total_pages'] = pagination.pages
+                pagination_data['total'] = pagination.total
+        elif include_total:
+            pagination_data['total'] = total
+
+        transaction_list = [serialize_transaction(txn) for txn in transactions]
+        if rank is not None:
+            for txn_data, row_rank in zip(transaction_list, ranks):
+                txn_data['rank'] = float(row_rank)
 
-        if request.args.get('account_id'):
-            account_id = request.args.get('account_id', type=int)
-            query = query.filter(
-                or_(
-                    Transaction.account_id == account_id,
-                    Transaction.transfer_to_account_id == account_id
-                )
-            )
+        return {
+            'transactions': transaction_list,
+            **pagination_data
+        }, 200
 
-        if request.args.get('category_id'):
-            category_id = request.args.get('category_id', type=int)
-            query = query.filter_by(category_id=category_id)
+    except Exception as e:
+        return {'error': f'Gagal mengambil transaksi: {str(e)}'}, 500
 
-        # Pagination support
-        page = request.args.get('page', type=int, default=1)
-        per_page = request.args.get('per_page', type=int, default=200)
-
-        pagination = query.order_by(Transaction.transaction_date.desc()).paginate(page=page, per_page=per_page, error_out=False)
-        transactions = pagination.items
-
-        transaction_list = []
-        for txn in transactions:
-            txn_data = {
-                'id': txn.id,
-                'type': txn.type,
-                'amount': float(txn.amount),
-                'transaction_date': txn.transaction_date.isoformat(),
-                'description': txn.description,
-                'created_at': txn.created_at.isoformat(),
-                'account': {
-                    'id': txn.account.id,
-                    'name': txn.account.name
-                } if txn.account else None
-            }
 
-            if txn.transfer_to_account_id:
-                txn_data['transfer_to_account'] = {
-                    'id': txn.transfer_to_account.id,
-                    'name': txn.transfer_to_account.name
-                }
+@transaction_bp.route('/export', methods=['GET'])
+@jwt_required()
+@require_role('Owner', 'Admin', 'Member', 'Viewer')
+def export_transactions():
+    """
+    Export transactions as a streamed CSV or JSON Lines file.
 
-            if txn.category_id:
-                txn_data['category'] = {
-                    'id': txn.category.id,
-                    'name': txn.category.name,
-                    'type': txn.category.type
-                }
+    Rows are fetched through a server-side cursor in chunks of EXPORT_CHUNK_SIZE
+    and written out as they arrive, so memory use does not grow with the
+    number of transactions.
 
-            transaction_list.append(txn_data)
+    Query params:
+        workspace_id: int (required)
+        format: str (optional, default csv) - csv or jsonl
+        start_date, end_date, type, account_id, category_id, q: same filters as GET /api/transactions
 
-        return {
-            'transactions': transaction_list,
-            'page': page,
-            'per_page': per_page,
-            'total_pages': pagination.pages,
-            'total': pagination.total
-        }, 200
+    Returns:
+        Streamed file download
+    """
+    try:
+        current_user_id = int(get_jwt_identity())
+        workspace_id = request.args.get('workspace_id', type=int)
+        export_format = request.args.get('format', 'csv')
+
+        if not workspace_id:
+            return {'error': 'workspace_id harus diisi'}, 400
+
+        if export_format not in EXPORT_FORMATS:
+            return {'error': f'format harus salah satu dari: {", ".join(EXPORT_FORMATS)}'}, 400
+
+        if not check_workspace_access(current_user_id, workspace_id):
+            return {'error': 'Akses ditolak'}, 403
+
+        transfer_account = aliased(Account)
+        query = db.session.query(
+            Transaction.id,
+            Transaction.transaction_date,
+            Transaction.type,
+            Transaction.amount,
+            Transaction.description,
+            Account.name,
+            transfer_account.name,
+            Category.name,
+            Transaction.created_at
+        ).select_from(Transaction).outerjoin(
+            Account, Transaction.account_id == Account.id
+        ).outerjoin(
+            transfer_account, Transaction.transfer_to_account_id == transfer_account.id
+        ).outerjoin(
+            Category, Transaction.category_id == Category.id
+        )
+
+        try:
+            query = filter_transactions(query, workspace_id)
+        except ValueError as e:
+            return {'error': f'Format tanggal tidak valid: {str(e)}'}, 400
+
+        query = query.order_by(Transaction.transaction_date.desc(), Transaction.id.desc())
+
+        def generate():
+            buffer = io.StringIO()
+            writer = csv.writer(buffer)
+            if export_format == 'csv':
+                writer.writerow(EXPORT_COLUMNS)
+
+            for count, row in enumerate(query.yield_per(EXPORT_CHUNK_SIZE), 1):
+                values = dict(zip(EXPORT_COLUMNS, row))
+                values['transaction_date'] = values['transaction_date'].isoformat()
+                values['amount'] = str(values['amount'])
+                values['created_at'] = values['created_at'].isoformat() if values['created_at'] else None
+
+                if export_format == 'csv':
+                    writer.writerow(values.values())
+                else:
+                    buffer.write(json.dumps(values, ensure_ascii=False) + '\n')
+
+                if count % EXPORT_CHUNK_SIZE == 0:
+                    yield buffer.getvalue()
+                    buffer.seek(0)
+                    buffer.truncate()
+
+            yield buffer.getvalue()
+
+        filename = f'transaksi-{workspace_id}-{date.today().isoformat()}.{export_format}'
+        return Response(
+            stream_with_context(generate()),
+            mimetype=EXPORT_FORMATS[export_format],
+            headers={'Content-Disposition': f'attachment; filename="{filename}"'}
+        )
 
     except Exception as e:
-        return {'error': f'Gagal mengambil transaksi: {str(e)}'}, 500
+        return {'error': f'Gagal export transaksi: {str(e)}'}, 500
 
 
 @transaction_bp.route('', methods=['POST'])
@@ -233,7 +447,12 @@ def create_transaction() -> Tuple[Dict[str, Any], int]:
             transaction_date=txn_date,
             description=data.get('description', '')
         )
+        transaction.fingerprint = fingerprint_of(transaction)
+        duplicates = find_existing(workspace_id, [transaction.fingerprint]).get(transaction.fingerprint, [])
+
         db.session.add(transaction)
+        apply_transaction(transaction)
+        bump_workspace_generation(transaction.workspace_id)
         db.session.commit()
 
         return {
@@ -244,7 +463,8 @@ def create_transaction() -> Tuple[Dict[str, Any], int]:
                 'amount': float(transaction.amount),
                 'transaction_date': transaction.transaction_date.isoformat(),
                 'description': transaction.description
-            }
+            },
+            'possible_duplicate_of': duplicates
         }, 201
 
     except ValueError as e:
@@ -254,6 +474,241 @@ def create_transaction() -> Tuple[Dict[str, Any], int]:
         return {'error': f'Gagal membuat transaksi: {str(e)}'}, 500
 
 
+@transaction_bp.route('/bulk', methods=['POST'])
+@jwt_required()
+@require_role('Owner', 'Admin', 'Member')
+def create_transactions() -> Tuple[Dict[str, Any], int]:
+    """
+    Create many transactions in one request.
+
+    Expected JSON:
+        {
+            "workspace_id": 1,
+            "atomic": false,
+            "skip_duplicates": false,
+            "transactions": [
+                {"account_id": 1, "category_id": 1, "type": "EXPENSE", "amount": 50000,
+                 "transaction_date": "2024-01-15", "description": "Lunch"},
+                ...
+            ]
+        }
+
+    Rows use the same fields and rules as POST /api/transactions. Invalid rows
+    are reported by index and skipped; with "atomic": true nothing is created
+    when any row is invalid.
+
+    Rows matching an existing transaction (same account, date, amount and
+    description) or an earlier row of the request are reported in
+    possible_duplicates. With "skip_duplicates": true they are not created.
+
+    Returns:
+        JSON response with created ids, per-row errors and possible duplicates
+    """
+    try:
+        current_user_id = int(get_jwt_identity())
+        data = request.get_json()
+
+        if not data or not data.get('workspace_id') or not isinstance(data.get('transactions'), list):
+            return {'error': 'workspace_id dan transactions harus diisi'}, 400
+
+        workspace_id = data['workspace_id']
+        rows = data['transactions']
+
+        if not check_workspace_access(current_user_id, workspace_id):
+            return {'error': 'Akses ditolak'}, 403
+
+        if not rows:
+            return {'error': 'transactions tidak boleh kosong'}, 400
+        if len(rows) > MAX_BULK_ROWS:
+            return {'error': f'Maksimal {MAX_BULK_ROWS} transaksi per request'}, 400
+
+        values, errors, indexes = validate_transactions(workspace_id, rows)
+        if not values or (errors and data.get('atomic')):
+            return {'error': 'Tidak ada transaksi yang dibuat', 'errors': errors}, 400
+
+        duplicates = flag_duplicates(workspace_id, values, indexes)
+
+        if data.get('skip_duplicates'):
+            skipped = {flag['index'] for flag in duplicates}
+            values = [row for index, row in zip(indexes, values) if index not in skipped]
+
+        ids = insert_transactions(workspace_id, values)
+        db.session.commit()
+
+        return {
+            'message': f'{len(ids)} transaksi berhasil dibuat',
+            'created': len(ids),
+            'ids': ids,
+            'errors': errors,
+            'possible_duplicates': duplicates
+        }, 201
+
+    except Exception as e:
+        db.session.rollback()
+        return {'error': f'Gagal membuat transaksi: {str(e)}'}, 500
+
+
+@transaction_bp.route('/import', methods=['POST'])
+@jwt_required()
+@require_role('Owner', 'Admin', 'Member')
+def import_transactions_file() -> Tuple[Dict[str, Any], int]:
+    """
+    Import transactions from an uploaded CSV or XLSX file.
+
+    Query params:
+        workspace_id: int (required)
+
+    Form data (multipart/form-data):
+        file: CSV or XLSX file (required)
+        mapping: str (optional) - mapping config as JSON, see app/importer.py
+        dry_run: bool (optional, default false) - validate only, nothing is saved
+        skip_duplicates: bool (optional, default false) - leave out rows flagged as possible duplicates
+        batch_size: int (optional, default 1000)
+
+    Returns:
+        JSON response with import counts and per-line errors
+    """
+    try:
+        current_user_id = int(get_jwt_identity())
+        workspace_id = request.args.get('workspace_id', type=int)
+
+        if not workspace_id:
+            return {'error': 'workspace_id harus diisi'}, 400
+
+        if not check_workspace_access(current_user_id, workspace_id):
+            return {'error': 'Akses ditolak'}, 403
+
+        upload = request.files.get('file')
+        if not upload or not upload.filename:
+            return {'error': 'file harus diisi'}, 400
+
+        try:
+            mapping = load_mapping(json.loads(request.form['mapping']) if request.form.get('mapping') else None)
+        except ValueError as e:
+            return {'error': f'Mapping tidak valid: {str(e)}'}, 400
+
+        dry_run = request.form.get('dry_run', 'false').lower() == 'true'
+        skip_duplicates = request.form.get('skip_duplicates', 'false').lower() == 'true'
+        batch_size = request.form.get('batch_size', type=int, default=DEFAULT_BATCH_SIZE)
+
+        try:
+            result = import_transactions(
+                workspace_id,
+                read_rows(upload.stream, upload.filename),
+                mapping,
+                batch_size=max(batch_size, 1),
+                dry_run=dry_run,
+                skip_duplicates=skip_duplicates
+            )
+        except (ValueError, UnicodeDecodeError, csv.Error) as e:
+            db.session.rollback()
+            return {'error': f'File tidak valid: {str(e)}'}, 400
+
+        if dry_run:
+            db.session.rollback()
+        else:
+            db.session.commit()
+            if result['categories_created']:
+                invalidate_category_tree(workspace_id)
+
+        return result, 200
+
+    except RuntimeError as e:
+        db.session.rollback()
+        return {'error': str(e)}, 400
+    except Exception as e:
+        db.session.rollback()
+        return {'error': f'Gagal import transaksi: {str(e)}'}, 500
+
+
+@transaction_bp.route('/duplicates/check', methods=['POST'])
+@jwt_required()
+@require_role('Owner', 'Admin', 'Member')
+def check_duplicates() -> Tuple[Dict[str, Any], int]:
+    """
+    Check transactions for possible duplicates without creating them.
+
+    Expected JSON: same as POST /api/transactions/bulk
+
+    Returns:
+        JSON response with per-row errors and possible duplicates
+    """
+    try:
+        current_user_id = int(get_jwt_identity())
+        data = request.get_json()
+
+        if not data or not data.get('workspace_id') or not isinstance(data.get('transactions'), list):
+            return {'error': 'workspace_id dan transactions harus diisi'}, 400
+
+        workspace_id = data['workspace_id']
+        rows = data['transactions']
+
+        if not check_workspace_access(current_user_id, workspace_id):
+            return {'error': 'Akses ditolak'}, 403
+
+        if len(rows) > MAX_BULK_ROWS:
+            return {'error': f'Maksimal {MAX_BULK_ROWS} transaksi per request'}, 400
+
+        values, errors, indexes = validate_transactions(workspace_id, rows)
+        duplicates = flag_duplicates(workspace_id, values, indexes)
+
+        return {
+            'checked': len(values),
+            'errors': errors,
+            'possible_duplicates': duplicates
+        }, 200
+
+    except Exception as e:
+        return {'error': f'Gagal memeriksa duplikat: {str(e)}'}, 500
+
+
+@transaction_bp.route('/duplicates', methods=['GET'])
+@jwt_required()
+@require_role('Owner', 'Admin', 'Member', 'Viewer')
+def get_duplicates() -> Tuple[Dict[str, Any], int]:
+    """
+    List groups of stored transactions that look like duplicates.
+
+    Query params:
+        workspace_id: int (required)
+        limit: int (optional, default 100, max 500) - number of groups
+
+    Returns:
+        JSON response with duplicate groups, largest first
+    """
+    try:
+        current_user_id = int(get_jwt_identity())
+        workspace_id = request.args.get('workspace_id', type=int)
+        limit = min(max(request.args.get('limit', 100, type=int), 1), 500)
+
+        if not workspace_id:
+            return {'error': 'workspace_id harus diisi'}, 400
+
+        if not check_workspace_access(current_user_id, workspace_id):
+            return {'error': 'Akses ditolak'}, 403
+
+        groups = duplicate_groups(workspace_id, limit)
+
+        ids = [transaction_id for group in groups for transaction_id in group['transaction_ids']]
+        transactions = {
+            txn.id: serialize_transaction(txn)
+            for txn in Transaction.query.options(*TRANSACTION_RELATIONS).filter(Transaction.id.in_(ids))
+        } if ids else {}
+
+        return {
+            'groups': [
+                {
+                    'count': group['count'],
+                    'transactions': [transactions[transaction_id] for transaction_id in group['transaction_ids']]
+                }
+                for group in groups
+            ]
+        }, 200
+
+    except Exception as e:
+        return {'error': f'Gagal mengambil duplikat: {str(e)}'}, 500
+
+
 @transaction_bp.route('/<int:transaction_id>', methods=['GET'])
 @jwt_required()
 @require_role('Owner', 'Admin', 'Member', 'Viewer', skip_workspace_check=True)
@@ -269,7 +724,7 @@ def get_transaction(transaction_id: int) -> Tuple[Dict[str, Any], int]:
 
         current_user_id = int(get_jwt_identity())
 
-        transaction = Transaction.query.get(transaction_id)
+        transaction = Transaction.query.options(*TRANSACTION_RELATIONS).get(transaction_id)
         if not transaction:
             return {'error': 'Transaksi tidak ditemukan'}, 404
 
@@ -277,33 +732,7 @@ def get_transaction(transaction_id: int) -> Tuple[Dict[str, Any], int]:
         if not check_workspace_permission(current_user_id, transaction.workspace_id, ['Owner', 'Admin', 'Member', 'Viewer']):
             return {'error': 'Akses ditolak'}, 403
 
-        txn_data = {
-            'id': transaction.id,
-            'type': transaction.type,
-            'amount': float(transaction.amount),
-            'transaction_date': transaction.transaction_date.isoformat(),
-            'description': transaction.description,
-            'created_at': transaction.created_at.isoformat(),
-            'account': {
-                'id': transaction.account.id,
-                'name': transaction.account.name
-            }
-        }
-
-        if transaction.transfer_to_account_id:
-            txn_data['transfer_to_account'] = {
-                'id': transaction.transfer_to_account.id,
-                'name': transaction.transfer_to_account.name
-            }
-
-        if transaction.category_id:
-            txn_data['category'] = {
-                'id': transaction.category.id,
-                'name': transaction.category.name,
-                'type': transaction.category.type
-            }
-
-        return {'transaction': txn_data}, 200
+        return {'transaction': serialize_transaction(transaction)}, 200
 
     except Exception as e:
         return {'error': f'Gagal mengambil transaksi: {str(e)}'}, 500
@@ -338,37 +767,33 @@ def update_transaction(transaction_id: int) -> Tuple[Dict[str, Any], int]:
         if not data:
             return {'error': 'Tidak ada data yang diberikan'}, 400
 
-        # Update fields
+        # Validate the whole payload before the ledger or the transaction is touched
+        changes = {}
         if 'amount' in data:
             if float(data['amount']) <= 0:
                 return {'error': 'Amount must be positive'}, 400
-            transaction.amount = Decimal(str(data['amount']))
+            changes['amount'] = Decimal(str(data['amount']))
 
         if 'transaction_date' in data:
-            transaction.transaction_date = datetime.strptime(data['transaction_date'], '%Y-%m-%d').date()
+            changes['transaction_date'] = datetime.strptime(data['transaction_date'], '%Y-%m-%d').date()
 
         if 'description' in data:
-            transaction.description = data['description']
+            changes['description'] = data['description']
 
-        # Update type if provided
         if 'type' in data:
             if data['type'] not in ['INCOME', 'EXPENSE', 'TRANSFER']:
                 return {'error': 'Type must be INCOME, EXPENSE, or TRANSFER'}, 400
-            transaction.type = data['type']
+            changes['type'] = data['type']
 
         if 'category_id' in data:
-            # For INCOME/EXPENSE ensure category provided
-            if data.get('category_id') is not None:
-                transaction.category_id = data['category_id']
-            else:
-                transaction.category_id = None
+            changes['category_id'] = data['category_id']
 
         if 'account_id' in data:
             # Validate account exists and belongs to same workspace
             new_account = Account.query.get(data['account_id'])
             if not new_account or new_account.workspace_id != transaction.workspace_id:
                 return {'error': 'Akun tidak valid'}, 400
-            transaction.account_id = data['account_id']
+            changes['account_id'] = data['account_id']
 
         if 'transfer_to_account_id' in data:
             if data['transfer_to_account_id']:
@@ -376,18 +801,27 @@ def update_transaction(transaction_id: int) -> Tuple[Dict[str, Any], int]:
                 transfer_account = Account.query.get(data['transfer_to_account_id'])
                 if not transfer_account or transfer_account.workspace_id != transaction.workspace_id:
                     return {'error': 'Akun transfer tidak valid'}, 400
-                transaction.transfer_to_account_id = data['transfer_to_account_id']
+                changes['transfer_to_account_id'] = data['transfer_to_account_id']
             else:
-                transaction.transfer_to_account_id = None
+                changes['transfer_to_account_id'] = None
 
         # Additional validation: if transaction is TRANSFER, ensure transfer_to_account_id exists
-        if transaction.type == 'TRANSFER' and not transaction.transfer_to_account_id:
+        txn_type = changes.get('type', transaction.type)
+        if txn_type == 'TRANSFER' and not changes.get('transfer_to_account_id', transaction.transfer_to_account_id):
             return {'error': 'transfer_to_account_id is required for TRANSFER'}, 400
 
         # If transaction type is INCOME or EXPENSE, clear transfer_to_account_id
-        if transaction.type in ['INCOME', 'EXPENSE']:
-            transaction.transfer_to_account_id = None
+        if txn_type in ['INCOME', 'EXPENSE']:
+            changes['transfer_to_account_id'] = None
 
+        # Take the old values out of the balance ledger, then book the new ones
+        revert_transaction(transaction)
+        for field, value in changes.items():
+            setattr(transaction, field, value)
+
+        transaction.fingerprint = fingerprint_of(transaction)
+        apply_transaction(transaction)
+        bump_workspace_generation(transaction.workspace_id)
         db.session.commit()
 
         txn_resp = {
@@ -445,6 +879,8 @@ def delete_transaction(transaction_id: int) -> Tuple[Dict[str, Any], int]:
         if not check_workspace_permission(current_user_id, transaction.workspace_id, ['Owner', 'Admin', 'Member']):
             return {'error': 'Akses ditolak'}, 403
 
+        revert_transaction(transaction)
+        bump_workspace_generation(transaction.workspace_id)
         db.session.delete(transaction)
         db.session.commit()
 
@@ -461,6 +897,7 @@ def delete_transaction(transaction_id: int) -> Tuple[Dict[str, Any], int]:
 @transaction_bp.route('/summary', methods=['GET'])
 @jwt_required()
 @require_role('Owner', 'Admin', 'Member', 'Viewer')
+@cached_response
 def get_summary() -> Tuple[Dict[str, Any], int]:
     """
     Get financial summary for a workspace.
@@ -488,59 +925,41 @@ def get_summary() -> Tuple[Dict[str, Any], int]:
         month = request.args.get('month', type=int) or datetime.now().month
         year = request.args.get('year', type=int) or datetime.now().year
 
-        # Calculate total balance across all accounts
-        accounts = Account.query.filter_by(workspace_id=workspace_id).all()
-        total_balance = Decimal('0')
-
-        for account in accounts:
-            income = db.session.query(func.sum(Transaction.amount)).filter(
-                Transaction.account_id == account.id,
-                Transaction.type == 'INCOME'
-            ).scalar() or Decimal('0')
+        if not 1 <= month <= 12:
+            return {'error': 'month harus antara 1 dan 12'}, 400
 
-            expense = db.session.query(func.sum(Transaction.amount)).filter(
-                Transaction.account_id == account.id,
-                Transaction.type == 'EXPENSE'
-            ).scalar() or Decimal('0')
+        # Date range instead of EXTRACT() so the rollup index is usable
+        month_start = date(year, month, 1)
+        month_end = date(year + month // 12, month % 12 + 1, 1)
 
-            transfer_out = db.session.query(func.sum(Transaction.amount)).filter(
-                Transaction.account_id == account.id,
-                Transaction.type == 'TRANSFER'
-            ).scalar() or Decimal('0')
-
-            transfer_in = db.session.query(func.sum(Transaction.amount)).filter(
-                Transaction.transfer_to_account_id == account.id,
-                Transaction.type == 'TRANSFER'
-            ).scalar() or Decimal('0')
-
-            account_balance = account.initial_balance + income - expense - transfer_out + transfer_in
-            total_balance += account_balance
+        # Calculate total balance across all accounts
+        total_balance = get_total_balance(workspace_id)
 
         # Get income for the month
-        income_this_month = db.session.query(func.sum(Transaction.amount)).filter(
-            Transaction.workspace_id == workspace_id,
-            Transaction.type == 'INCOME',
-            extract('month', Transaction.transaction_date) == month,
-            extract('year', Transaction.transaction_date) == year
+        income_this_month = db.session.query(func.sum(DailyRollup.total)).filter(
+            DailyRollup.workspace_id == workspace_id,
+            DailyRollup.type == 'INCOME',
+            DailyRollup.date >= month_start,
+            DailyRollup.date < month_end
         ).scalar() or Decimal('0')
 
         # Get expenses for the month
-        expense_this_month = db.session.query(func.sum(Transaction.amount)).filter(
-            Transaction.workspace_id == workspace_id,
-            Transaction.type == 'EXPENSE',
-            extract('month', Transaction.transaction_date) == month,
-            extract('year', Transaction.transaction_date) == year
+        expense_this_month = db.session.query(func.sum(DailyRollup.total)).filter(
+            DailyRollup.workspace_id == workspace_id,
+            DailyRollup.type == 'EXPENSE',
+            DailyRollup.date >= month_start,
+            DailyRollup.date < month_end
         ).scalar() or Decimal('0')
 
         # Get expenses by category
         expenses_by_category = db.session.query(
             Category.name,
-            func.sum(Transaction.amount).label('total')
-        ).join(Transaction).filter(
-            Transaction.workspace_id == workspace_id,
-            Transaction.type == 'EXPENSE',
-            extract('month', Transaction.transaction_date) == month,
-            extract('year', Transaction.transaction_date) == year
+            func.sum(DailyRollup.total).label('total')
+        ).join(DailyRollup, DailyRollup.category_id == Category.id).filter(
+            DailyRollup.workspace_id == workspace_id,
+            DailyRollup.type == 'EXPENSE',
+            DailyRollup.date >= month_start,
+            DailyRollup.date < month_end
         ).group_by(Category.name).all()
 
         category_data = [
@@ -4,6 +4,7 @@ from flask_jwt_extended import jwt_required, get_jwt_identity
 from app import db, bcrypt
 from app.models import Workspace, WorkspaceMember, User, Role
 from app.decorators import require_role
+from app.access import get_workspace_role, bump_membership_version, invalidate_workspace_access
 from datetime import datetime, timedelta
 from typing import Tuple, Dict, Any, Optional
 import secrets
@@ -14,14 +15,7 @@ workspace_bp = Blueprint('workspace', __name__)
 
 def get_user_workspace_role(user_id: int, workspace_id: int) -> Optional[str]:
     """Get user's role in a workspace."""
-    membership = WorkspaceMember.query.filter_by(
-        user_id=user_id,
-        workspace_id=workspace_id
-    ).first()
-
-    if membership:
-        return membership.role.name
-    return None
+    return get_workspace_role(user_id, workspace_id)
 
 
 def check_workspace_permission(user_id: int, workspace_id: int, required_roles: list) -> bool:
@@ -118,7 +112,9 @@ def create_workspace() -> Tuple[Dict[str, Any], int]:
             role_id=owner_role.id
         )
         db.session.add(membership)
+        bump_membership_version([current_user_id])
         db.session.commit()
+        invalidate_workspace_access(workspace.id, current_user_id)
 
         return {
             'message': 'Workspace berhasil dibuat',
@@ -245,8 +241,10 @@ def delete_workspace(workspace_id: int) -> Tuple[Dict[str, Any], int]:
         if not workspace:
             return {'error': 'Workspace tidak ditemukan'}, 404
 
+        bump_membership_version([member.user_id for member in workspace.members])
         db.session.delete(workspace)
         db.session.commit()
+        invalidate_workspace_access(workspace_id)
 
         return {'message': 'Workspace berhasil dihapus'}, 200
 
@@ -475,7 +473,9 @@ def add_workspace_member(workspace_id: int) -> Tuple[Dict[str, Any], int]:
                 role_id=role.id
             )
             db.session.add(membership)
+            bump_membership_version([existing_user.id])
             db.session.commit()
+            invalidate_workspace_access(workspace_id, existing_user.id)
 
             return {
                 'message': f'{existing_user.name} berhasil ditambahkan sebagai {role_name}',
@@ -583,7 +583,9 @@ def update_member_role(workspace_id: int, member_id: int) -> Tuple[Dict[str, Any
 
         # Update role
         membership.role_id = new_role.id
+        bump_membership_version([membership.user_id])
         db.session.commit()
+        invalidate_workspace_access(workspace_id, membership.user_id)
 
         return {
             'message': f'Role {membership.user.name} berhasil diubah menjadi {role_name}',
@@ -627,10 +629,13 @@ def remove_workspace_member(workspace_id: int, member_id: int) -> Tuple[Dict[str
             return {'error': 'Tidak bisa menghapus Admin workspace'}, 403
 
         member_name = membership.user.name
+        member_user_id = membership.user_id
 
         # Delete membership
         db.session.delete(membership)
+        bump_membership_version([member_user_id])
         db.session.commit()
+        invalidate_workspace_access(workspace_id, member_user_id)
 
         return {
             'message': f'{member_name} berhasil dihapus dari workspace'
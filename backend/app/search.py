@@ -0,0 +1,58 @@
+"""Description search for the transaction list (the `q` query parameter).
+
+On PostgreSQL a row matches when its description matches the search as
+words (to_tsvector/websearch_to_tsquery, GIN index
+idx_transaction_description_fts) or contains it as a substring (ILIKE,
+served by the pg_trgm index idx_transaction_description_trgm). Results are
+ranked with ts_rank. Other databases (SQLite in tests) fall back to a
+case-insensitive LIKE and a coarse rank: exact match, prefix, substring.
+
+The 'simple' text search configuration is used on purpose: descriptions are
+mostly Indonesian, which PostgreSQL has no stemmer for.
+"""
+from sqlalchemy import Float, case, cast, func, literal, literal_column, or_
+from app import db
+from app.models import Transaction
+
+# Must match the expression of idx_transaction_description_fts exactly
+SEARCH_CONFIG = literal_column("'simple'")
+
+
+def _document():
+    return func.to_tsvector(SEARCH_CONFIG, func.coalesce(Transaction.description, ''))
+
+
+def _like_pattern(text: str) -> str:
+    """Escape LIKE wildcards in user input."""
+    return text.replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_')
+
+
+def search_filter(text: str):
+    """WHERE clause matching transactions whose description matches text."""
+    pattern = f'%{_like_pattern(text)}%'
+    if db.engine.dialect.name == 'postgresql':
+        return or_(
+            _document().op('@@')(func.websearch_to_tsquery(SEARCH_CONFIG, text)),
+            Transaction.description.ilike(pattern, escape='\\')
+        )
+    return Transaction.description.ilike(pattern, escape='\\')
+
+
+def search_rank(text: str):
+    """
+    Relevance of a matching transaction, higher is better.
+
+    The same expression is selected, ordered by and compared with the
+    cursor's rank, so it must round-trip through a Python float exactly:
+    ts_rank returns real, hence the cast to double precision.
+    """
+    if db.engine.dialect.name == 'postgresql':
+        return cast(func.ts_rank(_document(), func.websearch_to_tsquery(SEARCH_CONFIG, text)), Float(53))
+
+    description = func.lower(Transaction.description)
+    text = text.lower()
+    return case(
+        (description == text, literal(1.0)),
+        (description.like(f'{_like_pattern(text)}%', escape='\\'), literal(0.5)),
+        else_=literal(0.1)
+    )
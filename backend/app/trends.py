@@ -0,0 +1,110 @@
+"""Set-based income/expense trend aggregation for analytics charts, read from daily rollups."""
+from datetime import date, datetime, timedelta
+from decimal import Decimal
+from typing import Dict, List, Any
+from sqlalchemy import func
+from app import db
+from app.models import DailyRollup, Category
+
+ZERO = Decimal('0')
+
+GRANULARITIES = ('day', 'week', 'month')
+
+# Expense category left out of spending trends (recorded as an asset purchase)
+EXCLUDED_EXPENSE_CATEGORY = 'Investasi Emas'
+
+
+def bucket_start(day: date, granularity: str) -> date:
+    """Get the first day of the bucket a date falls into (weeks start on Monday)."""
+    if granularity == 'month':
+        return date(day.year, day.month, 1)
+    if granularity == 'week':
+        return day - timedelta(days=day.weekday())
+    return day
+
+
+def next_bucket(start: date, granularity: str) -> date:
+    """Get the first day of the bucket after the one starting at start."""
+    if granularity == 'month':
+        month_index = start.year * 12 + start.month
+        return date(month_index // 12, month_index % 12 + 1, 1)
+    if granularity == 'week':
+        return start + timedelta(days=7)
+    return start + timedelta(days=1)
+
+
+def _bucket_column(granularity: str):
+    """SQL expression grouping rollup dates into buckets."""
+    if db.engine.dialect.name == 'postgresql':
+        return func.date_trunc(granularity, DailyRollup.date)
+    # Other databases group per day; buckets are merged in Python
+    return DailyRollup.date
+
+
+def _sum_by_bucket(workspace_id: int, txn_type: str, start: date, end: date, granularity: str) -> Dict[date, Decimal]:
+    """Sum one transaction type per bucket with a single grouped query."""
+    bucket = _bucket_column(granularity).label('bucket')
+
+    query = db.session.query(
+        bucket,
+        func.sum(DailyRollup.total)
+    ).filter(
+        DailyRollup.workspace_id == workspace_id,
+        DailyRollup.type == txn_type,
+        DailyRollup.date >= start,
+        DailyRollup.date <= end
+    )
+
+    if txn_type == 'EXPENSE':
+        query = query.join(
+            Category, DailyRollup.category_id == Category.id
+        ).filter(Category.name != EXCLUDED_EXPENSE_CATEGORY)
+
+    totals = {}
+    for key, amount in query.group_by(bucket).all():
+        if isinstance(key, datetime):
+            key = key.date()
+        elif isinstance(key, str):
+            key = datetime.strptime(key[:10], '%Y-%m-%d').date()
+        key = bucket_start(key, granularity)
+        totals[key] = totals.get(key, ZERO) + (amount or ZERO)
+    return totals
+
+
+def get_trend(workspace_id: int, start: date, end: date, granularity: str = 'day') -> List[Dict[str, Any]]:
+    """
+    Get income and expense per bucket between two dates (inclusive).
+
+    Runs one grouped query per transaction type and fills empty buckets in
+    Python, so the query count does not depend on the number of buckets.
+    Expenses exclude the "Investasi Emas" category, like the dashboard totals.
+
+    Args:
+        workspace_id: Workspace ID
+        start: First date included
+        end: Last date included
+        granularity: day, week or month
+
+    Returns:
+        List of buckets with start, end (exclusive), income and expense.
+        The first and last buckets are clipped to the requested range.
+    """
+    if granularity not in GRANULARITIES:
+        raise ValueError(f'granularity harus salah satu dari: {", ".join(GRANULARITIES)}')
+
+    income = _sum_by_bucket(workspace_id, 'INCOME', start, end, granularity)
+    expense = _sum_by_bucket(workspace_id, 'EXPENSE', start, end, granularity)
+
+    buckets = []
+    current = bucket_start(start, granularity)
+    while current <= end:
+        following = next_bucket(current, granularity)
+        buckets.append({
+            'start': max(current, start),
+            'end': min(following, end + timedelta(days=1)),
+            'income': income.get(current, ZERO),
+            'expense': expense.get(current, ZERO)
+        })
+        current = following
+
+    return buckets
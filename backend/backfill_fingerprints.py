@@ -0,0 +1,53 @@
+"""Script untuk mengisi fingerprint duplikat (transactions.fingerprint) pada transaksi lama.
+
+Jalankan sekali setelah migrasi yang menambah kolom fingerprint, dan setelah
+mengisi transaksi langsung ke database (seed.py). Transaksi yang dibuat lewat
+API dan import sudah mendapat fingerprint saat disimpan.
+
+Usage:
+    python backfill_fingerprints.py                 # semua workspace
+    python backfill_fingerprints.py --workspace 3   # satu workspace
+    python backfill_fingerprints.py --report        # tampilkan grup kemungkinan duplikat
+"""
+import sys
+import os
+import argparse
+
+# Add parent directory to path
+sys.path.insert(0, os.path.abspath(os.path.dirname(__file__)))
+
+from app import create_app, db
+from app.models import Workspace
+from app.duplicates import backfill_fingerprints, duplicate_groups
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description='Backfill transaction fingerprints used for duplicate detection.')
+    parser.add_argument('--workspace', type=int, default=None, help='Only process this workspace id')
+    parser.add_argument('--report', action='store_true', help='List possible duplicate groups after the backfill')
+    args = parser.parse_args()
+
+    app = create_app(os.getenv('FLASK_ENV', 'development'))
+
+    with app.app_context():
+        try:
+            count = backfill_fingerprints(args.workspace)
+            db.session.commit()
+            print(f"✓ Fingerprint {count} transaksi berhasil diisi")
+        except Exception as e:
+            db.session.rollback()
+            print(f"✗ Gagal mengisi fingerprint: {str(e)}")
+            return 1
+
+        if args.report:
+            workspaces = Workspace.query.filter_by(id=args.workspace) if args.workspace else Workspace.query
+            for workspace in workspaces.order_by(Workspace.id):
+                for group in duplicate_groups(workspace.id):
+                    ids = ', '.join(f"#{transaction_id}" for transaction_id in group['transaction_ids'])
+                    print(f"  ⚠ {workspace.name}: {group['count']} transaksi sama ({ids})")
+
+        return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
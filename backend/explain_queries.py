@@ -0,0 +1,164 @@
+"""Script untuk cek query plan query transaksi yang paling sering dipakai.
+
+Menjalankan EXPLAIN untuk setiap query utama di transaction.py, analytics.py
+dan budget.py, lalu memastikan tabel transactions dan daily_rollups dibaca
+lewat index (bukan full table scan).
+
+Usage:
+    python explain_queries.py                    # cek semua query
+    python explain_queries.py --workspace 3      # pakai id workspace tertentu
+    python explain_queries.py --verbose          # tampilkan query plan lengkap
+"""
+import sys
+import os
+import re
+import argparse
+from datetime import date, timedelta
+
+# Add parent directory to path
+sys.path.insert(0, os.path.abspath(os.path.dirname(__file__)))
+
+from sqlalchemy import select, func, or_
+from app import create_app, db
+from app.models import Transaction, DailyRollup, Category, Workspace, Account
+
+
+def hot_queries(workspace_id, account_id, category_id):
+    """Representative statements for each transaction access path."""
+    today = date.today()
+    month_start = date(today.year, today.month, 1)
+    three_months_ago = month_start - timedelta(days=90)
+
+    return {
+        'transaction.get_transactions': select(Transaction).where(
+            Transaction.workspace_id == workspace_id
+        ).order_by(Transaction.transaction_date.desc(), Transaction.id.desc()).limit(20),
+
+        'transaction.get_transactions (account)': select(Transaction).where(
+            Transaction.workspace_id == workspace_id,
+            or_(Transaction.account_id == account_id, Transaction.transfer_to_account_id == account_id)
+        ),
+
+        'transaction.get_summary': select(func.sum(DailyRollup.total)).where(
+            DailyRollup.workspace_id == workspace_id,
+            DailyRollup.type == 'EXPENSE',
+            DailyRollup.date >= month_start,
+            DailyRollup.date <= today
+        ),
+
+        'balances.compute_totals (account)': select(
+            Transaction.type, func.sum(Transaction.amount)
+        ).where(Transaction.account_id == account_id).group_by(Transaction.type),
+
+        'balances.compute_totals (transfer in)': select(func.sum(Transaction.amount)).where(
+            Transaction.transfer_to_account_id == account_id,
+            Transaction.type == 'TRANSFER'
+        ),
+
+        'analytics.get_dashboard_analytics (trend)': select(
+            DailyRollup.date, func.sum(DailyRollup.total)
+        ).where(
+            DailyRollup.workspace_id == workspace_id,
+            DailyRollup.type == 'INCOME',
+            DailyRollup.date >= three_months_ago,
+            DailyRollup.date <= today
+        ).group_by(DailyRollup.date),
+
+        'analytics.get_dashboard_analytics (categories)': select(
+            Category.name, func.sum(DailyRollup.total)
+        ).join(Category, DailyRollup.category_id == Category.id).where(
+            DailyRollup.workspace_id == workspace_id,
+            DailyRollup.type == 'EXPENSE',
+            DailyRollup.date >= three_months_ago
+        ).group_by(Category.name),
+
+        'budget.calculate_total_income': select(func.sum(DailyRollup.total)).where(
+            DailyRollup.workspace_id == workspace_id,
+            DailyRollup.type == 'INCOME',
+            DailyRollup.date >= month_start,
+            DailyRollup.date <= today
+        ),
+
+        'budget.get_monthly_spending (recommendations)': select(
+            DailyRollup.category_id, func.sum(DailyRollup.total)
+        ).where(
+            DailyRollup.workspace_id == workspace_id,
+            DailyRollup.type == 'EXPENSE',
+            DailyRollup.date >= three_months_ago,
+            DailyRollup.date < month_start,
+            DailyRollup.category_id.isnot(None)
+        ).group_by(DailyRollup.category_id),
+
+        'rollups.post_rollup': select(func.min(DailyRollup.id)).where(
+            DailyRollup.workspace_id == workspace_id,
+            DailyRollup.date == today,
+            DailyRollup.type == 'EXPENSE',
+            DailyRollup.category_id == category_id,
+            DailyRollup.account_id == account_id
+        ),
+    }
+
+
+def explain(statement):
+    """Run EXPLAIN for a statement and return the plan lines."""
+    connection = db.session.connection()
+    compiled = statement.compile(dialect=connection.dialect)
+    params = compiled.construct_params()
+    if compiled.positional:
+        params = tuple(params[name] for name in compiled.positiontup)
+
+    if connection.dialect.name == 'postgresql':
+        # Tiny development tables make the planner prefer sequential scans; we only care that an index is usable
+        connection.exec_driver_sql('SET LOCAL enable_seqscan = off')
+        rows = connection.exec_driver_sql(f'EXPLAIN {compiled}', params).fetchall()
+        return [row[0] for row in rows]
+
+    rows = connection.exec_driver_sql(f'EXPLAIN QUERY PLAN {compiled}', params).fetchall()
+    return [row[-1] for row in rows]
+
+
+def uses_index(plan_lines):
+    """Check that the transactions and daily_rollups tables are never read with a full scan."""
+    for line in plan_lines:
+        if re.search(r'Seq Scan on (transactions|daily_rollups)\b', line):
+            return False
+        if re.match(r'\s*SCAN (transactions|daily_rollups)\b', line) and 'INDEX' not in line:
+            return False
+    return True
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description='Check that hot transaction queries use an index.')
+    parser.add_argument('--workspace', type=int, default=None, help='Workspace id used in the queries')
+    parser.add_argument('--verbose', action='store_true', help='Print the full query plans')
+    args = parser.parse_args()
+
+    app = create_app(os.getenv('FLASK_ENV', 'development'))
+
+    with app.app_context():
+        workspace_id = args.workspace or db.session.query(func.min(Workspace.id)).scalar() or 1
+        account_id = db.session.query(func.min(Account.id)).filter_by(workspace_id=workspace_id).scalar() or 1
+        category_id = db.session.query(func.min(Category.id)).filter_by(workspace_id=workspace_id).scalar() or 1
+
+        failures = 0
+        for name, statement in hot_queries(workspace_id, account_id, category_id).items():
+            plan = explain(statement)
+            ok = uses_index(plan)
+            failures += 0 if ok else 1
+            print(f"{'✓' if ok else '✗'} {name}")
+            if args.verbose or not ok:
+                for line in plan:
+                    print(f"    {line}")
+
+        db.session.rollback()
+
+        if failures:
+            print(f"\n{failures} query masih full scan pada tabel transactions/daily_rollups. Jalankan 'flask db upgrade'.")
+            return 1
+
+        print("\n✓ Semua query memakai index")
+        return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
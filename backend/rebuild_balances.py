@@ -0,0 +1,54 @@
+"""Script untuk rebuild atau verifikasi ledger saldo akun (account_balances).
+
+Usage:
+    python rebuild_balances.py                    # rebuild semua workspace
+    python rebuild_balances.py --workspace 3      # rebuild satu workspace
+    python rebuild_balances.py --verify           # cek ledger vs transaksi, tanpa mengubah data
+"""
+import sys
+import os
+import argparse
+
+# Add parent directory to path
+sys.path.insert(0, os.path.abspath(os.path.dirname(__file__)))
+
+from app import create_app, db
+from app.ledger import rebuild_balances, verify_balances
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description='Rebuild or verify the account balance ledger.')
+    parser.add_argument('--workspace', type=int, default=None, help='Only process this workspace id')
+    parser.add_argument('--verify', action='store_true', help='Compare ledger with transactions without writing')
+    args = parser.parse_args()
+
+    app = create_app(os.getenv('FLASK_ENV', 'development'))
+
+    with app.app_context():
+        if args.verify:
+            mismatches = verify_balances(args.workspace)
+            if not mismatches:
+                print("✓ Ledger saldo sesuai dengan transaksi")
+                return 0
+
+            for m in mismatches:
+                if m['field'] is None:
+                    print(f"✗ Akun {m['account_id']}: belum punya baris ledger")
+                else:
+                    print(f"✗ Akun {m['account_id']} {m['field']}: ledger={m['ledger']} aktual={m['actual']}")
+            print(f"\n{len(mismatches)} selisih ditemukan. Jalankan tanpa --verify untuk rebuild.")
+            return 1
+
+        try:
+            count = rebuild_balances(args.workspace)
+            db.session.commit()
+            print(f"✓ Ledger saldo untuk {count} akun berhasil di-rebuild")
+            return 0
+        except Exception as e:
+            db.session.rollback()
+            print(f"✗ Gagal rebuild ledger: {str(e)}")
+            return 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,57 @@
+"""Script untuk backfill atau verifikasi rollup harian (daily_rollups).
+
+Jalankan sekali setelah migrasi yang membuat tabel daily_rollups, dan setelah
+mengimpor transaksi langsung ke database (seed.py, import_data.py).
+
+Usage:
+    python rebuild_rollups.py                    # rebuild semua workspace
+    python rebuild_rollups.py --workspace 3      # rebuild satu workspace
+    python rebuild_rollups.py --verify           # cek rollup vs transaksi, tanpa mengubah data
+"""
+import sys
+import os
+import argparse
+
+# Add parent directory to path
+sys.path.insert(0, os.path.abspath(os.path.dirname(__file__)))
+
+from app import create_app, db
+from app.rollups import rebuild_rollups, verify_rollups
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description='Backfill or verify the daily transaction rollups.')
+    parser.add_argument('--workspace', type=int, default=None, help='Only process this workspace id')
+    parser.add_argument('--verify', action='store_true', help='Compare rollups with transactions without writing')
+    args = parser.parse_args()
+
+    app = create_app(os.getenv('FLASK_ENV', 'development'))
+
+    with app.app_context():
+        if args.verify:
+            mismatches = verify_rollups(args.workspace)
+            if not mismatches:
+                print("✓ Rollup harian sesuai dengan transaksi")
+                return 0
+
+            for m in mismatches:
+                key = m['key']
+                print(f"✗ Workspace {key['workspace_id']} {key['date']} {key['type']} "
+                      f"kategori={key['category_id']} akun={key['account_id']}: "
+                      f"rollup={m['rollup']} aktual={m['actual']}")
+            print(f"\n{len(mismatches)} selisih ditemukan. Jalankan tanpa --verify untuk rebuild.")
+            return 1
+
+        try:
+            count = rebuild_rollups(args.workspace)
+            db.session.commit()
+            print(f"✓ {count} baris rollup harian berhasil di-rebuild")
+            return 0
+        except Exception as e:
+            db.session.rollback()
+            print(f"✗ Gagal rebuild rollup: {str(e)}")
+            return 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -28,6 +28,7 @@ def setup_owner():
                     existing_owner.hashed_password = bcrypt.generate_password_hash(new_password).decode('utf-8')
                     # Mark user as owner
                     existing_owner.is_owner = True
+                    existing_owner.membership_version = (existing_owner.membership_version or 0) + 1
                     db.session.commit()
                     print(f"✅ Password Owner berhasil direset!")
                 return
@@ -0,0 +1,107 @@
+"""Fixtures for API tests against an in-memory SQLite database.
+
+Needs a config.py (copied from config.py.example) providing the 'testing'
+configuration; DATABASE_URL is pointed at SQLite before it is imported.
+"""
+import os
+import sys
+from contextlib import contextmanager
+
+import pytest
+from sqlalchemy import event
+
+os.environ['DATABASE_URL'] = 'sqlite://'
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+pytest.importorskip('config', reason='config.py is required, copy it from config.py.example')
+
+from flask_jwt_extended import create_access_token  # noqa: E402
+from app import create_app, db, bcrypt  # noqa: E402
+from app.categories import _trees  # noqa: E402
+from app.models import Role, User, Workspace, WorkspaceMember  # noqa: E402
+
+
+@pytest.fixture
+def app():
+    app = create_app('testing')
+    app.config.update(TESTING=True, SQLALCHEMY_DATABASE_URI='sqlite://', RESPONSE_CACHE_BACKEND='none')
+    with app.app_context():
+        db.create_all()
+        yield app
+        db.session.remove()
+        db.drop_all()
+    # Every test database reuses workspace ids and generations
+    _trees.clear()
+
+
+@pytest.fixture
+def client(app):
+    return app.test_client()
+
+
+@pytest.fixture
+def workspace(app):
+    """An Owner with one workspace: (workspace_id, auth headers)."""
+    roles = {name: Role(name=name) for name in ('Owner', 'Admin', 'Member', 'Viewer')}
+    user = User(email='owner@example.com', hashed_password=bcrypt.generate_password_hash('secret').decode(), name='Owner')
+    workspace = Workspace(name='Rumah')
+    db.session.add_all([*roles.values(), user, workspace])
+    db.session.flush()
+    db.session.add(WorkspaceMember(user_id=user.id, workspace_id=workspace.id, role_id=roles['Owner'].id))
+    db.session.commit()
+
+    token = create_access_token(identity=str(user.id))
+    return workspace.id, {'Authorization': f'Bearer {token}'}
+
+
+@pytest.fixture
+def post(client, workspace):
+    """POST JSON as the workspace Owner and return the (200/201) response body."""
+    _, headers = workspace
+
+    def post(url, payload):
+        response = client.post(url, headers=headers, json=payload)
+        assert response.status_code in (200, 201), response.get_json()
+        return response.get_json()
+
+    return post
+
+
+@pytest.fixture
+def account(post, workspace):
+    """Id of a 'BCA' bank account in the workspace."""
+    workspace_id, _ = workspace
+    return post('/api/accounts', {
+        'workspace_id': workspace_id, 'name': 'BCA', 'type': 'Bank', 'initial_balance': 0
+    })['account']['id']
+
+
+@pytest.fixture
+def category(post, workspace):
+    """Id of a 'Makanan' expense category in the workspace."""
+    workspace_id, _ = workspace
+    return post('/api/categories', {
+        'workspace_id': workspace_id, 'name': 'Makanan', 'type': 'EXPENSE'
+    })['category']['id']
+
+
+@pytest.fixture
+def count_statements(app):
+    """Context manager collecting the SQL statements executed inside it."""
+    @contextmanager
+    def count_statements():
+        # Requests share the test's app context and session; start from an empty
+        # identity map so related rows are not served from earlier requests
+        db.session.remove()
+        statements = []
+
+        def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+            statements.append(statement)
+
+        event.listen(db.engine, 'before_cursor_execute', before_cursor_execute)
+        try:
+            yield statements
+        finally:
+            event.remove(db.engine, 'before_cursor_execute', before_cursor_execute)
+
+    return count_statements
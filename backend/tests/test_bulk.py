@@ -0,0 +1,45 @@
+"""Per-row validation of POST /api/transactions/bulk."""
+import pytest
+
+from app.models import Transaction
+
+
+@pytest.mark.parametrize('fields, error', [
+    ({'description': 5}, 'description harus berupa teks'),
+    ({'description': ['Makan']}, 'description harus berupa teks'),
+    ({'account_id': [1]}, 'account_id harus berupa bilangan bulat'),
+    ({'account_id': '1'}, 'account_id harus berupa bilangan bulat'),
+    ({'account_id': True, 'category_id': True}, 'account_id harus berupa bilangan bulat'),
+    ({'category_id': True}, 'category_id harus berupa bilangan bulat'),
+    ({'category_id': {'id': 1}}, 'category_id harus berupa bilangan bulat'),
+    ({'type': 'TRANSFER', 'category_id': None, 'transfer_to_account_id': True},
+     'transfer_to_account_id harus berupa bilangan bulat'),
+])
+def test_invalid_values_are_rejected_per_row(client, workspace, account, category, fields, error):
+    workspace_id, headers = workspace
+    valid = {
+        'account_id': account, 'category_id': category, 'type': 'EXPENSE',
+        'amount': 25000, 'transaction_date': '2026-10-01', 'description': 'Makan siang'
+    }
+    response = client.post('/api/transactions/bulk', headers=headers, json={
+        'workspace_id': workspace_id,
+        'transactions': [valid, {**valid, **fields}]
+    })
+
+    assert response.status_code == 201, response.get_json()
+    data = response.get_json()
+    assert data['created'] == 1
+    assert data['errors'] == [{'index': 1, 'error': error}]
+    assert Transaction.query.count() == 1
+
+
+def test_missing_description_is_stored_empty(workspace, post, account, category):
+    workspace_id, _ = workspace
+    post('/api/transactions/bulk', {
+        'workspace_id': workspace_id,
+        'transactions': [{
+            'account_id': account, 'category_id': category, 'type': 'EXPENSE',
+            'amount': 25000, 'transaction_date': '2026-10-01'
+        }]
+    })
+    assert Transaction.query.one().description == ''
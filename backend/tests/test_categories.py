@@ -0,0 +1,23 @@
+"""Category tree cache across worker processes."""
+from app import db
+from app.cache import bump_workspace_generation
+from app.categories import get_category_tree
+from app.models import Category
+
+
+def test_tree_follows_generation_bumped_elsewhere(app, workspace, category):
+    workspace_id, _ = workspace
+    category_id = category
+
+    with app.app_context():
+        assert get_category_tree(workspace_id).get(category_id).name == 'Makanan'
+
+    # Another worker renames the category: it bumps the generation but
+    # cannot drop this process's cached tree
+    with app.app_context():
+        db.session.get(Category, category_id).name = 'Jajan'
+        bump_workspace_generation(workspace_id)
+        db.session.commit()
+
+    with app.app_context():
+        assert get_category_tree(workspace_id).get(category_id).name == 'Jajan'
@@ -0,0 +1,52 @@
+"""Transaction fingerprints after account merges and backfills."""
+from app import db
+from app import duplicates
+from app.duplicates import backfill_fingerprints, fingerprint_of
+from app.models import Transaction
+
+
+def test_merged_transactions_are_flagged_against_target(client, workspace, post, account, category):
+    workspace_id, headers = workspace
+    bca = account
+    mandiri = post('/api/accounts', {
+        'workspace_id': workspace_id, 'name': 'Mandiri', 'type': 'Bank', 'initial_balance': 0
+    })['account']['id']
+    for account_id in (bca, mandiri):
+        post('/api/transactions', {
+            'workspace_id': workspace_id, 'account_id': account_id, 'category_id': category,
+            'type': 'EXPENSE', 'amount': 25000, 'transaction_date': '2026-10-01', 'description': 'Makan siang'
+        })
+
+    response = client.post(f'/api/accounts/{mandiri}/merge', headers=headers, json={
+        'workspace_id': workspace_id, 'target_account_id': bca
+    })
+    assert response.status_code == 200, response.get_json()
+
+    for transaction in Transaction.query.filter_by(workspace_id=workspace_id):
+        assert transaction.fingerprint == fingerprint_of(transaction)
+
+    groups = client.get('/api/transactions/duplicates', headers=headers, query_string={
+        'workspace_id': workspace_id
+    }).get_json()
+    assert [group['count'] for group in groups['groups']] == [2]
+
+
+def test_backfill_writes_every_batch(workspace, post, account, category, monkeypatch):
+    workspace_id, _ = workspace
+    post('/api/transactions/bulk', {
+        'workspace_id': workspace_id,
+        'transactions': [
+            {
+                'account_id': account, 'category_id': category, 'type': 'EXPENSE',
+                'amount': 1000 + index, 'transaction_date': '2026-10-01', 'description': f'Belanja {index}'
+            }
+            for index in range(7)
+        ]
+    })
+    Transaction.query.update({'fingerprint': None})
+    db.session.commit()
+
+    monkeypatch.setattr(duplicates, 'BACKFILL_BATCH_SIZE', 3)
+    assert backfill_fingerprints(workspace_id) == 7
+    for transaction in Transaction.query.all():
+        assert transaction.fingerprint == fingerprint_of(transaction)
@@ -0,0 +1,25 @@
+"""Created, updated and skipped counts of gold price upserts."""
+from datetime import date
+from decimal import Decimal
+
+from app import db
+from app.gold_prices import upsert_gold_prices
+
+
+def test_upsert_counts_inserts_and_updates(app):
+    first = [
+        {'date': date(2026, 10, day), 'source': 'ANTAM', 'price_per_gram': Decimal('1500000')}
+        for day in (1, 2)
+    ]
+    result = upsert_gold_prices(first)
+    db.session.commit()
+    assert (result['created'], result['updated'], result['skipped']) == (2, 0, 0)
+
+    result = upsert_gold_prices([
+        {'date': date(2026, 10, 1), 'source': 'ANTAM', 'price_per_gram': Decimal('1500000')},
+        {'date': date(2026, 10, 2), 'source': 'ANTAM', 'price_per_gram': Decimal('1510000')},
+        {'date': date(2026, 10, 3), 'source': 'ANTAM', 'price_per_gram': Decimal('1520000')},
+    ])
+    db.session.commit()
+    assert (result['created'], result['updated'], result['skipped']) == (1, 1, 1)
+    assert result['sources'] == {'ANTAM'}
@@ -0,0 +1,62 @@
+"""CSV import: rejected rows must not leave categories or accounts behind."""
+import io
+
+from app.importer import import_transactions, load_mapping, read_rows
+from app import db
+from app.models import Account, Category, Workspace
+
+
+def _import(workspace_id, text, **options):
+    rows = read_rows(io.BytesIO(text.encode()), 'mutasi.csv')
+    return import_transactions(workspace_id, rows, load_mapping({}), **options)
+
+
+def test_rejected_rows_create_nothing(workspace):
+    workspace_id, _ = workspace
+    result = _import(workspace_id, (
+        'date,description,amount,type,category,account,transfer_to\n'
+        '2026-10-01,Aneh,10000,DEBIT,Junk,NewBank,\n'
+        '2026-10-02,Nol,0,EXPENSE,Kosong,ZeroBank,\n'
+        '2026-10-03,Tanpa tujuan,5000,TRANSFER,,TransferBank,\n'
+        'bukan-tanggal,Rusak,5000,EXPENSE,Rusak,DateBank,\n'
+        '2026-10-04,Makan siang,25000,EXPENSE,Makanan,BCA,\n'
+    ))
+
+    assert result['imported'] == 1
+    assert result['error_count'] == 4
+    assert result['categories_created'] == ['Makanan']
+    assert result['accounts_created'] == ['BCA']
+    assert [category.name for category in Category.query.filter_by(workspace_id=workspace_id)] == ['Makanan']
+    assert [account.name for account in Account.query.filter_by(workspace_id=workspace_id)] == ['BCA']
+
+
+def test_transfer_rows_create_no_category(workspace):
+    workspace_id, _ = workspace
+    result = _import(workspace_id, (
+        'date,description,amount,type,category,account,transfer_to\n'
+        '2026-10-01,Pindah dana,50000,TRANSFER,Mutasi,BCA,Dompet\n'
+    ))
+
+    assert result['imported'] == 1
+    assert result['categories_created'] == []
+    assert sorted(result['accounts_created']) == ['BCA', 'Dompet']
+
+
+def test_created_category_bumps_generation_without_rows(workspace, post, account, category):
+    workspace_id, _ = workspace
+    post('/api/transactions', {
+        'workspace_id': workspace_id, 'account_id': account, 'category_id': category,
+        'type': 'EXPENSE', 'amount': 25000, 'transaction_date': '2026-10-04', 'description': 'Makan siang'
+    })
+    generation = db.session.get(Workspace, workspace_id).cache_generation
+
+    result = _import(workspace_id, (
+        'date,description,amount,type,category,account,transfer_to\n'
+        '2026-10-04,Makan siang,25000,EXPENSE,Jajan,BCA,\n'
+    ), skip_duplicates=True)
+    db.session.commit()
+
+    assert result['imported'] == 0
+    assert result['categories_created'] == ['Jajan']
+    db.session.expire_all()
+    assert db.session.get(Workspace, workspace_id).cache_generation > generation
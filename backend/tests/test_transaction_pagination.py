@@ -0,0 +1,30 @@
+"""Page sizes of the transaction list (GET /api/transactions)."""
+import pytest
+
+from app.routes import transaction
+
+
+@pytest.mark.parametrize('cursor', ['', None])
+@pytest.mark.parametrize('per_page, expected', [(0, 1), (-5, 1), (10, 3)])
+def test_per_page_is_clamped(client, workspace, post, account, category, monkeypatch, cursor, per_page, expected):
+    workspace_id, headers = workspace
+    monkeypatch.setattr(transaction, 'MAX_PER_PAGE', 3)
+    post('/api/transactions/bulk', {
+        'workspace_id': workspace_id,
+        'transactions': [
+            {
+                'account_id': account, 'category_id': category, 'type': 'EXPENSE',
+                'amount': 1000 + index, 'transaction_date': '2026-10-01', 'description': f'Belanja {index}'
+            }
+            for index in range(5)
+        ]
+    })
+
+    params = {'workspace_id': workspace_id, 'per_page': per_page}
+    if cursor is not None:
+        params['cursor'] = cursor
+    response = client.get('/api/transactions', headers=headers, query_string=params)
+    assert response.status_code == 200, response.get_json()
+    data = response.get_json()
+    assert len(data['transactions']) == expected
+    assert data['per_page'] == expected
@@ -0,0 +1,69 @@
+"""Statements run by the transaction list and detail endpoints."""
+import pytest
+
+
+@pytest.fixture
+def transaction_ids(workspace, post):
+    """Ids of 80 expenses and transfers spread over 10 accounts and 10 categories."""
+    workspace_id, _ = workspace
+    accounts = [
+        post('/api/accounts', {
+            'workspace_id': workspace_id, 'name': f'Rekening {index}', 'type': 'Bank', 'initial_balance': 0
+        })['account']['id']
+        for index in range(10)
+    ]
+    categories = [
+        post('/api/categories', {
+            'workspace_id': workspace_id, 'name': f'Kategori {index}', 'type': 'EXPENSE'
+        })['category']['id']
+        for index in range(10)
+    ]
+    rows = []
+    for index in range(80):
+        row = {
+            'account_id': accounts[index % 10], 'amount': 1000 + index,
+            'transaction_date': f'2026-10-{index % 28 + 1:02d}', 'description': f'Transaksi {index}'
+        }
+        if index % 2:
+            row.update(type='TRANSFER', transfer_to_account_id=accounts[(index + 1) % 10])
+        else:
+            row.update(type='EXPENSE', category_id=categories[index // 2 % 10])
+        rows.append(row)
+    return post('/api/transactions/bulk', {'workspace_id': workspace_id, 'transactions': rows})['ids']
+
+
+@pytest.mark.parametrize('cursor', ['', None])
+def test_list_statements_do_not_grow_with_page_size(client, workspace, transaction_ids, count_statements, cursor):
+    workspace_id, headers = workspace
+
+    def list_page(per_page):
+        params = {'workspace_id': workspace_id, 'per_page': per_page}
+        if cursor is not None:
+            params['cursor'] = cursor
+        with count_statements() as statements:
+            response = client.get('/api/transactions', headers=headers, query_string=params)
+        assert response.status_code == 200, response.get_json()
+        assert len(response.get_json()['transactions']) == per_page
+        return len(statements)
+
+    list_page(5)  # warm the workspace access cache
+    assert list_page(5) == list_page(80)
+
+
+def test_detail_loads_relations_with_the_transaction(client, workspace, transaction_ids, count_statements):
+    _, headers = workspace
+
+    def get_detail(transaction_id):
+        with count_statements() as statements:
+            response = client.get(f'/api/transactions/{transaction_id}', headers=headers)
+        assert response.status_code == 200, response.get_json()
+        return response.get_json()['transaction'], statements
+
+    get_detail(transaction_ids[0])  # warm the workspace access cache
+    expense, expense_statements = get_detail(transaction_ids[0])
+    transfer, transfer_statements = get_detail(transaction_ids[1])
+    assert expense['category'] and transfer['transfer_to_account']
+    # One SELECT of the transaction joined to its accounts and category
+    for statements in (expense_statements, transfer_statements):
+        assert len(statements) == 1
+        assert 'FROM transactions LEFT OUTER JOIN accounts' in statements[0]
@@ -0,0 +1,40 @@
+"""Keyset pagination of ranked description search (GET /api/transactions?q=...)."""
+
+
+def test_ranked_search_pages_through_tied_ranks(client, workspace, post, account, category):
+    workspace_id, headers = workspace
+
+    # Many rows share each rank and each date, so page boundaries fall inside ties
+    descriptions = ['bensin', 'Bensin pertamina', 'isi bensin motor', 'kopi'] * 6
+    post('/api/transactions/bulk', {
+        'workspace_id': workspace_id,
+        'transactions': [
+            {
+                'account_id': account,
+                'category_id': category,
+                'type': 'EXPENSE',
+                'amount': 1000 + index,
+                'transaction_date': f'2026-10-{index % 3 + 1:02d}',
+                'description': description
+            }
+            for index, description in enumerate(descriptions)
+        ]
+    })
+
+    everything = client.get('/api/transactions', headers=headers, query_string={
+        'workspace_id': workspace_id, 'q': 'bensin', 'per_page': 100
+    }).get_json()['transactions']
+    assert len(everything) == 18
+    ranks = [transaction['rank'] for transaction in everything]
+    assert ranks == sorted(ranks, reverse=True)
+    assert len(set(ranks)) < len(ranks)
+
+    seen, cursor = [], ''
+    while cursor is not None:
+        page = client.get('/api/transactions', headers=headers, query_string={
+            'workspace_id': workspace_id, 'q': 'bensin', 'per_page': 4, 'cursor': cursor
+        }).get_json()
+        seen += [transaction['id'] for transaction in page['transactions']]
+        cursor = page['next_cursor']
+
+    assert seen == [transaction['id'] for transaction in everything]
@@ -0,0 +1,39 @@
+"""Rejected transaction updates leave the ledger alone (PUT /api/transactions/<id>)."""
+import pytest
+
+
+@pytest.mark.parametrize('payload', [
+    {'amount': -5},
+    {'type': 'DEBIT'},
+    {'account_id': 999},
+    {'type': 'TRANSFER', 'transfer_to_account_id': 999},
+    {'type': 'TRANSFER'},
+])
+def test_rejected_update_writes_nothing(client, workspace, post, account, category, count_statements, payload):
+    workspace_id, headers = workspace
+    transaction_id = post('/api/transactions', {
+        'workspace_id': workspace_id, 'account_id': account, 'category_id': category,
+        'type': 'EXPENSE', 'amount': 25000, 'transaction_date': '2026-10-01', 'description': 'Makan siang'
+    })['transaction']['id']
+
+    with count_statements() as statements:
+        response = client.put(f'/api/transactions/{transaction_id}', headers=headers, json=payload)
+    assert response.status_code == 400, response.get_json()
+    assert not [statement for statement in statements if not statement.lstrip().upper().startswith('SELECT')]
+
+    accounts = client.get('/api/accounts', headers=headers, query_string={'workspace_id': workspace_id}).get_json()
+    assert accounts['accounts'][0]['current_balance'] == -25000
+
+
+def test_update_moves_balance(client, workspace, post, account, category):
+    workspace_id, headers = workspace
+    transaction_id = post('/api/transactions', {
+        'workspace_id': workspace_id, 'account_id': account, 'category_id': category,
+        'type': 'EXPENSE', 'amount': 25000, 'transaction_date': '2026-10-01', 'description': 'Makan siang'
+    })['transaction']['id']
+
+    response = client.put(f'/api/transactions/{transaction_id}', headers=headers, json={'amount': 30000})
+    assert response.status_code == 200, response.get_json()
+
+    accounts = client.get('/api/accounts', headers=headers, query_string={'workspace_id': workspace_id}).get_json()
+    assert accounts['accounts'][0]['current_balance'] == -30000